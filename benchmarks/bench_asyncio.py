@@ -0,0 +1,71 @@
+"""Threaded vs. asyncio dispatch: events in flight, threads and memory.
+
+Replays the recorded corpus through the endpoint with Slack and Dify
+latency injected, once per worker pool size in ``async`` dispatch mode and
+once per blocking-call executor size in ``asyncio`` mode. Reports
+throughput, the peak number of Dify calls in flight, how many threads
+made Slack or Dify calls and the peak traced Python memory.
+
+The Dify plugin session has no async API, so in asyncio mode Dify calls
+still take an executor thread each; the asyncio path pays off when Slack
+latency dominates, as in the second profile.
+
+    python -m benchmarks.bench_asyncio
+"""
+
+import logging
+import tracemalloc
+from typing import Any
+
+from benchmarks.fake_services import FakeDify, FakeSlack, Faults
+from benchmarks.replay import load_corpus, replay
+
+REPEAT = 20
+# (Slack latency, Dify latency) in seconds
+PROFILES = {"Dify-bound": (0.02, 0.2), "Slack-bound": (0.2, 0.02)}
+SIZES = (8, 64)
+
+
+def run(settings: dict[str, Any], slack_latency: float, dify_latency: float) -> str:
+    slack = FakeSlack(Faults(latency=slack_latency))
+    dify = FakeDify(Faults(latency=dify_latency))
+    tracemalloc.start()
+    report = replay(
+        load_corpus(),
+        settings={"coalesce_reactions": False, **settings},
+        slack=slack,
+        dify=dify,
+        repeat=REPEAT,
+        concurrency=8,
+    )
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (
+        f"{report.events_per_sec:7.0f} events/s, "
+        f"{dify.peak_in_flight:4} Dify calls in flight, "
+        f"{len(slack.threads | dify.threads):3} threads, "
+        f"{peak_memory / 1e6:6.1f} MB peak, lost {report.lost}"
+    )
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    for profile, latencies in PROFILES.items():
+        print(f"{profile} (Slack {latencies[0]}s, Dify {latencies[1]}s):")
+        for size in SIZES:
+            settings = {
+                "dispatch_mode": "async",
+                "worker_pool_size": str(size),
+                "worker_queue_size": "10000",
+            }
+            print(f"  threaded, {size:3} workers:         {run(settings, *latencies)}")
+        for size in SIZES:
+            settings = {
+                "dispatch_mode": "asyncio",
+                "asyncio_blocking_threads": str(size),
+            }
+            print(f"  asyncio, {size:3} blocking threads: {run(settings, *latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Per-event Slack client overhead: fresh WebClient per event vs. ClientRegistry.
+
+A reaction event makes three Slack calls. With a fresh client (and no SSL
+context), urllib builds a new default SSL context for every call; the registry
+reuses one client and one context. Network time is excluded.
+
+    python -m benchmarks.bench_client_pool
+"""
+
+import ssl
+import time
+
+from slack_sdk import WebClient
+
+from endpoints.client_pool import ClientRegistry
+
+CALLS_PER_EVENT = 3
+EVENTS = 200
+
+
+def per_event_fresh() -> None:
+    WebClient(token="xoxb-bench")
+    for _ in range(CALLS_PER_EVENT):
+        ssl.create_default_context()
+
+
+def per_event_pooled(registry: ClientRegistry) -> None:
+    client = registry.get("xoxb-bench")
+    for _ in range(CALLS_PER_EVENT):
+        assert client.ssl is not None
+
+
+def main() -> None:
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        per_event_fresh()
+    fresh = (time.perf_counter() - start) / EVENTS
+
+    registry = ClientRegistry(WebClient)
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        per_event_pooled(registry)
+    pooled = (time.perf_counter() - start) / EVENTS
+
+    print(f"fresh client per event: {fresh * 1e6:10.1f} us/event")
+    print(f"pooled client:          {pooled * 1e6:10.1f} us/event")
+    print(f"speedup:                {fresh / pooled:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
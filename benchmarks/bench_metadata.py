@@ -0,0 +1,114 @@
+"""Memory and lookup cost of the user and channel metadata cache.
+
+Loads synthetic workspaces of 10k and 100k users (pages are generated on
+demand, the way users.list returns them) and reports the memory the cache
+retains per 10k users next to keeping the raw member objects, plus the
+cost of building the Dify inputs for one event.
+
+    python -m benchmarks.bench_metadata
+"""
+
+import functools
+import gc
+import time
+import tracemalloc
+from typing import Any
+
+from endpoints.metadata import PAGE_SIZE, MetadataCache
+
+SIZES = (10_000, 100_000)
+CHANNELS = 2_000
+TIME_ZONES = ("Asia/Tokyo", "America/Los_Angeles", "Europe/London", "UTC")
+LOOKUPS = 200_000
+
+
+def fake_member(i: int) -> dict[str, Any]:
+    return {
+        "id": f"U{i:08d}",
+        "name": f"user{i}",
+        "real_name": f"User Number {i}",
+        "tz": TIME_ZONES[i % len(TIME_ZONES)],
+        "tz_offset": 32400,
+        "is_bot": False,
+        "profile": {
+            "display_name": f"user-{i}",
+            "real_name": f"User Number {i}",
+            "email": f"user{i}@example.com",
+            "image_72": f"https://avatars.example.com/{i}_72.png",
+            "status_text": "",
+        },
+    }
+
+
+class FakeWorkspace:
+    def __init__(self, users: int) -> None:
+        self.user_count = users
+
+    @staticmethod
+    def _page(
+        key: str, items: list[dict[str, Any]], end: int, total: int
+    ) -> dict[str, Any]:
+        cursor = str(end) if end < total else ""
+        return {key: items, "response_metadata": {"next_cursor": cursor}}
+
+    def users_list(self, **kwargs: Any) -> dict[str, Any]:
+        start = int(kwargs.get("cursor") or 0)
+        end = min(start + kwargs["limit"], self.user_count)
+        members = [fake_member(i) for i in range(start, end)]
+        return self._page("members", members, end, self.user_count)
+
+    def conversations_list(self, **kwargs: Any) -> dict[str, Any]:
+        start = int(kwargs.get("cursor") or 0)
+        end = min(start + kwargs["limit"], CHANNELS)
+        channels = [
+            {"id": f"C{i:08d}", "name": f"channel-{i}", "is_private": i % 5 == 0}
+            for i in range(start, end)
+        ]
+        return self._page("channels", channels, end, CHANNELS)
+
+
+def loaded(workspace: FakeWorkspace) -> MetadataCache:
+    cache = MetadataCache(workspace, page_size=PAGE_SIZE)
+    cache.refresh()
+    return cache
+
+
+def raw_members(users: int) -> dict[str, dict[str, Any]]:
+    """What caching users.list responses as they are would keep."""
+    return {f"U{i:08d}": fake_member(i) for i in range(users)}
+
+
+def retained(build: Any) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def main() -> None:
+    for users in SIZES:
+        workspace = FakeWorkspace(users)
+        started = time.perf_counter()
+        cache, cache_bytes = retained(functools.partial(loaded, workspace))
+        load_seconds = time.perf_counter() - started
+        _, raw_bytes = retained(functools.partial(raw_members, users))
+        user_ids = [f"U{i:08d}" for i in range(0, users, max(users // 1000, 1))]
+        channel_ids = [f"C{i:08d}" for i in range(CHANNELS)]
+        started = time.perf_counter()
+        for i in range(LOOKUPS):
+            cache.inputs(channel_ids[i % CHANNELS], user_ids[i % len(user_ids)])
+        per_lookup = (time.perf_counter() - started) / LOOKUPS
+        per_10k = 10_000 / users
+        print(
+            f"{users:7d} users: cache {cache_bytes * per_10k / 1e6:5.2f} MB/10k users "
+            f"(raw members {raw_bytes * per_10k / 1e6:5.2f} MB/10k), "
+            f"load {load_seconds:5.2f} s, inputs() {per_lookup * 1e6:5.2f} us/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Instrumentation overhead: app_mention events with metrics off and on.
+
+Uses the same mocked Slack and Dify as ``bench_router``, so the difference
+between the two lines is the cost of the spans, histograms and counters on
+one event's path. The per-call lines isolate a single span.
+
+    python -m benchmarks.bench_metrics
+"""
+
+import json
+import time
+from unittest.mock import Mock
+
+import endpoints.slack_bot2 as slack_bot2
+from benchmarks.bench_router import PAYLOADS, SETTINGS, _request
+from endpoints.client_pool import ClientRegistry
+from endpoints.metrics import Metrics, metrics
+from endpoints.rate_limit import RateLimitScheduler
+
+EVENTS = 2000
+CALLS = 200000
+
+
+def per_event(endpoint: slack_bot2.SlackBot2Endpoint, enabled: bool) -> float:
+    settings = {**SETTINGS, "enable_metrics": enabled}
+    body = json.dumps(PAYLOADS["app_mention"]).encode()
+    requests = [_request(body) for _ in range(EVENTS)]
+    start = time.perf_counter()
+    for request in requests:
+        endpoint._invoke(request, {}, settings)
+    return (time.perf_counter() - start) / EVENTS
+
+
+def per_span(enabled: bool) -> float:
+    registry = Metrics(enabled=enabled)
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        with registry.span("parse"):
+            pass
+    return (time.perf_counter() - start) / CALLS
+
+
+def main() -> None:
+    slack_bot2.client_registry = ClientRegistry(lambda **kwargs: Mock())
+    scheduler = RateLimitScheduler(sleep=lambda seconds: None)
+    slack_bot2.get_scheduler = lambda workspace: scheduler
+    session = Mock()
+    session.app.chat.invoke.return_value = {"answer": "hi"}
+    endpoint = slack_bot2.SlackBot2Endpoint(session)
+
+    per_event(endpoint, False)  # warm up
+    disabled = per_event(endpoint, False)
+    enabled = per_event(endpoint, True)
+    print(f"metrics disabled:  {disabled * 1e6:8.1f} us/event")
+    print(f"metrics enabled:   {enabled * 1e6:8.1f} us/event")
+    print(f"span (disabled):   {per_span(False) * 1e9:8.0f} ns/call")
+    print(f"span (enabled):    {per_span(True) * 1e9:8.0f} ns/call")
+    print()
+    for stage, stat in sorted(metrics.snapshot()["stages"].items()):
+        print(
+            f"{stage:16s} n={stat['count']:<6d} p50={stat['p50'] * 1e6:8.1f} us"
+            f"  p99={stat['p99'] * 1e6:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
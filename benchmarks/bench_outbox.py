@@ -0,0 +1,53 @@
+"""Outbox write throughput under a burst of answers.
+
+Records 1,000 answers of about 1 KB each, first from a single writer (one
+fsync per answer) and then from several concurrent writers, as the worker
+pool would, where writers share fsyncs.
+
+    python -m benchmarks.bench_outbox
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from endpoints.outbox import Outbox
+
+ANSWERS = 1000
+WRITERS = (1, 8, 32)
+
+
+def burst(path: str, writers: int) -> tuple[float, int]:
+    outbox = Outbox(path, drainer=False)
+    message = {"channel": "C1", "text": "x" * 1000, "blocks": []}
+    per_writer = ANSWERS // writers
+
+    def write() -> None:
+        for _ in range(per_writer):
+            outbox.add("W1", [message])
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    outbox.close()
+    return elapsed, outbox.fsyncs
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for writers in WRITERS:
+            path = os.path.join(tmp, f"outbox-{writers}.jsonl")
+            elapsed, fsyncs = burst(path, writers)
+            print(
+                f"{writers:3} writers: {ANSWERS / elapsed:9.0f} answers/s "
+                f"({elapsed * 1e3:7.1f} ms for {ANSWERS}), {fsyncs} fsyncs"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Answer rendering cost: Markdown to mrkdwn conversion plus splitting.
+
+Renders a synthetic Markdown answer of about 50 KB (headings, lists, links,
+bold text and code blocks) in both formats, then a ten times larger one to
+check that the cost grows linearly with the answer length.
+
+    python -m benchmarks.bench_render
+"""
+
+import time
+
+from endpoints.render import FORMAT_MRKDWN, FORMAT_PLAIN, render_answer
+
+ROUNDS = 20
+
+
+def build_answer(size: int) -> str:
+    section = (
+        "## Step {i}\n\n"
+        "Run the **deploy** script and check [the runbook]"
+        "(https://example.com/runbook/{i}) before you *continue*.\n\n"
+        "- first item with `inline code` and a < b & c\n"
+        "- second item that is a little longer than the first one\n\n"
+        "```python\n"
+        "def step_{i}(value):\n"
+        "    return value * {i}\n"
+        "```\n\n"
+    )
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        text = section.format(i=i)
+        parts.append(text)
+        length += len(text)
+        i += 1
+    return "".join(parts)
+
+
+def measure(answer: str, answer_format: str) -> float:
+    render_answer(answer, answer_format)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        render_answer(answer, answer_format)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main() -> None:
+    small = build_answer(50_000)
+    large = build_answer(500_000)
+    for answer_format in (FORMAT_PLAIN, FORMAT_MRKDWN):
+        seconds = measure(small, answer_format)
+        large_seconds = measure(large, answer_format)
+        parts = len(render_answer(small, answer_format))
+        print(
+            f"{answer_format:7} {len(small) / 1000:5.0f} KB: "
+            f"{seconds * 1e3:7.2f} ms/answer "
+            f"{len(small) / seconds / 1e6:7.1f} MB/s, {parts} messages"
+        )
+        print(
+            f"{answer_format:7} {len(large) / 1000:5.0f} KB: "
+            f"{large_seconds * 1e3:7.2f} ms/answer "
+            f"(x{large_seconds / seconds:.1f} for x{len(large) / len(small):.1f} "
+            f"the size)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Events per second through ``SlackBot2Endpoint._invoke`` with mocked I/O.
+
+Slack and Dify are replaced by mocks, so the numbers cover request parsing,
+routing and settings handling only. Ignored events are rejected from the raw
+body before JSON decoding; the "json decode only" line is the cost the
+pre-filter avoids for them.
+
+    python -m benchmarks.bench_router
+"""
+
+import json
+import time
+from typing import Any
+from unittest.mock import Mock
+
+from werkzeug import Request
+from werkzeug.test import EnvironBuilder
+
+import endpoints.slack_bot2 as slack_bot2
+from endpoints.client_pool import ClientRegistry
+from endpoints.rate_limit import RateLimitScheduler
+
+EVENTS = 2000
+SETTINGS = {
+    "bot_token": "xoxb-bench",
+    "app": {"app_id": "app"},
+    "allow_retry": False,
+    "enable_thread_reply": False,
+    "target_reactions": "eyes,question",
+}
+PADDING = [{"type": "section", "text": {"type": "mrkdwn", "text": "x" * 200}}] * 20
+
+PAYLOADS: dict[str, dict[str, Any]] = {
+    "url_verification": {"type": "url_verification", "challenge": "c"},
+    "message_changed": {
+        "type": "event_callback",
+        "event": {"type": "message", "subtype": "message_changed", "blocks": PADDING},
+    },
+    "unconfigured reaction": {
+        "type": "event_callback",
+        "event": {
+            "type": "reaction_added",
+            "reaction": "fire",
+            "item": {"type": "message", "channel": "C1", "ts": "1.0"},
+        },
+    },
+    "app_mention": {
+        "type": "event_callback",
+        "event": {
+            "type": "app_mention",
+            "text": "<@U1> hello",
+            "channel": "C1",
+            "ts": "1.0",
+            "blocks": [{"elements": [{"elements": [{"text": "hello"}]}]}],
+        },
+    },
+}
+
+
+def _request(body: bytes) -> Request:
+    return Request(
+        EnvironBuilder(
+            method="POST", data=body, content_type="application/json"
+        ).get_environ()
+    )
+
+
+def main() -> None:
+    slack_bot2.client_registry = ClientRegistry(lambda **kwargs: Mock())
+    scheduler = RateLimitScheduler(sleep=lambda seconds: None)
+    slack_bot2.get_scheduler = lambda workspace: scheduler
+    session = Mock()
+    session.app.chat.invoke.return_value = {"answer": "hi"}
+    endpoint = slack_bot2.SlackBot2Endpoint(session)
+
+    for name, payload in PAYLOADS.items():
+        body = json.dumps(payload).encode()
+        requests = [_request(body) for _ in range(EVENTS)]
+        start = time.perf_counter()
+        for request in requests:
+            endpoint._invoke(request, {}, SETTINGS)
+        elapsed = time.perf_counter() - start
+        print(f"{name:24s} {EVENTS / elapsed:12.0f} events/s")
+
+    body = json.dumps(PAYLOADS["message_changed"]).encode()
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        json.loads(body)
+    elapsed = time.perf_counter() - start
+    print(f"{'json decode only':24s} {EVENTS / elapsed:12.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Routing lookup cost: compiled index vs. scanning the rule list.
+
+Builds rules for many workspaces (a token per team, an app per channel and a
+few reaction rules) and resolves events with both approaches.
+
+    python -m benchmarks.bench_routing
+"""
+
+import json
+import random
+import time
+
+from endpoints.routing import Route, RoutingRule, RoutingTable, parse_routing_rules
+
+TEAMS = 50
+CHANNELS_PER_TEAM = 20
+LOOKUPS = 20000
+
+
+def build_rules() -> list[dict[str, str]]:
+    rules = []
+    for t in range(TEAMS):
+        rules.append(
+            {"team_id": f"T{t}", "bot_token": f"xoxb-{t}", "app_id": "default"}
+        )
+        for c in range(CHANNELS_PER_TEAM):
+            rules.append({"channel": f"C{t}-{c}", "app_id": f"app-{t}-{c}"})
+        rules.append({"channel": f"C{t}-0", "reaction": "eyes", "app_id": "summary"})
+    return rules
+
+
+def scan(
+    rules: list[RoutingRule], team: str, channel: str, reaction: str | None
+) -> Route:
+    """Pick the matching rule with the most constrained fields."""
+    best: RoutingRule | None = None
+    best_score = -1
+    for rule in rules:
+        if rule.team_id not in (None, team) or rule.channel not in (None, channel):
+            continue
+        if rule.reaction not in (None, reaction):
+            continue
+        score = sum(v is not None for v in rule.key)
+        if score > best_score:
+            best, best_score = rule, score
+    return best.route if best else Route()
+
+
+def main() -> None:
+    rules = parse_routing_rules(json.dumps(build_rules()))
+    table = RoutingTable(rules)
+    rng = random.Random(0)
+    events = []
+    for _ in range(LOOKUPS):
+        t = rng.randrange(TEAMS)
+        c = rng.randrange(CHANNELS_PER_TEAM)
+        events.append((f"T{t}", f"C{t}-{c}", rng.choice(["eyes", "memo", None])))
+
+    start = time.perf_counter()
+    for event in events:
+        scan(rules, *event)
+    scanned = (time.perf_counter() - start) / LOOKUPS
+
+    start = time.perf_counter()
+    for event in events:
+        table.lookup(*event)
+    indexed = (time.perf_counter() - start) / LOOKUPS
+
+    print(f"rules: {len(rules)}")
+    print(f"linear scan:    {scanned * 1e6:8.2f} us/event")
+    print(f"compiled index: {indexed * 1e6:8.2f} us/event")
+    print(f"speedup:        {scanned / indexed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-request cost of verifying Slack request signatures.
+
+Compares re-keying HMAC for every request with copying the verifier's
+prepared HMAC, and shows how cheaply unsigned and stale requests are
+rejected before any hashing.
+
+    python -m benchmarks.bench_signature
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from collections.abc import Callable
+
+from endpoints.signature import SignatureVerifier
+
+SECRET = "8f742231b10e8888abcd99yyyzzz85a5"
+REQUESTS = 20000
+BODY = json.dumps(
+    {
+        "type": "event_callback",
+        "event": {"type": "app_mention", "text": "hello " * 50, "ts": "1.0"},
+    }
+).encode()
+
+
+def verify_fresh(body: bytes, timestamp: str, signature: str) -> bool:
+    digest = hmac.new(
+        SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return hmac.compare_digest(f"v0={digest}", signature)
+
+
+def measure(label: str, check: Callable[..., bool], *args: object) -> None:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        check(*args)
+    elapsed = (time.perf_counter() - start) / REQUESTS
+    print(f"{label:<28}{elapsed * 1e6:8.2f} us/request")
+
+
+def main() -> None:
+    timestamp = str(int(time.time()))
+    signature = "v0=" + (
+        hmac.new(
+            SECRET.encode(), f"v0:{timestamp}:".encode() + BODY, hashlib.sha256
+        ).hexdigest()
+    )
+    verifier = SignatureVerifier(SECRET)
+    assert verifier.verify(BODY, timestamp, signature)
+    assert verify_fresh(BODY, timestamp, signature)
+
+    measure("fresh hmac per request", verify_fresh, BODY, timestamp, signature)
+    measure("prepared hmac (valid)", verifier.verify, BODY, timestamp, signature)
+    measure("unsigned (rejected)", verifier.verify, BODY, None, None)
+    measure("stale (rejected)", verifier.verify, BODY, "1000", signature)
+
+
+if __name__ == "__main__":
+    main()
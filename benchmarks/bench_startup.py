@@ -0,0 +1,72 @@
+"""Cold-start cost of the endpoint module in a fresh interpreter.
+
+dify_plugin is imported first because the plugin runtime has always loaded it
+before our module; what is measured is what ``endpoints.slack_bot2`` adds on
+top, plus the latency of the first url_verification challenge. slack_sdk
+should not be imported until a Slack API call is actually made.
+
+    python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import subprocess
+import sys
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+from unittest.mock import Mock
+
+import dify_plugin  # noqa: F401
+
+start = time.perf_counter()
+import endpoints.slack_bot2 as module
+imported = time.perf_counter() - start
+
+request = Mock()
+request.headers = {}
+payload = {"type": "url_verification", "challenge": "c"}
+request.get_json.return_value = payload
+request.get_data.return_value = json.dumps(payload).encode()
+start = time.perf_counter()
+module.SlackBot2Endpoint(Mock())._invoke(request, {}, {})
+challenge = time.perf_counter() - start
+
+print(json.dumps({
+    "import_seconds": imported,
+    "first_challenge_seconds": challenge,
+    "slack_sdk_loaded": "slack_sdk" in sys.modules,
+    "sqlite3_loaded": "sqlite3" in sys.modules,
+}))
+"""
+
+
+def measure_startup() -> dict[str, Any]:
+    """Run the probe in a fresh interpreter and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    measurements: dict[str, Any] = json.loads(result.stdout.strip().splitlines()[-1])
+    return measurements
+
+
+def main() -> None:
+    runs = [measure_startup() for _ in range(5)]
+    best = min(runs, key=lambda run: run["import_seconds"])
+    print(f"import endpoints.slack_bot2: {best['import_seconds'] * 1e3:8.1f} ms")
+    print(
+        f"first url_verification:      {best['first_challenge_seconds'] * 1e3:8.1f} ms"
+    )
+    print(f"slack_sdk imported:          {best['slack_sdk_loaded']!s:>8}")
+    print(f"sqlite3 imported:            {best['sqlite3_loaded']!s:>8}")
+
+
+if __name__ == "__main__":
+    main()
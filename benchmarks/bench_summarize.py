@@ -0,0 +1,99 @@
+"""Memory use of reaction-triggered summarization as channels grow.
+
+Streams synthetic channels of increasing size through paginated fetch,
+compaction and map-reduce summarization with an instant fake Dify, and
+reports the tracemalloc peak next to that of collecting the whole window
+first. The streaming peak should stay flat while the other one grows with
+the channel.
+
+    python -m benchmarks.bench_summarize
+"""
+
+import time
+import tracemalloc
+from typing import Any
+
+from endpoints.summarize import (
+    PAGE_SIZE,
+    MapReduceSummarizer,
+    compact,
+    iter_history,
+)
+
+SIZES = (1_000, 10_000, 100_000)
+USERS = 50
+
+
+class PagedHistory:
+    """conversations_history over a channel whose pages are made on demand."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def conversations_history(self, **kwargs: Any) -> dict[str, Any]:
+        start = int(kwargs.get("cursor") or 0)
+        end = min(start + kwargs["limit"], self.size)
+        messages = [
+            {
+                "ts": f"{1_700_000_000 + self.size - i}.000100",
+                "user": f"U{i % USERS:03d}",
+                "text": f"message {i} about <@U{(i + 1) % USERS:03d}>'s change",
+                "blocks": [{"type": "rich_text", "elements": [{"text": "x" * 40}]}],
+            }
+            for i in range(start, end)
+        ]
+        cursor = str(end) if end < self.size else ""
+        return {"messages": messages, "response_metadata": {"next_cursor": cursor}}
+
+
+def ask(stage: str, text: str) -> str:
+    return text[-400:]
+
+
+def streamed(size: int) -> MapReduceSummarizer:
+    messages = iter_history(PagedHistory(size), "C1", "0", "2000000000", PAGE_SIZE)
+    summarizer = MapReduceSummarizer(ask, newest_first=True)
+    summarizer.summarize(compact(messages, lambda user_id: user_id))
+    return summarizer
+
+
+def collected(size: int) -> None:
+    client = PagedHistory(size)
+    messages: list[dict[str, Any]] = []
+    cursor = ""
+    while True:
+        page = client.conversations_history(limit=PAGE_SIZE, cursor=cursor)
+        messages.extend(page["messages"])
+        cursor = page["response_metadata"]["next_cursor"]
+        if not cursor:
+            break
+    MapReduceSummarizer(ask).summarize(
+        f"{m['user']}: {m['text']}" for m in reversed(messages)
+    )
+
+
+def peak(fn: Any, size: int) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn(size)
+    elapsed = time.perf_counter() - started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes / 1e6, elapsed
+
+
+def main() -> None:
+    for size in SIZES:
+        stream_mb, seconds = peak(streamed, size)
+        collect_mb, _ = peak(collected, size)
+        summarizer = streamed(size)
+        print(
+            f"{size:7d} messages: streamed peak {stream_mb:6.2f} MB, "
+            f"collected peak {collect_mb:7.2f} MB, "
+            f"{summarizer.map_calls} map + {summarizer.reduce_calls} reduce calls, "
+            f"{size / seconds / 1e3:6.1f}k messages/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""In-process stand-ins for the Slack Web API and a Dify app.
+
+Both inject configurable latency and failures from a seeded random source,
+so a replay is reproducible and needs no network. ``FakeSlack`` is handed
+out by the client registry in place of ``WebClient`` and ``FakeAsyncSlack``
+in place of ``AsyncWebClient``; ``FakeDify`` takes the place of the plugin
+session.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+ANSWER_PREFIX = "answer: "
+
+
+@dataclass
+class Faults:
+    """Latency in seconds (fixed part plus uniform jitter) and failure rates."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int = 0
+    _random: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def roll(self) -> tuple[float, bool, bool]:
+        """Latency to inject and whether to fail or rate limit this call."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failure = self._random.random()
+        return (
+            delay,
+            failure < self.error_rate,
+            self.error_rate <= failure < self.error_rate + self.rate_limit_rate,
+        )
+
+
+def message_text(channel: str, ts: str) -> str:
+    """Text of the stored message a reaction points at."""
+    return f"message {channel}/{ts}"
+
+
+class FakeSlack:
+    """Just enough of ``WebClient`` for the endpoint, with injected faults.
+
+    Every message the bot posts is recorded so a replay can check that each
+    event was answered exactly once.
+    """
+
+    def __init__(self, faults: Faults | None = None) -> None:
+        self.faults = faults or Faults()
+        self._lock = threading.Lock()
+        self.posts: Counter[str] = Counter()
+        self.posted_at: dict[str, float] = {}
+        self.calls: Counter[str] = Counter()
+        self.rate_limited = 0
+        self.errors = 0
+        # idents of the threads that made calls
+        self.threads: set[int] = set()
+        self.ssl = None
+        self.sleep: Callable[[float], Any] = time.sleep
+
+    def _call(self, method: str, data: dict[str, Any]) -> dict[str, Any]:
+        delay, error, rate_limited = self.faults.roll()
+        if delay:
+            self.sleep(delay)
+        with self._lock:
+            self.calls[method] += 1
+            self.threads.add(threading.get_ident())
+            if rate_limited:
+                self.rate_limited += 1
+            elif error:
+                self.errors += 1
+        if rate_limited:
+            raise SlackApiError("ratelimited", _response(429, {"Retry-After": "0"}))
+        if error:
+            raise SlackApiError("internal_error", _response(500, {}))
+        return {"ok": True, **data}
+
+    def conversations_history(self, channel: str, latest: str, **kwargs: Any) -> Any:
+        message = {"ts": latest, "text": message_text(channel, latest)}
+        return self._call("conversations_history", {"messages": [message]})
+
+    def conversations_replies(self, channel: str, ts: str, **kwargs: Any) -> Any:
+        message = {"ts": ts, "text": message_text(channel, ts)}
+        return self._call("conversations_replies", {"messages": [message]})
+
+    def chat_getPermalink(self, channel: str, message_ts: str, **kwargs: Any) -> Any:
+        return self._call(
+            "chat_getPermalink",
+            {"permalink": f"https://slack.example/archives/{channel}/p{message_ts}"},
+        )
+
+    def files_info(self, file: str, **kwargs: Any) -> Any:
+        return self._call("files_info", {"file": {"id": file}})
+
+    def chat_postMessage(self, channel: str, text: str, **kwargs: Any) -> Any:
+        response = self._call("chat_postMessage", {"ts": f"{time.time():.6f}"})
+        if text and text.startswith(ANSWER_PREFIX):
+            key = text[len(ANSWER_PREFIX) :]
+            with self._lock:
+                self.posts[key] += 1
+                self.posted_at.setdefault(key, time.perf_counter())
+        return response
+
+    def chat_update(self, channel: str, ts: str, text: str, **kwargs: Any) -> Any:
+        return self._call("chat_update", {"ts": ts})
+
+
+class FakeAsyncSlack:
+    """``FakeSlack`` behind the ``AsyncWebClient`` interface.
+
+    Latency is awaited, so a waiting call holds no thread. Calls, posts and
+    failures are recorded on the wrapped ``FakeSlack``, which stops sleeping
+    itself: a call takes effect first and its latency is awaited afterwards.
+    """
+
+    def __init__(self, slack: FakeSlack) -> None:
+        self.slack = slack
+        self._delays: list[float] = []
+        slack.sleep = self._delays.append
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.slack, name)
+
+        async def call(**kwargs: Any) -> Any:
+            # the sync call records the latency it rolled instead of sleeping
+            try:
+                return method(**kwargs)
+            finally:
+                if self._delays:
+                    await asyncio.sleep(self._delays.pop())
+
+        return call
+
+
+def _response(status: int, headers: dict[str, str]) -> SlackResponse:
+    return SlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/",
+        req_args={},
+        data={"ok": False, "error": "ratelimited" if status == 429 else "fatal"},
+        headers=headers,
+        status_code=status,
+    )
+
+
+class _Chat:
+    def __init__(self, dify: "FakeDify") -> None:
+        self._dify = dify
+
+    def invoke(self, **kwargs: Any) -> dict[str, Any]:
+        return self._dify.invoke(**kwargs)
+
+
+class _App:
+    def __init__(self, dify: "FakeDify") -> None:
+        self.chat = _Chat(dify)
+
+
+class FakeDify:
+    """Plugin session whose chat app echoes the query after a delay."""
+
+    def __init__(self, faults: Faults | None = None) -> None:
+        self.faults = faults or Faults()
+        self.app = _App(self)
+        # plugin storage and file upload are not simulated
+        self.storage = None
+        self.file = None
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.threads: set[int] = set()
+        self._lock = threading.Lock()
+
+    def invoke(self, query: str, **kwargs: Any) -> dict[str, Any]:
+        delay, error, _ = self.faults.roll()
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.threads.add(threading.get_ident())
+        try:
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        with self._lock:
+            self.calls += 1
+            if error:
+                self.errors += 1
+        if error:
+            raise RuntimeError("Dify app failed")
+        return {"answer": f"{ANSWER_PREFIX}{query}", "conversation_id": "conv"}
@@ -0,0 +1,396 @@
+"""Replay a corpus of recorded Slack events through ``SlackBot2Endpoint._invoke``.
+
+Slack and Dify are replaced by the in-process fakes from ``fake_services``,
+with optional injected latency, 429s and errors. The report covers
+throughput, per-request latency (what Slack waits for), answer latency
+(event received to answer posted) and correctness: every event marked
+``answered`` in the corpus must be answered exactly once.
+
+Each corpus line is ``{"headers": {...}, "body": {...}, "answered": bool}``.
+With ``--repeat`` the corpus is cloned with fresh event IDs, timestamps and
+questions, so repetitions are independent events.
+
+    python -m benchmarks.replay
+    python -m benchmarks.replay --repeat 50 --concurrency 8 --dify-latency 0.05
+    python -m benchmarks.replay --min-events-per-sec 500 --max-p99-ms 50
+
+Exits with status 1 when a gate fails, so it can guard CI against
+regressions.
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from werkzeug import Request
+from werkzeug.test import EnvironBuilder
+
+import endpoints.slack_bot2 as slack_bot2
+from benchmarks.fake_services import (
+    FakeAsyncSlack,
+    FakeDify,
+    FakeSlack,
+    Faults,
+    message_text,
+)
+from endpoints.client_pool import ClientRegistry
+from endpoints.rate_limit import RateLimitScheduler
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "slack_events.jsonl")
+SETTINGS: dict[str, Any] = {
+    "bot_token": "xoxb-replay",
+    "app": {"app_id": "replay-app"},
+    "allow_retry": False,
+    "enable_thread_reply": False,
+    "target_reactions": "eyes,question",
+    "dedup_backend": "memory",
+    "coalesce_reactions": True,
+}
+# Clones are shifted this many seconds apart so their timestamps never meet.
+TS_OFFSET = 1000.0
+TS_FIELDS = ("ts", "thread_ts", "event_ts")
+
+# Never reused within a process, so repeated replays do not look like
+# retries of each other to the dedup store or the reaction coalescer.
+_clone_ids = itertools.count(1)
+
+
+def load_corpus(path: str = CORPUS) -> list[dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _shift(value: str, n: int) -> str:
+    return f"{float(value) + n * TS_OFFSET:.6f}"
+
+
+def clone(entry: Mapping[str, Any], n: int) -> dict[str, Any]:
+    """A copy of ``entry`` that is a distinct event for clone number ``n``."""
+    cloned: dict[str, Any] = copy.deepcopy(dict(entry))
+    body = cloned["body"]
+    if "event_id" in body:
+        body["event_id"] = f"{body['event_id']}-{n}"
+    event = body.get("event") or {}
+    for target in (event, event.get("item") or {}):
+        for name in TS_FIELDS:
+            if name in target:
+                target[name] = _shift(target[name], n)
+    if event.get("type") == "app_mention":
+        event["text"] = f"{event['text']} #{n}"
+    return cloned
+
+
+def answer_key(body: Mapping[str, Any]) -> str | None:
+    """The query Dify is asked for this event, which the fake echoes back."""
+    event = body.get("event") or {}
+    if event.get("type") == "app_mention":
+        text = str(event.get("text", ""))
+        return text.split("> ", 1)[1] if "> " in text else text
+    if event.get("type") == "reaction_added":
+        item = event.get("item") or {}
+        return message_text(item.get("channel", ""), item.get("ts", ""))
+    return None
+
+
+@dataclass
+class ReplayReport:
+    events: int
+    elapsed: float
+    events_per_sec: float
+    request_p50: float
+    request_p99: float
+    answer_p50: float
+    answer_p99: float
+    expected: int
+    answered: int
+    lost: int
+    duplicated: int
+    unexpected: int
+    slack_calls: int
+    slack_rate_limited: int
+    slack_errors: int
+    dify_calls: int
+    dify_errors: int
+    throttle_wait: float
+
+    def format(self) -> str:
+        return "\n".join(
+            [
+                f"events:            {self.events} in {self.elapsed:.2f}s "
+                f"({self.events_per_sec:.0f} events/s)",
+                f"request latency:   p50 {self.request_p50 * 1e3:7.2f} ms   "
+                f"p99 {self.request_p99 * 1e3:7.2f} ms",
+                f"answer latency:    p50 {self.answer_p50 * 1e3:7.2f} ms   "
+                f"p99 {self.answer_p99 * 1e3:7.2f} ms",
+                f"answers:           {self.answered}/{self.expected} "
+                f"(lost {self.lost}, duplicated {self.duplicated}, "
+                f"unexpected {self.unexpected})",
+                f"slack:             {self.slack_calls} calls, "
+                f"{self.slack_rate_limited} rate limited, {self.slack_errors} errors, "
+                f"{self.throttle_wait:.2f}s throttle wait skipped",
+                f"dify:              {self.dify_calls} calls, "
+                f"{self.dify_errors} errors",
+            ]
+        )
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def _request(entry: Mapping[str, Any]) -> Request:
+    return Request(
+        EnvironBuilder(
+            method="POST",
+            data=json.dumps(entry["body"]).encode(),
+            content_type="application/json",
+            headers=entry.get("headers") or {},
+        ).get_environ()
+    )
+
+
+async def _no_sleep(seconds: float) -> None:
+    pass
+
+
+@contextmanager
+def _fake_slack(
+    slack: FakeSlack, asyncio_mode: bool = False
+) -> Iterator[RateLimitScheduler]:
+    """Route every Slack client to ``slack``; throttling is counted, not slept.
+
+    In asyncio mode the async clients get ``slack`` too, through
+    ``FakeAsyncSlack``.
+    """
+    registry, get_scheduler = slack_bot2.client_registry, slack_bot2.get_scheduler
+    async_registry = slack_bot2.async_client_registry
+    scheduler = RateLimitScheduler(sleep=lambda seconds: None, async_sleep=_no_sleep)
+    slack_bot2.client_registry = ClientRegistry(lambda **kwargs: slack)
+    slack_bot2.get_scheduler = lambda workspace: scheduler
+    if asyncio_mode:
+        async_slack = FakeAsyncSlack(slack)
+        slack_bot2.async_client_registry = ClientRegistry(lambda **kwargs: async_slack)
+    try:
+        yield scheduler
+    finally:
+        slack_bot2.client_registry = registry
+        slack_bot2.get_scheduler = get_scheduler
+        slack_bot2.async_client_registry = async_registry
+
+
+def replay(
+    corpus: list[dict[str, Any]],
+    settings: Mapping[str, Any] | None = None,
+    slack: FakeSlack | None = None,
+    dify: FakeDify | None = None,
+    repeat: int = 1,
+    concurrency: int = 1,
+) -> ReplayReport:
+    """Send ``repeat`` clones of ``corpus`` through the endpoint and report."""
+    settings = {**SETTINGS, **(settings or {})}
+    slack = slack or FakeSlack()
+    dify = dify or FakeDify()
+    clone_ids = [next(_clone_ids) for _ in range(repeat)]
+    entries = [clone(entry, n) for n in clone_ids for entry in corpus]
+    expected = {
+        key
+        for entry in entries
+        if entry.get("answered") and (key := answer_key(entry["body"])) is not None
+    }
+    requests = [(entry, _request(entry)) for entry in entries]
+    work: queue.Queue[tuple[dict[str, Any], Request]] = queue.Queue()
+    for item in requests:
+        work.put(item)
+    latencies: list[float] = []
+    received_at: dict[str, float] = {}
+    lock = threading.Lock()
+    endpoint = slack_bot2.SlackBot2Endpoint(dify)
+
+    def worker() -> None:
+        while True:
+            try:
+                entry, request = work.get_nowait()
+            except queue.Empty:
+                return
+            key = answer_key(entry["body"])
+            started = time.perf_counter()
+            if key is not None:
+                with lock:
+                    received_at.setdefault(key, started)
+            slack_bot2.SlackBot2Endpoint(dify)._invoke(request, {}, settings)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    dispatch_mode = settings.get("dispatch_mode")
+    with _fake_slack(slack, asyncio_mode=dispatch_mode == "asyncio") as scheduler:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if dispatch_mode == "asyncio":
+            endpoint._get_async_runner(settings).join()
+        if dispatch_mode in ("async", "asyncio"):
+            # asyncio mode hands streaming and coalesced reactions to the pool
+            endpoint._get_worker_pool(settings).join()
+        elapsed = time.perf_counter() - started
+
+    answered = {key for key in expected if slack.posts[key]}
+    answer_latencies = [
+        slack.posted_at[key] - received_at[key]
+        for key in answered
+        if key in received_at
+    ]
+    return ReplayReport(
+        events=len(entries),
+        elapsed=elapsed,
+        events_per_sec=len(entries) / elapsed if elapsed else 0.0,
+        request_p50=percentile(latencies, 0.5),
+        request_p99=percentile(latencies, 0.99),
+        answer_p50=percentile(answer_latencies, 0.5),
+        answer_p99=percentile(answer_latencies, 0.99),
+        expected=len(expected),
+        answered=len(answered),
+        lost=len(expected - answered),
+        duplicated=sum(count - 1 for count in slack.posts.values() if count > 1),
+        unexpected=sum(1 for key in slack.posts if key not in expected),
+        slack_calls=sum(slack.calls.values()),
+        slack_rate_limited=slack.rate_limited,
+        slack_errors=slack.errors,
+        dify_calls=dify.calls,
+        dify_errors=dify.errors,
+        throttle_wait=scheduler.throttle_wait,
+    )
+
+
+def check_gates(
+    report: ReplayReport,
+    min_events_per_sec: float = 0.0,
+    max_p99: float | None = None,
+    max_lost: int = 0,
+    max_duplicated: int = 0,
+) -> list[str]:
+    """Descriptions of the gates ``report`` fails; empty when it passes."""
+    failures = []
+    if report.events_per_sec < min_events_per_sec:
+        failures.append(
+            f"throughput {report.events_per_sec:.0f} events/s "
+            f"is below {min_events_per_sec:.0f}"
+        )
+    if max_p99 is not None and report.request_p99 > max_p99:
+        failures.append(
+            f"request p99 {report.request_p99 * 1e3:.2f} ms "
+            f"is above {max_p99 * 1e3:.2f} ms"
+        )
+    if report.lost > max_lost:
+        failures.append(f"{report.lost} answers lost (allowed {max_lost})")
+    if report.duplicated > max_duplicated:
+        failures.append(
+            f"{report.duplicated} answers duplicated (allowed {max_duplicated})"
+        )
+    return failures
+
+
+def _setting(value: str) -> tuple[str, Any]:
+    name, _, raw = value.partition("=")
+    try:
+        return name, json.loads(raw)
+    except json.JSONDecodeError:
+        return name, raw
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded Slack events through the endpoint."
+    )
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--setting",
+        action="append",
+        default=[],
+        type=_setting,
+        metavar="NAME=VALUE",
+        help="override an endpoint setting (VALUE is parsed as JSON if possible)",
+    )
+    parser.add_argument("--slack-latency", type=float, default=0.0)
+    parser.add_argument("--slack-jitter", type=float, default=0.0)
+    parser.add_argument("--slack-429-rate", type=float, default=0.0)
+    parser.add_argument("--slack-error-rate", type=float, default=0.0)
+    parser.add_argument("--dify-latency", type=float, default=0.0)
+    parser.add_argument("--dify-jitter", type=float, default=0.0)
+    parser.add_argument("--dify-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-events-per-sec", type=float, default=0.0)
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    parser.add_argument("--max-lost", type=int, default=0)
+    parser.add_argument("--max-duplicated", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep endpoint logs")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        # per-event logs, and tracebacks of injected errors, would drown the
+        # report and skew the timings
+        logging.disable(logging.CRITICAL)
+
+    slack = FakeSlack(
+        Faults(
+            latency=args.slack_latency,
+            jitter=args.slack_jitter,
+            error_rate=args.slack_error_rate,
+            rate_limit_rate=args.slack_429_rate,
+            seed=args.seed,
+        )
+    )
+    dify = FakeDify(
+        Faults(
+            latency=args.dify_latency,
+            jitter=args.dify_jitter,
+            error_rate=args.dify_error_rate,
+            seed=args.seed + 1,
+        )
+    )
+    try:
+        report = replay(
+            load_corpus(args.corpus),
+            settings=dict(args.setting),
+            slack=slack,
+            dify=dify,
+            repeat=args.repeat,
+            concurrency=args.concurrency,
+        )
+    finally:
+        logging.disable(logging.NOTSET)
+    print(json.dumps(asdict(report), indent=2) if args.json else report.format())
+    failures = check_gates(
+        report,
+        min_events_per_sec=args.min_events_per_sec,
+        max_p99=args.max_p99_ms / 1e3 if args.max_p99_ms is not None else None,
+        max_lost=args.max_lost,
+        max_duplicated=args.max_duplicated,
+    )
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
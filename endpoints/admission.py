@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import Counter
+from collections.abc import Hashable
+
+from endpoints.metrics import metrics
+
+ADMITTED = "admitted"
+COALESCED = "coalesced"
+SHED = "shed"
+
+POLICY_NOTIFY = "notify"
+POLICY_COALESCE = "coalesce"
+
+
+class AdmissionController:
+    """Caps concurrent Dify invocations globally, per channel and per user.
+
+    Events over a cap wait in a bounded queue for up to ``wait_timeout``
+    seconds. When the queue is full, or the wait times out, the event is shed.
+    With ``coalesce=True`` an overflowing event identical to one already in
+    flight or queued (same ``fingerprint``) is dropped as a duplicate instead.
+    A limit of 0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        max_total: int,
+        max_per_channel: int = 0,
+        max_per_user: int = 0,
+        max_waiting: int = 0,
+        wait_timeout: float = 30.0,
+    ) -> None:
+        self.max_total = max_total
+        self.max_per_channel = max_per_channel
+        self.max_per_user = max_per_user
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._total = 0
+        self._channels: Counter[str] = Counter()
+        self._users: Counter[str] = Counter()
+        self._active: Counter[Hashable] = Counter()
+        self._waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.coalesced = 0
+
+    @property
+    def limits(self) -> tuple[int, int, int, int, float]:
+        return (
+            self.max_total,
+            self.max_per_channel,
+            self.max_per_user,
+            self.max_waiting,
+            self.wait_timeout,
+        )
+
+    def _has_capacity(self, channel: str, user: str | None) -> bool:
+        if self.max_total and self._total >= self.max_total:
+            return False
+        if self.max_per_channel and self._channels[channel] >= self.max_per_channel:
+            return False
+        if (
+            user is not None
+            and self.max_per_user
+            and self._users[user] >= self.max_per_user
+        ):
+            return False
+        return True
+
+    def acquire(
+        self,
+        channel: str,
+        user: str | None = None,
+        fingerprint: Hashable = None,
+        coalesce: bool = False,
+    ) -> str:
+        """Return ADMITTED (call ``release`` afterwards), COALESCED or SHED."""
+        with self._cond:
+            if not self._has_capacity(channel, user):
+                if coalesce and fingerprint is not None and self._active[fingerprint]:
+                    self.coalesced += 1
+                    return COALESCED
+                if self._waiting >= self.max_waiting:
+                    self.shed += 1
+                    return SHED
+                self._waiting += 1
+                self.queued += 1
+                self._active[fingerprint] += 1
+                deadline = time.monotonic() + self.wait_timeout
+                try:
+                    while not self._has_capacity(channel, user):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed += 1
+                            return SHED
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                    self._active[fingerprint] -= 1
+                    if self._active[fingerprint] <= 0:
+                        del self._active[fingerprint]
+            self._total += 1
+            self._channels[channel] += 1
+            if user is not None:
+                self._users[user] += 1
+            self._active[fingerprint] += 1
+            self.admitted += 1
+            return ADMITTED
+
+    def release(
+        self, channel: str, user: str | None = None, fingerprint: Hashable = None
+    ) -> None:
+        with self._cond:
+            self._total -= 1
+            self._channels[channel] -= 1
+            if self._channels[channel] <= 0:
+                del self._channels[channel]
+            if user is not None:
+                self._users[user] -= 1
+                if self._users[user] <= 0:
+                    del self._users[user]
+            self._active[fingerprint] -= 1
+            if self._active[fingerprint] <= 0:
+                del self._active[fingerprint]
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "in_flight": self._total,
+                "waiting": self._waiting,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "shed": self.shed,
+                "coalesced": self.coalesced,
+            }
+
+
+_controllers: dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_admission_controller(
+    key: str,
+    max_total: int,
+    max_per_channel: int,
+    max_per_user: int,
+    max_waiting: int,
+    wait_timeout: float,
+) -> AdmissionController:
+    """Return the controller of the endpoint identified by ``key``.
+
+    Endpoints with the same limits still get separate caps. A controller
+    whose limits no longer match the settings is replaced; events admitted
+    by it release their slots on it as usual.
+    """
+    limits = (max_total, max_per_channel, max_per_user, max_waiting, wait_timeout)
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None or controller.limits != limits:
+            controller = AdmissionController(*limits)
+            _controllers[key] = controller
+        return controller
+
+
+def clear_admission_controllers() -> None:
+    with _controllers_lock:
+        _controllers.clear()
+
+
+def admission_stats() -> dict[str, int]:
+    """``AdmissionController.stats`` summed over every controller."""
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    totals: dict[str, int] = {}
+    for controller in controllers:
+        for name, value in controller.stats().items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+metrics.register_gauges("admission", admission_stats)
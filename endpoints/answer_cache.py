@@ -0,0 +1,102 @@
+import hashlib
+import json
+import re
+import threading
+from collections.abc import Mapping
+from typing import Any
+
+from endpoints.cache import TTLCache
+from endpoints.metrics import metrics
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?!.。？！ "
+
+# Inputs left out of the key. channel and message_ts differ on every event,
+# so including them would make every lookup a miss; every other input (thread
+# context, attached files, user metadata) can change the answer.
+EVENT_INPUTS = frozenset({"channel", "message_ts"})
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different asks match."""
+    return _WHITESPACE.sub(" ", query.casefold()).strip(_TRAILING_PUNCTUATION)
+
+
+def answer_cache_key(app_id: str, query: str, inputs: Mapping[str, Any]) -> str:
+    keyed = {k: v for k, v in inputs.items() if k not in EVENT_INPUTS and v}
+    parts = [
+        app_id,
+        normalize_query(query),
+        json.dumps(keyed, sort_keys=True, default=str),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class AnswerCache:
+    """TTL'd LRU of Dify answers bounded by total answer size in bytes."""
+
+    def __init__(self, max_bytes: int, ttl: float, maxsize: int = 10000) -> None:
+        self._answers: TTLCache[str, str] = TTLCache(
+            maxsize=maxsize,
+            ttl=ttl,
+            max_bytes=max_bytes,
+            sizeof=lambda answer: len(answer.encode()),
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str | None:
+        answer = self._answers.get(key)
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def set(self, key: str, answer: str) -> None:
+        self._answers.set(key, answer)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._answers),
+                "bytes": self._answers.bytes,
+            }
+
+
+_caches: dict[tuple[int, float], AnswerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_answer_cache(max_bytes: int, ttl: float) -> AnswerCache:
+    """Return the process-wide answer cache for the given configuration."""
+    key = (max_bytes, ttl)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = AnswerCache(max_bytes=max_bytes, ttl=ttl)
+            _caches[key] = cache
+        return cache
+
+
+def answer_cache_stats() -> dict[str, float]:
+    """``AnswerCache.stats`` summed over every cache, with the overall ratio."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    totals: dict[str, float] = {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+    for cache in caches:
+        stats = cache.stats()
+        for name in totals:
+            totals[name] += stats[name]
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_ratio"] = totals["hits"] / lookups if lookups else 0.0
+    return totals
+
+
+metrics.register_gauges("answer_cache", answer_cache_stats)
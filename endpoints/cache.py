@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+class TTLCache[K: Hashable, V]:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after being set.
+
+    With ``sliding=True`` every read pushes the expiry forward, which turns
+    ``ttl`` into an idle timeout. ``ttl=None`` disables expiry entirely. When
+    ``max_bytes`` is given, ``sizeof`` measures each value and least recently
+    used entries are evicted until the total fits.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float | None = None,
+        sliding: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+    ) -> None:
+        self.maxsize = max(1, maxsize)
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self.bytes = 0
+        self.ttl = ttl
+        self.sliding = sliding
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expires_at(self) -> float:
+        return self._clock() + self.ttl if self.ttl is not None else float("inf")
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                return None
+            if self.sliding:
+                self._data[key] = (self._expires_at(), value)
+            self._data.move_to_end(key)
+            return value
+
+    def _size(self, value: V) -> int:
+        return self._sizeof(value) if self._sizeof is not None else 0
+
+    def _remove(self, key: K) -> V:
+        _, value = self._data.pop(key)
+        self.bytes -= self._size(value)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            size = self._size(value)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (self._expires_at(), value)
+            self.bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._data)))
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """Return the cached value, building it with ``factory`` on a miss."""
+        with self._lock:
+            value = self.get(key)
+            if value is None:
+                value = factory()
+                self.set(key, value)
+            return value
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            if key not in self._data:
+                return None
+            return self._remove(key)
+
+    def purge(self) -> int:
+        """Drop every expired entry and return how many were removed."""
+        with self._lock:
+            now = self._clock()
+            expired = [k for k, (exp, _) in self._data.items() if exp <= now]
+            for key in expired:
+                self._remove(key)
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return len(self._data)
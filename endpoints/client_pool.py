@@ -0,0 +1,44 @@
+import ssl
+from collections.abc import Callable
+from typing import Any
+
+from endpoints.cache import TTLCache
+
+
+class ClientRegistry:
+    """Process-wide Slack client registry keyed by bot token.
+
+    Building a ``WebClient`` per event also means building a fresh SSL context
+    (and loading the CA bundle) for every HTTPS call. The registry hands out one
+    client per token, all sharing a single SSL context, evicts clients that
+    have been idle for ``idle_ttl`` seconds and holds at most ``max_clients``.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., Any],
+        max_clients: int = 64,
+        idle_ttl: float = 3600.0,
+    ) -> None:
+        self._factory = factory
+        self._clients: TTLCache[str, Any] = TTLCache(
+            maxsize=max_clients, ttl=idle_ttl, sliding=True
+        )
+        self._ssl_context: ssl.SSLContext | None = None
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    def get(self, token: str) -> Any:
+        return self._clients.get_or_create(
+            token, lambda: self._factory(token=token, ssl=self.ssl_context)
+        )
+
+    def clear(self) -> None:
+        self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
@@ -0,0 +1,45 @@
+import threading
+
+from endpoints.cache import TTLCache
+
+# (app_id, workspace, channel, thread_ts): the same thread is a separate
+# conversation for each Dify app and bot that answers in it
+ConversationKey = tuple[str, str, str, str]
+
+
+class ConversationStore:
+    """Maps a Slack thread to its Dify conversation_id.
+
+    Entries expire ``ttl`` seconds after the last turn so long-idle threads
+    start a fresh conversation, and the least recently used threads are
+    dropped once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400.0) -> None:
+        self._threads: TTLCache[ConversationKey, str] = TTLCache(
+            maxsize=maxsize, ttl=ttl, sliding=True
+        )
+
+    def get(self, key: ConversationKey) -> str | None:
+        return self._threads.get(key)
+
+    def set(self, key: ConversationKey, conversation_id: str) -> None:
+        self._threads.set(key, conversation_id)
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+
+_stores: dict[tuple[int, float], ConversationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_conversation_store(maxsize: int, ttl: float) -> ConversationStore:
+    """Return the process-wide conversation store for the given configuration."""
+    key = (maxsize, ttl)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ConversationStore(maxsize=maxsize, ttl=ttl)
+            _stores[key] = store
+        return store
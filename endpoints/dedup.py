@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Protocol
+
+from endpoints.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class DedupStore(Protocol):
+    def claim(self, key: str) -> bool:
+        """Mark ``key`` as seen. Returns False if it was already claimed."""
+        ...
+
+    def release(self, key: str) -> None:
+        """Forget ``key`` so a later retry of the event is processed."""
+        ...
+
+
+def event_dedup_key(data: Mapping) -> str | None:
+    """Idempotency key for a Slack event callback payload."""
+    event_id = data.get("event_id")
+    if event_id:
+        return f"event:{event_id}"
+    event = data.get("event") or {}
+    if event.get("type") == "reaction_added":
+        item = event.get("item") or {}
+        return (
+            f"reaction:{item.get('channel')}:{item.get('ts')}:{event.get('reaction')}"
+        )
+    if event.get("ts"):
+        return f"message:{event.get('channel')}:{event.get('ts')}"
+    return None
+
+
+class MemoryDedupStore:
+    """In-process LRU of recently seen keys."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600.0) -> None:
+        self._seen: TTLCache[str, bool] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> bool:
+        with self._lock:
+            if self._seen.get(key):
+                return False
+            self._seen.set(key, True)
+            return True
+
+    def release(self, key: str) -> None:
+        self._seen.pop(key)
+
+
+class SqliteDedupStore:
+    """SQLite-backed store shared by every worker process on the host."""
+
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str, maxsize: int = 10000, ttl: float = 3600.0) -> None:
+        import sqlite3
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS slack_events "
+            "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._claims = 0
+
+    def claim(self, key: str) -> bool:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM slack_events WHERE key = ? AND expires_at <= ?",
+                (key, now),
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO slack_events (key, expires_at) VALUES (?, ?)",
+                (key, now + self.ttl),
+            )
+            claimed = cursor.rowcount == 1
+            self._claims += 1
+            if self._claims % self.PURGE_EVERY == 0:
+                self._purge(now)
+            return claimed
+
+    def _purge(self, now: float) -> None:
+        self._conn.execute("DELETE FROM slack_events WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM slack_events WHERE key NOT IN "
+            "(SELECT key FROM slack_events ORDER BY expires_at DESC LIMIT ?)",
+            (self.maxsize,),
+        )
+
+    def release(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM slack_events WHERE key = ?", (key,))
+
+
+class PluginStorageDedupStore:
+    """Store backed by the Dify plugin storage, shared across plugin workers.
+
+    Keys are hashed into ``maxsize`` slots so storage usage stays bounded; a
+    slot only remembers its latest key. Check-then-set is not atomic, so two
+    workers receiving the same delivery at the same instant may both proceed.
+    """
+
+    def __init__(self, storage: Any, maxsize: int = 1000, ttl: float = 3600.0) -> None:
+        self._storage = storage
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def _slot(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode(), usedforsecurity=False).digest()
+        return f"slack-bot2:dedup:{int.from_bytes(digest[:8]) % self.maxsize}"
+
+    def claim(self, key: str) -> bool:
+        slot = self._slot(key)
+        now = time.time()
+        try:
+            if self._storage.exist(slot):
+                stored_key, _, expires_at = (
+                    self._storage.get(slot).decode().rpartition("|")
+                )
+                if stored_key == key and float(expires_at) > now:
+                    return False
+            self._storage.set(slot, f"{key}|{now + self.ttl}".encode())
+        except Exception as e:
+            logger.warning("Dedup storage unavailable, processing event: %s", e)
+        return True
+
+    def release(self, key: str) -> None:
+        slot = self._slot(key)
+        try:
+            self._storage.delete(slot)
+        except Exception as e:
+            logger.warning("Failed to release dedup key %s: %s", key, e)
+
+
+_stores: dict[tuple[Any, ...], DedupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_dedup_store(
+    backend: str,
+    maxsize: int,
+    ttl: float,
+    sqlite_path: str = "",
+    storage: Any = None,
+) -> DedupStore | None:
+    """Return the dedup store for ``backend`` or None when dedup is disabled."""
+    if backend == "plugin_storage":
+        return PluginStorageDedupStore(storage, maxsize=maxsize, ttl=ttl)
+    if backend not in ("memory", "sqlite"):
+        return None
+    key = (backend, maxsize, ttl, sqlite_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "sqlite":
+                store = SqliteDedupStore(sqlite_path, maxsize=maxsize, ttl=ttl)
+            else:
+                store = MemoryDedupStore(maxsize=maxsize, ttl=ttl)
+            _stores[key] = store
+        return store
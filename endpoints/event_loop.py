@@ -0,0 +1,168 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from endpoints.client_pool import ClientRegistry
+
+logger = logging.getLogger(__name__)
+
+
+_sessions: dict[asyncio.AbstractEventLoop, Any] = {}
+
+
+def shared_session() -> Any:
+    """The ``aiohttp.ClientSession`` of the running loop.
+
+    Without one AsyncWebClient opens a session, and a connection pool, per
+    call. Sessions are bound to the loop they were created on, so there is
+    one per loop, shared by every token; call this from a coroutine.
+    """
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession()
+        _sessions[loop] = session
+    return session
+
+
+def _async_web_client(**kwargs: Any) -> Any:
+    # slack_sdk's async client needs aiohttp, which only this mode requires
+    from slack_sdk.http_retry.builtin_async_handlers import (
+        AsyncConnectionErrorRetryHandler,
+    )
+    from slack_sdk.web.async_client import AsyncWebClient
+
+    # 429s are retried by AsyncRateLimitedClient, which also pauses the bucket
+    return AsyncWebClient(
+        session=shared_session(),
+        retry_handlers=[AsyncConnectionErrorRetryHandler()],
+        **kwargs,
+    )
+
+
+# AsyncWebClient per bot token, like ``client_registry`` for the sync path.
+# Clients are created on the shared loop, where they use its session.
+async_client_registry = ClientRegistry(_async_web_client)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _shared_loop() -> asyncio.AbstractEventLoop:
+    """The process's event loop, started on first use and never stopped.
+
+    gevent runs every thread on one OS thread, and asyncio allows only one
+    running loop per OS thread, so all event loop users share this one.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="slack-bot2-event-loop", daemon=True
+            ).start()
+            _loop = loop
+        return _loop
+
+
+class AsyncRunner:
+    """Runs events as coroutines on the shared asyncio event loop.
+
+    An event waiting on Slack holds no thread. Calls without an async API
+    (the Dify plugin session) run on this runner's bounded executor through
+    ``run_blocking``.
+    """
+
+    def __init__(self, blocking_threads: int = 32) -> None:
+        self.blocking_threads = max(1, blocking_threads)
+        self._lock = threading.Lock()
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._futures: set[concurrent.futures.Future[Any]] = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.blocking_threads, thread_name_prefix="slack-bot2-blocking"
+                )
+        return _shared_loop()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future[Any]:
+        """Schedule ``coro`` on the loop; safe to call from any thread."""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._track(coro), loop)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future: concurrent.futures.Future[Any]) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def join(self, timeout: float | None = None) -> None:
+        """Block until every submitted coroutine has finished."""
+        with self._lock:
+            futures = list(self._futures)
+        concurrent.futures.wait(futures, timeout)
+
+    async def _track(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await coro
+        except Exception:
+            logger.exception("Unhandled error in event loop task")
+            return None
+        finally:
+            self.in_flight -= 1
+
+    async def run_blocking(self, fn: Callable[..., Any], /, **kwargs: Any) -> Any:
+        """Await ``fn(**kwargs)`` run on the blocking-call executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, **kwargs)
+        )
+
+    def stop(self) -> None:
+        """Shut the executor down; the shared loop keeps running."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+_runners: dict[str, AsyncRunner] = {}
+_runners_lock = threading.Lock()
+
+
+def get_async_runner(key: str, blocking_threads: int) -> AsyncRunner:
+    """Return the runner of the endpoint identified by ``key``.
+
+    A runner whose executor size no longer matches the settings is replaced
+    and stopped; its running blocking calls still finish.
+    """
+    with _runners_lock:
+        runner = _runners.get(key)
+        if runner is not None and runner.blocking_threads == max(1, blocking_threads):
+            return runner
+        new_runner = AsyncRunner(blocking_threads)
+        _runners[key] = new_runner
+    if runner is not None:
+        runner.stop()
+    return new_runner
+
+
+def clear_async_runners() -> None:
+    with _runners_lock:
+        for runner in _runners.values():
+            runner.stop()
+        _runners.clear()
@@ -0,0 +1,143 @@
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class MessageRef:
+    channel: str
+    ts: str
+
+
+@dataclass(frozen=True, slots=True)
+class AppMention:
+    """An app_mention event; ``query`` is the text after the leading mention,
+    or None when the text does not start with one."""
+
+    ref: MessageRef
+    query: str | None
+    user: str | None
+    thread_ts: str | None
+    blocks: list[dict[str, Any]]
+    files: list[dict[str, Any]]
+
+    @property
+    def channel(self) -> str:
+        return self.ref.channel
+
+
+@dataclass(frozen=True, slots=True)
+class ReactionAdded:
+    """A reaction_added event; ``item`` is None unless it is on a message."""
+
+    reaction: str | None
+    user: str | None
+    item: MessageRef | None
+    item_channel: str | None
+
+    @property
+    def channel(self) -> str | None:
+        return self.item_channel
+
+
+@dataclass(frozen=True, slots=True)
+class Message:
+    """A message fetched from Slack, with what answering or summarizing it uses.
+
+    Instances are shared through the message cache, so neither they nor their
+    blocks may be changed.
+    """
+
+    ts: str
+    text: str
+    user: str | None
+    thread_ts: str | None
+    reply_count: int
+    blocks: list[dict[str, Any]]
+    files: list[dict[str, Any]]
+
+
+Event = AppMention | ReactionAdded
+
+
+def parse_app_mention(event: Mapping[str, Any]) -> AppMention:
+    text = event.get("text") or ""
+    query = None
+    if text.startswith("<@"):
+        query = text.split("> ", 1)[1] if "> " in text else text
+    return AppMention(
+        ref=MessageRef(event.get("channel") or "", event.get("ts") or ""),
+        query=query,
+        user=event.get("user"),
+        thread_ts=event.get("thread_ts"),
+        blocks=event.get("blocks") or [],
+        files=event.get("files") or [],
+    )
+
+
+def parse_reaction_added(event: Mapping[str, Any]) -> ReactionAdded:
+    item = event.get("item") or {}
+    channel = item.get("channel")
+    return ReactionAdded(
+        reaction=event.get("reaction"),
+        user=event.get("user"),
+        item=(
+            MessageRef(channel or "", item.get("ts") or "")
+            if item.get("type") == "message"
+            else None
+        ),
+        item_channel=channel,
+    )
+
+
+def parse_message(message: Mapping[str, Any]) -> Message:
+    return Message(
+        ts=message.get("ts") or "",
+        text=message.get("text") or "",
+        user=message.get("user"),
+        thread_ts=message.get("thread_ts"),
+        reply_count=message.get("reply_count") or 0,
+        blocks=message.get("blocks") or [],
+        files=message.get("files") or [],
+    )
+
+
+_PARSERS: dict[str, Callable[[Mapping[str, Any]], Event]] = {
+    "app_mention": parse_app_mention,
+    "reaction_added": parse_reaction_added,
+}
+
+
+def parse_event(event: Mapping[str, Any]) -> Event | None:
+    """The typed form of an event the endpoint handles, else None."""
+    parser = _PARSERS.get(event.get("type") or "")
+    return parser(event) if parser is not None else None
+
+
+def fill_blocks(
+    blocks: list[dict[str, Any]], answer: str | None
+) -> list[dict[str, Any]]:
+    """The original message's blocks with the answer in the first block.
+
+    A section's text is replaced; a rich text block's first section is
+    emptied and given the answer. ``blocks`` is left as it is: only the
+    dicts on the way to the answer are copied, the rest are shared.
+    """
+    if not blocks:
+        return []
+    first = blocks[0]
+    text = first.get("text")
+    elements = first.get("elements")
+    if isinstance(text, dict):
+        first = {**first, "text": {**text, "text": answer}}
+    elif (
+        isinstance(elements, list)
+        and elements
+        and isinstance(elements[0], dict)
+        and "elements" in elements[0]
+    ):
+        section = {**elements[0], "elements": [{"type": "text", "text": answer}]}
+        first = {**first, "elements": [section, *elements[1:]]}
+    else:
+        return blocks
+    return [first, *blocks[1:]]
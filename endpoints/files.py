@@ -0,0 +1,178 @@
+import logging
+import tempfile
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any
+from urllib.parse import urlsplit
+
+import requests
+
+from endpoints.cache import TTLCache
+from endpoints.outbox import workspace_key
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Downloads larger than this spill from memory to a temporary file.
+SPOOL_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 30.0
+UPLOAD_CACHE_SIZE = 4096
+UPLOAD_CACHE_TTL = 3600.0
+# The bot token is only ever sent to Slack's own file host.
+ALLOWED_HOSTS = frozenset({"files.slack.com"})
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+class UntrustedFileURL(Exception):
+    pass
+
+
+def download(
+    url: str,
+    token: str,
+    limit: int,
+    chunk_size: int = CHUNK_SIZE,
+    get: Callable[..., Any] | None = None,
+) -> IO[bytes]:
+    """Stream ``url`` into a spooled temporary file, at most ``limit`` bytes.
+
+    ``url`` must be an https URL on one of ``ALLOWED_HOSTS``, since the token
+    goes with the request. The caller owns the returned file and must close it.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "https" or parts.hostname not in ALLOWED_HOSTS:
+        raise UntrustedFileURL(f"refusing to download {url}")
+    response = (get or requests.get)(
+        url,
+        headers={"Authorization": f"Bearer {token}"},
+        stream=True,
+        timeout=DOWNLOAD_TIMEOUT,
+    )
+    try:
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f"download failed with status {response.status_code}"
+            )
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size):
+                size += len(chunk)
+                if size > limit:
+                    raise FileTooLarge(f"{url} is larger than {limit} bytes")
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+    finally:
+        response.close()
+
+
+# (app_id, workspace, Slack file ID): uploaded files belong to one Dify app
+UploadKey = tuple[str, str, str]
+
+
+class FilePipeline:
+    """Downloads Slack attachments and uploads them to Dify as file inputs.
+
+    Files larger than ``max_file_bytes``, and files that would push the event
+    over ``max_event_bytes``, are skipped. Upload results are cached by Dify
+    app, bot and Slack file ID, so a message that is reacted to again is not
+    re-downloaded, and an upload is never handed to another app or workspace.
+    Attachments are transferred concurrently, up to ``max_workers`` at a time.
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[str, IO[bytes], str], Any],
+        max_file_bytes: int,
+        max_event_bytes: int,
+        cache: TTLCache[UploadKey, dict[str, Any]],
+        max_workers: int = 4,
+        get: Callable[..., Any] | None = None,
+        app_id: str = "",
+    ) -> None:
+        self._upload = upload
+        self.app_id = app_id
+        self.max_file_bytes = max_file_bytes
+        self.max_event_bytes = max_event_bytes
+        self._cache = cache
+        self._max_workers = max_workers
+        self._get = get
+
+    def select(self, files: Iterable[Mapping]) -> list[Mapping]:
+        """Files that fit the per-file and per-event caps, in message order."""
+        selected = []
+        total = 0
+        for file in files:
+            if not file.get("id"):
+                continue
+            size = file.get("size") or self.max_file_bytes
+            if size > self.max_file_bytes:
+                logger.info("Skipping %s: %d bytes is over the limit", file["id"], size)
+                continue
+            if total + size > self.max_event_bytes:
+                logger.info("Skipping %s: event attachment budget used", file["id"])
+                continue
+            total += size
+            selected.append(file)
+        return selected
+
+    def attach(
+        self,
+        files: Iterable[Mapping],
+        token: str,
+        resolve: Callable[[str], Mapping],
+    ) -> list[dict[str, Any]]:
+        """Return Dify file parameters for ``files``; failures are skipped.
+
+        ``resolve`` looks up file metadata by Slack file ID (``files.info``).
+        The download URL always comes from it: anyone who can post an event
+        controls the payload's ``url_private``, and the token is sent there.
+        """
+        selected = self.select(files)
+        pending = [
+            f for f in selected if self._cache.get(self._key(token, f["id"])) is None
+        ]
+        if pending:
+            workers = min(self._max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda f: self._transfer(f, token, resolve), pending))
+        attached = []
+        for file in selected:
+            parameter = self._cache.get(self._key(token, file["id"]))
+            if parameter is not None:
+                attached.append(parameter)
+        return attached
+
+    def _key(self, token: str, file_id: str) -> UploadKey:
+        return (self.app_id, workspace_key(token), file_id)
+
+    def _transfer(
+        self, file: Mapping, token: str, resolve: Callable[[str], Mapping]
+    ) -> None:
+        try:
+            file = resolve(file["id"])
+            body = download(
+                file["url_private"], token, self.max_file_bytes, get=self._get
+            )
+            with body:
+                uploaded = self._upload(
+                    file.get("name") or file["id"],
+                    body,
+                    file.get("mimetype") or "application/octet-stream",
+                )
+            self._cache.set(self._key(token, file["id"]), uploaded.to_app_parameter())
+        except Exception as e:
+            logger.warning("Failed to attach Slack file %s: %s", file.get("id"), e)
+
+
+# Dify file parameters, shared by every endpoint and keyed per app and bot.
+upload_cache: TTLCache[UploadKey, dict[str, Any]] = TTLCache(
+    maxsize=UPLOAD_CACHE_SIZE, ttl=UPLOAD_CACHE_TTL
+)
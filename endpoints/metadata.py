@@ -0,0 +1,229 @@
+import logging
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200
+REFRESH_INTERVAL = 3600.0
+# also the shortest refresh interval: a full reload costs one users.list and
+# conversations.list call per page
+RETRY_INTERVAL = 60.0
+USERS = "users"
+CHANNELS = "channels"
+
+
+def paginate(
+    fetch: Callable[..., Any], key: str, /, **args: Any
+) -> Iterator[list[dict[str, Any]]]:
+    """Pages of ``response[key]`` from a cursor-paginated Web API method."""
+    cursor = None
+    while True:
+        response = fetch(**args, **({"cursor": cursor} if cursor else {}))
+        yield response.get(key) or []
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return
+
+
+def display_name(user: dict[str, Any]) -> str | None:
+    """The name Slack shows for a ``users.info``/``users.list`` member."""
+    profile = user.get("profile") or {}
+    return (
+        profile.get("display_name")
+        or profile.get("real_name")
+        or user.get("real_name")
+        or user.get("name")
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class UserMeta:
+    name: str
+    tz: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelMeta:
+    name: str
+    is_private: bool
+
+
+class MetadataCache:
+    """User and channel metadata of one workspace, kept in memory.
+
+    A background thread pages through ``users_list`` and
+    ``conversations_list`` on ``start`` and again every ``refresh_interval``
+    seconds, updating entries in place and dropping the ones that are gone,
+    so lookups never call Slack. Until the first load finishes lookups
+    return None and events go out without the extra fields.
+
+    Users and channels are refreshed on their own schedules: a kind that
+    fails (say, a token without the channels scope) is retried after
+    ``RETRY_INTERVAL`` seconds, doubling up to ``refresh_interval``, without
+    reloading the other. ``loaded`` is set once both kinds have been tried.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        refresh_interval: float = REFRESH_INTERVAL,
+        page_size: int = PAGE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self.refresh_interval = max(refresh_interval, RETRY_INTERVAL)
+        self.page_size = page_size
+        self.users: dict[str, UserMeta] = {}
+        self.channels: dict[str, ChannelMeta] = {}
+        # successful reloads of either kind, and when the last one finished
+        self.refreshes = 0
+        self.refreshed_at: float | None = None
+        self.loaded = threading.Event()
+        self._clock = clock
+        self._due = {USERS: 0.0, CHANNELS: 0.0}
+        self._failures = {USERS: 0, CHANNELS: 0}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def user(self, user_id: str | None) -> UserMeta | None:
+        return self.users.get(user_id) if user_id else None
+
+    def channel(self, channel_id: str | None) -> ChannelMeta | None:
+        return self.channels.get(channel_id) if channel_id else None
+
+    def inputs(self, channel: str | None, user: str | None) -> dict[str, Any]:
+        """Dify input fields known for ``channel`` and ``user``."""
+        fields: dict[str, Any] = {}
+        if (channel_meta := self.channel(channel)) is not None:
+            fields["channel_name"] = channel_meta.name
+            fields["channel_is_private"] = channel_meta.is_private
+        if (user_meta := self.user(user)) is not None:
+            fields["user_name"] = user_meta.name
+            if user_meta.tz:
+                fields["user_tz"] = user_meta.tz
+        return fields
+
+    def refresh(self) -> None:
+        """Reload every user and channel from Slack."""
+        self._refresh_users()
+        self._refreshed()
+        self._refresh_channels()
+        self._refreshed()
+        self.loaded.set()
+
+    def _refreshed(self) -> None:
+        self.refreshes += 1
+        self.refreshed_at = time.time()
+
+    def _refresh_users(self) -> None:
+        seen: set[str] = set()
+        for page in paginate(self._client.users_list, "members", limit=self.page_size):
+            for member in page:
+                user_id = member.get("id")
+                if not user_id or member.get("deleted"):
+                    continue
+                seen.add(user_id)
+                tz = member.get("tz")
+                # a workspace has few distinct time zones
+                meta = UserMeta(
+                    display_name(member) or user_id, sys.intern(tz) if tz else None
+                )
+                if self.users.get(user_id) != meta:
+                    self.users[user_id] = meta
+        for user_id in self.users.keys() - seen:
+            self.users.pop(user_id, None)
+
+    def _refresh_channels(self) -> None:
+        seen: set[str] = set()
+        for page in paginate(
+            self._client.conversations_list,
+            "channels",
+            types="public_channel,private_channel",
+            exclude_archived=True,
+            limit=self.page_size,
+        ):
+            for channel in page:
+                channel_id = channel.get("id")
+                if not channel_id:
+                    continue
+                seen.add(channel_id)
+                meta = ChannelMeta(
+                    channel.get("name") or channel_id, bool(channel.get("is_private"))
+                )
+                if self.channels.get(channel_id) != meta:
+                    self.channels[channel_id] = meta
+        for channel_id in self.channels.keys() - seen:
+            self.channels.pop(channel_id, None)
+
+    def start(self) -> None:
+        """Start the refresh thread if it is not running yet."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="slack-bot2-metadata", daemon=True
+                )
+                self._thread.start()
+
+    def refresh_due(self) -> float:
+        """Refresh each kind whose time has come; seconds until the next one."""
+        refreshers = {USERS: self._refresh_users, CHANNELS: self._refresh_channels}
+        for kind, refresh in refreshers.items():
+            if self._due[kind] > self._clock():
+                continue
+            try:
+                refresh()
+            except Exception as e:
+                self._failures[kind] += 1
+                delay = min(
+                    RETRY_INTERVAL * 2 ** (self._failures[kind] - 1),
+                    self.refresh_interval,
+                )
+                logger.warning(
+                    "Failed to refresh Slack %s, retrying in %.0fs: %s", kind, delay, e
+                )
+            else:
+                self._failures[kind] = 0
+                self._refreshed()
+                delay = self.refresh_interval
+            self._due[kind] = self._clock() + delay
+        self.loaded.set()
+        return max(0.0, min(self._due.values()) - self._clock())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.refresh_due())
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_caches: dict[str, MetadataCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_metadata_cache(
+    token: str, client: Any, refresh_interval: float = REFRESH_INTERVAL
+) -> MetadataCache:
+    """Return the process-wide cache for the bot token, loading it on first use."""
+    with _caches_lock:
+        cache = _caches.get(token)
+        if cache is None:
+            cache = MetadataCache(client, refresh_interval)
+            _caches[token] = cache
+    cache.start()
+    return cache
+
+
+def clear_metadata_caches() -> None:
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.stop()
+        _caches.clear()
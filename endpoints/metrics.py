@@ -0,0 +1,234 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "slack_bot2"
+# Upper bounds in seconds; anything slower lands in the +Inf bucket.
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are interpolated per bucket."""
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.max
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = min(self.bounds[i], self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+class _Span:
+    __slots__ = ("_metrics", "_stage", "_started")
+
+    def __init__(self, metrics: "Metrics", stage: str) -> None:
+        self._metrics = metrics
+        self._stage = stage
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self._metrics.observe(self._stage, time.perf_counter() - self._started)
+
+
+class Metrics:
+    """Process-wide stage latency histograms and event counters.
+
+    Disabled by default: ``span`` then returns a shared no-op context and
+    ``observe``/``increment`` return before taking the lock, so instrumented
+    code pays one attribute check per call.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = enabled
+        self._buckets = buckets
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stages: dict[str, Histogram] = {}
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], int] = {}
+        self._gauges: dict[str, Callable[[], Mapping[str, float]]] = {}
+        self._last_logged = clock()
+
+    def span(self, stage: str) -> AbstractContextManager[None]:
+        """Time the ``with`` block as one observation of ``stage``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram(self._buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_gauges(
+        self, name: str, collect: Callable[[], Mapping[str, float]]
+    ) -> None:
+        """Export each value ``collect`` returns as the gauge ``<name>_<key>``.
+
+        ``collect`` is called on every snapshot and export, so components keep
+        their own counters and pay nothing per event.
+        """
+        with self._lock:
+            self._gauges[name] = collect
+
+    def gauges(self) -> dict[str, float]:
+        with self._lock:
+            sources = sorted(self._gauges.items())
+        values: dict[str, float] = {}
+        for name, collect in sources:
+            try:
+                collected = collect()
+            except Exception as e:
+                logger.warning("Failed to collect %s metrics: %s", name, e)
+                continue
+            for key, value in collected.items():
+                values[f"{name}_{key}"] = value
+        return values
+
+    def snapshot(self) -> dict[str, Any]:
+        gauges = self.gauges()
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "max": h.max,
+                    **{f"p{int(q * 100)}": h.quantile(q) for q in QUANTILES},
+                }
+                for stage, h in self._stages.items()
+            }
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+        return {"stages": stages, "counters": counters, "gauges": gauges}
+
+    def render_prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        gauges = self.gauges()
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {PREFIX}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, count in zip(h.bounds, h.counts, strict=False):
+                    cumulative += count
+                    lines.append(
+                        f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",'
+                        f'le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} '
+                    f"{h.count}"
+                )
+                lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(
+                    f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {h.count}'
+                )
+            names = sorted({name for name, _ in self._counters})
+            for name in names:
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                for (counter, labels), value in sorted(self._counters.items()):
+                    if counter != name:
+                        continue
+                    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                    lines.append(f"{PREFIX}_{name}_total{{{rendered}}} {value}")
+        for gauge, reading in sorted(gauges.items()):
+            lines.append(f"# TYPE {PREFIX}_{gauge} gauge")
+            lines.append(f"{PREFIX}_{gauge} {reading}")
+        return "\n".join(lines) + "\n"
+
+    def maybe_log(self, interval: float) -> None:
+        """Log a JSON snapshot if ``interval`` seconds passed since the last."""
+        if not self.enabled or interval <= 0:
+            return
+        now = self._clock()
+        with self._lock:
+            if now - self._last_logged < interval:
+                return
+            self._last_logged = now
+        logger.info("metrics %s", json.dumps(self.snapshot(), sort_keys=True))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._last_logged = self._clock()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared by every endpoint in the process.
+metrics = Metrics()
@@ -0,0 +1,406 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from endpoints.metrics import metrics
+from endpoints.worker_pool import stage_stats
+
+logger = logging.getLogger(__name__)
+
+# Retry delays per channel double from BACKOFF_BASE up to BACKOFF_MAX; an
+# answer still undelivered after MAX_AGE seconds is dropped.
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+MAX_AGE = 24 * 3600.0
+POLL_INTERVAL = 1.0
+# rewrite the log once it holds this many delivered entries
+COMPACT_AFTER = 1000
+
+
+def workspace_key(token: str) -> str:
+    """Stable id for a bot token; tokens themselves are never written to disk."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def post_message(client: Any, message: dict[str, Any]) -> None:
+    """Send one outbox message: an edit when it carries ``ts``, else a post."""
+    started = time.perf_counter()
+    if "ts" in message:
+        client.chat_update(**message)
+    else:
+        client.chat_postMessage(**message)
+    stage_stats.record("slack_post", time.perf_counter() - started)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed post may succeed later (network, 429 or 5xx)."""
+    from slack_sdk.errors import SlackApiError
+
+    if not isinstance(error, SlackApiError):
+        return True
+    status = getattr(error.response, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+@dataclass(slots=True)
+class OutboxEntry:
+    id: int
+    workspace: str
+    message: dict[str, Any]
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def channel(self) -> str:
+        return str(self.message.get("channel"))
+
+
+@dataclass(slots=True)
+class _Backoff:
+    attempts: int = 0
+    next_at: float = 0.0
+
+
+class Outbox:
+    """Append-only JSON lines log of answers waiting to be posted to Slack.
+
+    ``send`` records the messages before posting them, so an answer that
+    fails with a network error or a Slack 5xx, or is cut short by a restart,
+    is retried by the drainer thread instead of being lost. Delivery is at
+    least once: a crash between a post and its ``done`` record reposts it.
+
+    Writers append under a lock and share fsyncs: a writer whose records
+    were covered by another thread's fsync returns without its own, so a
+    burst of answers costs far fewer fsyncs than answers. ``done`` records
+    are not fsynced; the log is rewritten with only pending entries once
+    enough of them accumulate.
+
+    Bot tokens are not persisted. Entries recovered at start-up wait until a
+    client for their workspace is registered by the next event it sends.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        clock: Callable[[], float] = time.time,
+        fsync: Callable[[int], None] = os.fsync,
+        drainer: bool = True,
+    ) -> None:
+        self.path = path
+        self._drainer = drainer
+        self._clock = clock
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: dict[int, OutboxEntry] = {}
+        self._inflight: set[int] = set()
+        self._clients: dict[str, Any] = {}
+        self._backoff: dict[tuple[str, str], _Backoff] = {}
+        self._done_records = 0
+        self._written = 0
+        self._synced = 0
+        self.fsyncs = 0
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._recover()
+        self._ids = itertools.count(max(self._pending, default=0) + 1)
+        self._file = open(path, "ab")  # noqa: SIM115
+
+    def _recover(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # a record torn by a crash mid-write
+                logger.warning("Skipping unreadable outbox record in %s", self.path)
+                continue
+            if record.get("op") == "add":
+                entry = OutboxEntry(
+                    record["id"],
+                    record["workspace"],
+                    record["message"],
+                    record["created_at"],
+                )
+                self._pending[entry.id] = entry
+            else:
+                self._pending.pop(record.get("id"), None)
+                self._done_records += 1
+        if self._pending:
+            logger.info(
+                "Recovered %d undelivered answers from %s",
+                len(self._pending),
+                self.path,
+            )
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def register(self, workspace: str, client: Any) -> None:
+        """Make ``client`` the one used to deliver ``workspace``'s entries."""
+        if self._clients.get(workspace) is not client:
+            self._clients[workspace] = client
+            if self._pending:
+                self._wake.set()
+
+    def add(
+        self, workspace: str, messages: Iterable[dict[str, Any]]
+    ) -> list[OutboxEntry]:
+        """Durably record ``messages``; they are owned by the caller until
+        ``done`` or ``release``, so the drainer leaves them alone."""
+        now = self._clock()
+        with self._lock:
+            entries = [
+                OutboxEntry(next(self._ids), workspace, message, now)
+                for message in messages
+            ]
+            for entry in entries:
+                self._pending[entry.id] = entry
+                self._inflight.add(entry.id)
+        self._append(
+            [
+                {
+                    "op": "add",
+                    "id": e.id,
+                    "workspace": e.workspace,
+                    "message": e.message,
+                    "created_at": e.created_at,
+                }
+                for e in entries
+            ],
+            durable=True,
+        )
+        return entries
+
+    def done(self, entries: Iterable[OutboxEntry]) -> None:
+        ids = [e.id for e in entries]
+        with self._lock:
+            for entry_id in ids:
+                self._pending.pop(entry_id, None)
+                self._inflight.discard(entry_id)
+            self._done_records += len(ids)
+        self._append([{"op": "done", "id": i} for i in ids], durable=False)
+        if self._done_records >= COMPACT_AFTER and (
+            self._done_records > 2 * len(self._pending)
+        ):
+            self.compact()
+
+    def release(self, entries: Iterable[OutboxEntry]) -> None:
+        """Hand entries the caller could not deliver over to the drainer."""
+        with self._lock:
+            for entry in entries:
+                self._inflight.discard(entry.id)
+        self.start()
+        self._wake.set()
+
+    def _has_backlog(self, entry: OutboxEntry) -> bool:
+        """Whether answers recorded before ``entry`` for its channel wait."""
+        with self._lock:
+            return any(
+                e.id < entry.id
+                and e.workspace == entry.workspace
+                and e.channel == entry.channel
+                for e in self._pending.values()
+            )
+
+    def send(self, client: Any, workspace: str, messages: list[dict[str, Any]]) -> None:
+        """Record ``messages`` and post them in order.
+
+        Posts that fail with a retryable error are left to the drainer, as
+        are all of them when the channel still has a backlog, so answers
+        reach a channel in the order they were recorded. Other errors drop
+        the remaining messages and are raised.
+        """
+        self.register(workspace, client)
+        entries = self.add(workspace, messages)
+        if entries and self._has_backlog(entries[0]):
+            metrics.increment("outbox", len(entries), outcome="queued")
+            self.release(entries)
+            return
+        for i, entry in enumerate(entries):
+            try:
+                post_message(client, entry.message)
+            except Exception as e:
+                if not is_retryable(e):
+                    self.done(entries[i:])
+                    metrics.increment("outbox", len(entries) - i, outcome="dropped")
+                    raise
+                logger.warning(
+                    "Posting to %s failed, queued for retry: %s", entry.channel, e
+                )
+                metrics.increment("outbox", len(entries) - i, outcome="queued")
+                self.release(entries[i:])
+                return
+            self.done([entry])
+
+    def _append(self, records: list[dict[str, Any]], durable: bool) -> None:
+        data = b"".join(
+            json.dumps(r, separators=(",", ":")).encode() + b"\n" for r in records
+        )
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            self._written += 1
+            seq = self._written
+        if durable:
+            self._sync(seq)
+
+    def _sync(self, seq: int) -> None:
+        with self._sync_lock:
+            if self._synced >= seq:
+                # another writer's fsync already covered this write
+                return
+            with self._lock:
+                target = self._written
+                fd = self._file.fileno()
+            self._fsync(fd)
+            self._synced = target
+            self.fsyncs += 1
+
+    def compact(self) -> None:
+        """Rewrite the log with only the pending entries."""
+        tmp_path = f"{self.path}.tmp"
+        with self._sync_lock, self._lock:
+            with open(tmp_path, "wb") as f:
+                for e in self._pending.values():
+                    record = {
+                        "op": "add",
+                        "id": e.id,
+                        "workspace": e.workspace,
+                        "message": e.message,
+                        "created_at": e.created_at,
+                    }
+                    f.write(json.dumps(record, separators=(",", ":")).encode())
+                    f.write(b"\n")
+                f.flush()
+                self._fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._file.close()
+            self._file = open(self.path, "ab")  # noqa: SIM115
+            self._synced = self._written
+            self._done_records = 0
+
+    def drain_once(self) -> int:
+        """Post what is due, channel by channel. Returns the number posted."""
+        now = self._clock()
+        with self._lock:
+            batches: dict[tuple[str, str], list[OutboxEntry]] = {}
+            for entry in self._pending.values():
+                if entry.id not in self._inflight:
+                    batches.setdefault((entry.workspace, entry.channel), []).append(
+                        entry
+                    )
+            for batch in batches.values():
+                self._inflight.update(e.id for e in batch)
+        posted = 0
+        for key, batch in batches.items():
+            try:
+                posted += self._drain_channel(key, batch, now)
+            finally:
+                with self._lock:
+                    self._inflight.difference_update(e.id for e in batch)
+        return posted
+
+    def _drain_channel(
+        self, key: tuple[str, str], batch: list[OutboxEntry], now: float
+    ) -> int:
+        expired = [e for e in batch if now - e.created_at > MAX_AGE]
+        expired_ids = {e.id for e in expired}
+        if expired:
+            logger.error(
+                "Dropping %d answers for %s undelivered after %.0fs",
+                len(expired),
+                key[1],
+                MAX_AGE,
+            )
+            self.done(expired)
+            metrics.increment("outbox", len(expired), outcome="dropped")
+        backoff = self._backoff.get(key)
+        client = self._clients.get(key[0])
+        if client is None or (backoff is not None and backoff.next_at > now):
+            return 0
+        posted = 0
+        for entry in batch:
+            if entry.id in expired_ids:
+                continue
+            try:
+                post_message(client, entry.message)
+            except Exception as e:
+                if is_retryable(e):
+                    backoff = self._backoff.setdefault(key, _Backoff())
+                    delay = min(BACKOFF_BASE * 2**backoff.attempts, BACKOFF_MAX)
+                    backoff.attempts += 1
+                    backoff.next_at = now + delay
+                    logger.warning(
+                        "Retrying posts to %s in %.0fs: %s", key[1], delay, e
+                    )
+                    return posted
+                logger.error("Dropping answer for %s: %s", key[1], e)
+                metrics.increment("outbox", outcome="dropped")
+            else:
+                posted += 1
+                metrics.increment("outbox", outcome="delivered")
+            self.done([entry])
+        self._backoff.pop(key, None)
+        return posted
+
+    def start(self) -> None:
+        """Start the drainer thread if it is not running yet."""
+        if self._thread is not None or not self._drainer:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="slack-bot2-outbox", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+            if self._pending:
+                try:
+                    self.drain_once()
+                except Exception:
+                    logger.exception("Unhandled error in outbox drainer")
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        with self._sync_lock, self._lock:
+            self._file.close()
+
+
+_outboxes: dict[str, Outbox] = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(path: str) -> Outbox:
+    """Return the process-wide outbox for ``path``, recovering its backlog."""
+    with _outboxes_lock:
+        outbox = _outboxes.get(path)
+        if outbox is None:
+            outbox = Outbox(path)
+            if len(outbox):
+                outbox.start()
+            _outboxes[path] = outbox
+        return outbox
+
+
+def clear_outboxes() -> None:
+    with _outboxes_lock:
+        for outbox in _outboxes.values():
+            outbox.close()
+        _outboxes.clear()
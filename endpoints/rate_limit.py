@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from endpoints.cache import TTLCache
+from endpoints.metrics import metrics
+
+if TYPE_CHECKING:
+    from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+# Requests per minute for each Slack Web API tier.
+# https://api.slack.com/apis/rate-limits
+TIER_1 = 1
+TIER_2 = 20
+TIER_3 = 50
+TIER_4 = 100
+# chat.postMessage is "special": roughly one message per second per channel.
+POST_MESSAGE = 60
+
+METHOD_LIMITS: dict[str, int] = {
+    "chat_postMessage": POST_MESSAGE,
+    "chat_update": TIER_3,
+    "chat_getPermalink": TIER_4,
+    "conversations_history": TIER_3,
+    "conversations_replies": TIER_3,
+    "conversations_info": TIER_3,
+    "conversations_list": TIER_2,
+    "users_info": TIER_4,
+    "users_list": TIER_2,
+    "files_info": TIER_4,
+}
+
+# Posting an answer we already paid an LLM call for is worth waiting longer.
+POST_METHODS = frozenset({"chat_postMessage", "chat_update"})
+# Methods whose limit applies to each channel rather than the whole workspace.
+PER_CHANNEL_METHODS = POST_METHODS
+
+
+class TokenBucket:
+    """Classic token bucket. ``acquire`` blocks until a token is available."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = clock()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, possibly going into debt; return how long to wait."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available now, without going into debt."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    async def acquire_async(
+        self, sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ) -> float:
+        """``acquire`` for coroutines: the wait holds no thread."""
+        wait = self._reserve()
+        if wait > 0:
+            await sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so nobody calls again for ``seconds`` (Retry-After)."""
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated = self._clock()
+
+
+class RateLimitScheduler:
+    """Per-workspace token buckets, one per Web API method (and per channel
+    for posting methods). Idle per-channel buckets are forgotten over time.
+    """
+
+    def __init__(
+        self,
+        sleep: Callable[[float], Any] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._buckets: TTLCache[str, TokenBucket] = TTLCache(
+            maxsize=4096, ttl=600.0, sliding=True
+        )
+        self._lock = threading.Lock()
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self.waiting = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.overdrawn = 0
+        self.throttle_wait = 0.0
+
+    def bucket(self, method: str, channel: str | None = None) -> TokenBucket:
+        key = f"{method}:{channel}" if method in PER_CHANNEL_METHODS else method
+        per_minute = METHOD_LIMITS.get(method, TIER_3)
+        return self._buckets.get_or_create(
+            key,
+            lambda: TokenBucket(
+                rate=per_minute / 60.0,
+                burst=max(1.0, per_minute / 10.0),
+                sleep=self._sleep,
+            ),
+        )
+
+    def acquire(self, method: str, channel: str | None = None) -> None:
+        with self._lock:
+            self.waiting += 1
+        waited = 0.0
+        try:
+            waited = self.bucket(method, channel).acquire()
+        finally:
+            self._done_waiting(waited)
+
+    async def acquire_async(self, method: str, channel: str | None = None) -> None:
+        with self._lock:
+            self.waiting += 1
+        waited = 0.0
+        try:
+            waited = await self.bucket(method, channel).acquire_async(self._async_sleep)
+        finally:
+            self._done_waiting(waited)
+
+    def _done_waiting(self, waited: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if waited > 0:
+                self.throttled += 1
+                self.throttle_wait += waited
+
+    def try_acquire(self, method: str, channel: str | None = None) -> bool:
+        """Take a token without waiting; count the call as overdrawn if none."""
+        if self.bucket(method, channel).try_acquire():
+            return True
+        with self._lock:
+            self.overdrawn += 1
+        return False
+
+    def on_rate_limited(
+        self, method: str, retry_after: float, channel: str | None = None
+    ) -> None:
+        with self._lock:
+            self.rate_limited += 1
+        self.bucket(method, channel).pause(retry_after)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "queue_depth": self.waiting,
+                "throttled": self.throttled,
+                "rate_limited": self.rate_limited,
+                "overdrawn": self.overdrawn,
+                "throttle_wait_seconds": self.throttle_wait,
+            }
+
+
+def _retry_after(error: "SlackApiError") -> float | None:
+    """Seconds to wait if ``error`` is an HTTP 429, otherwise None."""
+    response = error.response
+    if getattr(response, "status_code", None) != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after") or 1
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class RateLimitedClient:
+    """Wraps a WebClient so known Web API methods go through the scheduler.
+
+    Calls wait for their method's bucket, and a 429 pauses the bucket for
+    ``Retry-After`` seconds and retries instead of losing the call. With
+    ``blocking=False`` (calls made while Slack waits for the HTTP response)
+    a read never sleeps: it goes out even when its bucket is empty, and a 429
+    pauses the bucket for later callers and is raised. Posts still wait and
+    retry, since they carry an answer that is already paid for.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        scheduler: RateLimitScheduler,
+        max_retries: int = 3,
+        max_post_retries: int = 10,
+        blocking: bool = True,
+    ) -> None:
+        self._client = client
+        self._scheduler = scheduler
+        self._max_retries = max_retries if blocking else 0
+        self._max_post_retries = max_post_retries
+        self._blocking = blocking
+
+    @property
+    def client(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in METHOD_LIMITS or not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            from slack_sdk.errors import SlackApiError
+
+            retries = (
+                self._max_post_retries if name in POST_METHODS else self._max_retries
+            )
+            blocking = self._blocking or name in POST_METHODS
+            channel = kwargs.get("channel")
+            for attempt in range(retries + 1):
+                if blocking:
+                    self._scheduler.acquire(name, channel)
+                else:
+                    self._scheduler.try_acquire(name, channel)
+                try:
+                    return attr(*args, **kwargs)
+                except SlackApiError as e:
+                    retry_after = _retry_after(e)
+                    if retry_after is None:
+                        raise
+                    if attempt == retries:
+                        if not blocking:
+                            self._scheduler.on_rate_limited(name, retry_after, channel)
+                        raise
+                    logger.warning(
+                        "Slack rate limited %s, retrying in %.1fs", name, retry_after
+                    )
+                    self._scheduler.on_rate_limited(name, retry_after, channel)
+            raise AssertionError("unreachable")
+
+        return call
+
+
+class AsyncRateLimitedClient(RateLimitedClient):
+    """``RateLimitedClient`` for an ``AsyncWebClient``.
+
+    Calls await their bucket and a 429's ``Retry-After`` with asyncio, so a
+    throttled event holds no thread.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in METHOD_LIMITS or not callable(attr):
+            return attr
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            from slack_sdk.errors import SlackApiError
+
+            retries = (
+                self._max_post_retries if name in POST_METHODS else self._max_retries
+            )
+            channel = kwargs.get("channel")
+            for attempt in range(retries + 1):
+                await self._scheduler.acquire_async(name, channel)
+                try:
+                    return await attr(*args, **kwargs)
+                except SlackApiError as e:
+                    retry_after = _retry_after(e)
+                    if retry_after is None or attempt == retries:
+                        raise
+                    logger.warning(
+                        "Slack rate limited %s, retrying in %.1fs", name, retry_after
+                    )
+                    self._scheduler.on_rate_limited(name, retry_after, channel)
+            raise AssertionError("unreachable")
+
+        return call
+
+
+_schedulers: dict[str, RateLimitScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(workspace: str) -> RateLimitScheduler:
+    """Return the process-wide scheduler for ``workspace``."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(workspace)
+        if scheduler is None:
+            scheduler = RateLimitScheduler()
+            _schedulers[workspace] = scheduler
+        return scheduler
+
+
+def clear_schedulers() -> None:
+    with _schedulers_lock:
+        _schedulers.clear()
+
+
+def scheduler_stats() -> dict[str, float]:
+    """``RateLimitScheduler.stats`` summed over every workspace."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    totals: dict[str, float] = {}
+    for scheduler in schedulers:
+        for name, value in scheduler.stats().items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+metrics.register_gauges("rate_limit", scheduler_stats)
@@ -0,0 +1,168 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+FORMAT_PLAIN = "plain"
+FORMAT_MRKDWN = "mrkdwn"
+
+# Slack truncates long message text and rejects section blocks over 3000
+# characters; answers are posted in parts that stay under both.
+MESSAGE_LIMIT = 3900
+SECTION_LIMIT = 3000
+FENCE = "```"
+
+_INLINE = re.compile(
+    r"(?P<code>`[^`\n]+`)"
+    r"|(?P<entity><(?:[@#!]|https?://|mailto:)[^>\n]*>)"
+    r"|\[(?P<label>[^\]\n]+)\]\((?P<url>[^)\s]+)\)"
+    r"|\*\*(?P<bold>.+?)\*\*"
+    r"|__(?P<bold2>.+?)__"
+    r"|~~(?P<strike>.+?)~~"
+    r"|(?<![\w*])\*(?P<italic>[^*\s][^*\n]*?)\*(?![\w*])"
+    r"|(?P<escape>[&<>])"
+)
+_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+_HEADING = re.compile(r"#{1,6}\s+(.*?)\s*#*\s*$")
+_BULLET = re.compile(r"(\s*)[-*+]\s+(.*)")
+_QUOTE = re.compile(r">\s?(.*)")
+_RULE = re.compile(r"(?:-{3,}|\*{3,}|_{3,})\s*")
+
+
+def _inline(text: str) -> str:
+    return _INLINE.sub(_replace, text)
+
+
+def _replace(match: re.Match[str]) -> str:
+    kind = match.lastgroup
+    if kind in ("code", "entity"):
+        return match.group(0)
+    if kind == "url":
+        return f"<{match['url']}|{_inline(match['label'])}>"
+    if kind in ("bold", "bold2"):
+        return f"*{_inline(match[kind])}*"
+    if kind == "strike":
+        return f"~{_inline(match['strike'])}~"
+    if kind == "italic":
+        return f"_{_inline(match['italic'])}_"
+    return _ESCAPES[match.group(0)]
+
+
+def markdown_to_mrkdwn(text: str) -> str:
+    """Convert Markdown to Slack mrkdwn in one pass over the lines.
+
+    Code blocks are copied verbatim (minus the fence's language tag); inline
+    code, Slack mentions and links in ``<...>`` form are left untouched.
+    """
+    lines = []
+    in_code = False
+    for line in text.split("\n"):
+        stripped = line.lstrip()
+        if stripped.startswith(FENCE):
+            in_code = not in_code
+            lines.append(FENCE)
+            continue
+        if in_code:
+            lines.append(line)
+            continue
+        if match := _HEADING.match(stripped):
+            lines.append(f"*{_inline(match.group(1))}*")
+        elif match := _BULLET.match(line):
+            lines.append(f"{match.group(1)}• {_inline(match.group(2))}")
+        elif match := _QUOTE.match(stripped):
+            lines.append(f">{_inline(match.group(1))}")
+        elif _RULE.fullmatch(stripped):
+            lines.append("──────────")
+        else:
+            lines.append(_inline(line))
+    return "\n".join(lines)
+
+
+def _cut(line: str, limit: int) -> list[str]:
+    """Split one overlong line at spaces, or hard when there are none."""
+    pieces = []
+    while len(line) > limit:
+        cut = line.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip(" ")
+    pieces.append(line)
+    return pieces
+
+
+def split_message(text: str, limit: int) -> list[str]:
+    """Split ``text`` into parts of at most ``limit`` characters.
+
+    Parts end at a paragraph break when one falls in the second half of the
+    part, otherwise at a line break; only lines longer than ``limit`` are cut
+    mid-line. A code block that spans parts is closed at the end of one part
+    and reopened at the start of the next, so each part renders on its own.
+    """
+    if len(text) <= limit:
+        return [text]
+    # room for the fence that may have to be added to each end
+    budget = max(limit - 2 * (len(FENCE) + 1), 1)
+    parts: list[str] = []
+    current: list[str] = []
+    size = 0
+    in_code = False
+    # index in ``current`` just after the last blank line outside code
+    paragraph = 0
+    code_at: list[bool] = []
+
+    def flush(upto: int) -> None:
+        nonlocal current, size, paragraph, code_at
+        head, tail = current[:upto], current[upto:]
+        head_code = code_at[upto - 1] if upto else False
+        body = "\n".join(head).strip("\n")
+        if head_code:
+            body += f"\n{FENCE}"
+        if body:
+            parts.append(body)
+        current = ([FENCE] if head_code else []) + tail
+        code_at = ([True] if head_code else []) + code_at[upto:]
+        size = sum(len(line) + 1 for line in current)
+        paragraph = 0
+
+    for raw in text.split("\n"):
+        for line in _cut(raw, budget) if len(raw) > budget else [raw]:
+            if size + len(line) > budget and current:
+                flush(paragraph if paragraph * 2 > len(current) else len(current))
+                if size + len(line) > budget and current:
+                    flush(len(current))
+            if line.lstrip().startswith(FENCE):
+                in_code = not in_code
+            current.append(line)
+            code_at.append(in_code)
+            size += len(line) + 1
+            if not line.strip() and not in_code:
+                paragraph = len(current)
+    if current:
+        flush(len(current))
+    return parts or [""]
+
+
+@dataclass(frozen=True, slots=True)
+class MessagePart:
+    """One message of a rendered answer; ``blocks`` is empty for plain text."""
+
+    text: str
+    blocks: list[dict[str, Any]] = field(default_factory=list)
+
+
+def render_answer(
+    answer: str, answer_format: str = FORMAT_PLAIN, limit: int = MESSAGE_LIMIT
+) -> list[MessagePart]:
+    """Render a Dify answer into the messages to post, in order."""
+    if answer_format == FORMAT_MRKDWN:
+        return [
+            MessagePart(
+                text=part,
+                blocks=[
+                    {"type": "section", "text": {"type": "mrkdwn", "text": section}}
+                    for section in split_message(part, SECTION_LIMIT)
+                ],
+            )
+            for part in split_message(markdown_to_mrkdwn(answer), limit)
+        ]
+    return [MessagePart(text=part) for part in split_message(answer, limit)]
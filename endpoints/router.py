@@ -0,0 +1,111 @@
+import re
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from endpoints.cache import TTLCache
+from endpoints.routing import RoutingTable, compile_routing_rules
+
+URL_VERIFICATION = "url_verification"
+EVENT_CALLBACK = "event_callback"
+
+# Event types the endpoint has a handler for. Anything else (plain message
+# events, message_changed, bot echoes, ...) is acknowledged without decoding.
+HANDLED_EVENTS = ("app_mention", "reaction_added")
+
+_RELEVANT_TOKENS = tuple(
+    f'"{name}"'.encode() for name in (URL_VERIFICATION, *HANDLED_EVENTS)
+)
+_REACTION_RE = re.compile(rb'"reaction"\s*:\s*"([^"\\]*)"')
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledSettings:
+    """The parts of the endpoint settings the router consults per event."""
+
+    target_reactions: frozenset[str]
+    allow_retry: bool
+    routes: RoutingTable | None = None
+    summarize_reaction: str | None = None
+
+    def watches(self, reaction: str | None) -> bool:
+        """Whether a reaction_added event with ``reaction`` gets an answer."""
+        return (
+            not self.target_reactions
+            or reaction in self.target_reactions
+            or (reaction is not None and reaction == self.summarize_reaction)
+        )
+
+
+_COMPILED_KEYS = (
+    "target_reactions",
+    "allow_retry",
+    "routing_rules",
+    "summarize_reaction",
+)
+_compiled: TTLCache[tuple[Any, ...], CompiledSettings] = TTLCache(maxsize=64)
+_compiled_lock = threading.Lock()
+
+
+def compile_settings(settings: Mapping) -> CompiledSettings:
+    """Return the compiled form of ``settings``, built once per distinct value."""
+    key = tuple(settings.get(name) for name in _COMPILED_KEYS)
+    with _compiled_lock:
+        return _compiled.get_or_create(key, lambda: _compile(settings))
+
+
+def _compile(settings: Mapping) -> CompiledSettings:
+    target_reactions = settings.get("target_reactions") or ""
+    return CompiledSettings(
+        target_reactions=frozenset(
+            r.strip() for r in target_reactions.split(",") if r.strip()
+        ),
+        allow_retry=bool(settings.get("allow_retry")),
+        routes=compile_routing_rules(settings.get("routing_rules")),
+        summarize_reaction=(settings.get("summarize_reaction") or "").strip(": ")
+        or None,
+    )
+
+
+def prefilter(body: bytes, compiled: CompiledSettings) -> bool:
+    """Cheap check on the raw body; False means the event can be ignored.
+
+    Only rejects when sure: an empty or unrecognised body is passed through so
+    the JSON decoder reports the error as before.
+    """
+    if not body:
+        return True
+    if not any(token in body for token in _RELEVANT_TOKENS):
+        return False
+    if (
+        compiled.target_reactions
+        and b'"reaction_added"' in body
+        and b'"app_mention"' not in body
+    ):
+        match = _REACTION_RE.search(body)
+        if match is not None:
+            return compiled.watches(match.group(1).decode())
+    return True
+
+
+Handler = Callable[..., Any]
+
+
+class Router:
+    """Dispatch table keyed by (payload type, event type)."""
+
+    def __init__(self) -> None:
+        self._routes: dict[tuple[str, str | None], Handler] = {}
+
+    def route(
+        self, payload_type: str, event_type: str | None = None
+    ) -> Callable[[Handler], Handler]:
+        def register(handler: Handler) -> Handler:
+            self._routes[(payload_type, event_type)] = handler
+            return handler
+
+        return register
+
+    def resolve(self, payload_type: Any, event_type: Any = None) -> Handler | None:
+        return self._routes.get((payload_type, event_type))
@@ -0,0 +1,147 @@
+import json
+import logging
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MATCH_FIELDS = ("team_id", "channel", "reaction")
+TARGET_FIELDS = ("bot_token", "app_id")
+
+# Match patterns, most specific first. A channel belongs to one team, so a
+# channel match outranks a team match, and a reaction narrows either.
+_PATTERNS = sorted(
+    (
+        (team, channel, reaction)
+        for team in (True, False)
+        for channel in (True, False)
+        for reaction in (True, False)
+    ),
+    key=lambda p: p[1] * 4 + p[2] * 2 + p[0],
+    reverse=True,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """Where an event goes; None means the endpoint's own setting."""
+
+    bot_token: str | None = None
+    app_id: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RoutingRule:
+    team_id: str | None
+    channel: str | None
+    reaction: str | None
+    route: Route
+
+    @property
+    def key(self) -> tuple[str | None, str | None, str | None]:
+        return (self.team_id, self.channel, self.reaction)
+
+
+def parse_routing_rules(raw: str) -> list[RoutingRule]:
+    """Parse the ``routing_rules`` JSON list; raises ValueError when invalid."""
+    try:
+        entries = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"routing rules are not valid JSON: {e}") from e
+    if not isinstance(entries, list):
+        raise ValueError("routing rules must be a JSON list")
+    rules = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"routing rule {i} is not an object")
+        unknown = set(entry) - set(MATCH_FIELDS) - set(TARGET_FIELDS)
+        if unknown:
+            raise ValueError(f"routing rule {i} has unknown keys: {sorted(unknown)}")
+        values = {k: str(v) for k, v in entry.items() if v not in (None, "")}
+        route = Route(values.get("bot_token"), values.get("app_id"))
+        if route.bot_token is None and route.app_id is None:
+            raise ValueError(f"routing rule {i} sets neither bot_token nor app_id")
+        rules.append(
+            RoutingRule(
+                values.get("team_id"),
+                values.get("channel"),
+                values.get("reaction"),
+                route,
+            )
+        )
+    return rules
+
+
+class RoutingTable:
+    """Lookup index from (team_id, channel, reaction) to a ``Route``.
+
+    Rules are stored in a dict keyed by their match fields, with None for a
+    field the rule does not constrain, so a lookup is at most eight dict
+    probes however many rules there are. ``bot_token`` and ``app_id`` are
+    resolved independently from the most specific rule that sets them: a
+    team rule can carry the workspace's token while channel or reaction rules
+    only pick the Dify app. For identical match fields the first rule wins.
+    """
+
+    def __init__(self, rules: Iterable[RoutingRule]) -> None:
+        self._index: dict[tuple[str | None, str | None, str | None], Route] = {}
+        for rule in rules:
+            self._index.setdefault(rule.key, rule.route)
+        used = {tuple(v is not None for v in key) for key in self._index}
+        self._patterns = [p for p in _PATTERNS if p in used]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(
+        self, team_id: str | None, channel: str | None, reaction: str | None
+    ) -> Route:
+        values = (team_id, channel, reaction)
+        bot_token = app_id = None
+        for pattern in self._patterns:
+            if any(
+                want and value is None
+                for want, value in zip(pattern, values, strict=True)
+            ):
+                continue
+            key = (
+                team_id if pattern[0] else None,
+                channel if pattern[1] else None,
+                reaction if pattern[2] else None,
+            )
+            route = self._index.get(key)
+            if route is None:
+                continue
+            bot_token = bot_token or route.bot_token
+            app_id = app_id or route.app_id
+            if bot_token and app_id:
+                break
+        return Route(bot_token, app_id)
+
+
+def compile_routing_rules(raw: str | None) -> RoutingTable | None:
+    """Build the routing table for the setting, or None when it is unset.
+
+    Invalid rules are logged and ignored, so events fall back to the
+    endpoint's own bot token and app instead of failing.
+    """
+    if not raw or not raw.strip():
+        return None
+    try:
+        return RoutingTable(parse_routing_rules(raw))
+    except ValueError as e:
+        logger.error("Ignoring routing rules: %s", e)
+        return None
+
+
+def apply_route(settings: Mapping, route: Route) -> Mapping:
+    """``settings`` with the routed bot token and Dify app substituted."""
+    if route.bot_token is None and route.app_id is None:
+        return settings
+    routed: dict[str, Any] = dict(settings)
+    if route.bot_token is not None:
+        routed["bot_token"] = route.bot_token
+    if route.app_id is not None:
+        routed["app"] = {**(settings.get("app") or {}), "app_id": route.app_id}
+    return routed
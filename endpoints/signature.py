@@ -0,0 +1,56 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections.abc import Callable
+
+VERSION = "v0"
+# Slack recommends rejecting requests older than five minutes.
+MAX_AGE = 300
+
+
+class SignatureVerifier:
+    """Checks ``X-Slack-Signature`` against the raw request body.
+
+    The HMAC key schedule for the signing secret is computed once; each
+    request copies the prepared object instead of re-keying. Missing,
+    malformed or stale headers are rejected before any hashing.
+    """
+
+    def __init__(
+        self,
+        signing_secret: str,
+        max_age: float = MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._mac = hmac.new(signing_secret.encode(), digestmod=hashlib.sha256)
+        self.max_age = max_age
+        self._clock = clock
+
+    def verify(self, body: bytes, timestamp: str | None, signature: str | None) -> bool:
+        if not timestamp or not signature or not signature.startswith("v0="):
+            return False
+        try:
+            sent_at = int(timestamp)
+        except ValueError:
+            return False
+        if abs(self._clock() - sent_at) > self.max_age:
+            return False
+        mac = self._mac.copy()
+        mac.update(f"{VERSION}:{timestamp}:".encode())
+        mac.update(body)
+        return hmac.compare_digest(f"{VERSION}={mac.hexdigest()}", signature)
+
+
+_verifiers: dict[str, SignatureVerifier] = {}
+_verifiers_lock = threading.Lock()
+
+
+def get_signature_verifier(signing_secret: str) -> SignatureVerifier:
+    """Return the process-wide verifier for ``signing_secret``."""
+    with _verifiers_lock:
+        verifier = _verifiers.get(signing_secret)
+        if verifier is None:
+            verifier = SignatureVerifier(signing_secret)
+            _verifiers[signing_secret] = verifier
+        return verifier
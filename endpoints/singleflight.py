@@ -0,0 +1,113 @@
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any, Literal, overload
+
+from endpoints.cache import TTLCache
+
+
+class _Call[V]:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: V | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight[K: Hashable, V]:
+    """Collapses concurrent calls with the same key into one execution.
+
+    Callers arriving while a call for ``key`` is in flight wait for it and
+    share its result (or its exception). The result is also handed to callers
+    arriving up to ``window`` seconds after it completed, so near-simultaneous
+    triggers that just missed the call do not start a new one.
+    """
+
+    def __init__(
+        self,
+        window: float = 0.0,
+        maxsize: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls: dict[K, _Call[V]] = {}
+        self._recent: TTLCache[K, _Call[V]] = TTLCache(
+            maxsize=maxsize, ttl=window, clock=clock
+        )
+        self.executed = 0
+        self.shared = 0
+
+    @overload
+    def do(
+        self, key: K, fn: Callable[[], V], wait: Literal[True] = ...
+    ) -> tuple[V, bool]: ...
+
+    @overload
+    def do(self, key: K, fn: Callable[[], V], wait: bool) -> tuple[V | None, bool]: ...
+
+    def do(
+        self, key: K, fn: Callable[[], V], wait: bool = True
+    ) -> tuple[V | None, bool]:
+        """Run ``fn`` for ``key`` unless a matching call is in flight or recent.
+
+        Returns the result and whether it was shared from another caller.
+        With ``wait=False`` a caller that finds the call still in flight
+        returns ``(None, True)`` at once instead of waiting for its result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None and self.window > 0:
+                call = self._recent.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            if not wait and not call.done.is_set():
+                return None, True
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.window > 0:
+                    self._recent.set(key, call)
+            call.done.set()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "shared": self.shared,
+            }
+
+
+_flights: dict[float, SingleFlight[Any, Any]] = {}
+_flights_lock = threading.Lock()
+
+
+def get_singleflight(window: float) -> SingleFlight[Any, Any]:
+    """Return the process-wide SingleFlight for ``window``."""
+    with _flights_lock:
+        flight = _flights.get(window)
+        if flight is None:
+            flight = SingleFlight(window=window)
+            _flights[window] = flight
+        return flight
+
+
+def clear_singleflights() -> None:
+    with _flights_lock:
+        _flights.clear()
@@ -1,126 +1,527 @@
+import itertools
 import json
 import logging
+import os
+import tempfile
+import time
 import traceback
-from collections.abc import Mapping
-from typing import Any
-from urllib.parse import parse_qs, urlparse
+from collections.abc import Callable, Coroutine, Iterator, Mapping
+from typing import TYPE_CHECKING, Any, cast
 
 from dify_plugin import Endpoint
 from dify_plugin.config.logger_format import plugin_logger_handler
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-from slack_sdk.web.slack_response import SlackResponse
 from werkzeug import Request, Response
 
+from endpoints.admission import (
+    ADMITTED,
+    POLICY_COALESCE,
+    SHED,
+    AdmissionController,
+    get_admission_controller,
+)
+from endpoints.answer_cache import AnswerCache, answer_cache_key, get_answer_cache
+from endpoints.cache import TTLCache
+from endpoints.client_pool import ClientRegistry
+from endpoints.conversations import (
+    ConversationKey,
+    ConversationStore,
+    get_conversation_store,
+)
+from endpoints.dedup import DedupStore, event_dedup_key, get_dedup_store
+from endpoints.event_loop import (
+    AsyncRunner,
+    async_client_registry,
+    get_async_runner,
+)
+from endpoints.events import (
+    AppMention,
+    Event,
+    Message,
+    ReactionAdded,
+    fill_blocks,
+    parse_event,
+    parse_message,
+)
+from endpoints.files import FilePipeline, upload_cache
+from endpoints.metadata import MetadataCache, get_metadata_cache
+from endpoints.metrics import metrics
+from endpoints.outbox import Outbox, get_outbox, post_message, workspace_key
+from endpoints.rate_limit import (
+    AsyncRateLimitedClient,
+    RateLimitedClient,
+    get_scheduler,
+)
+from endpoints.render import (
+    FORMAT_PLAIN,
+    MESSAGE_LIMIT,
+    SECTION_LIMIT,
+    MessagePart,
+    render_answer,
+)
+from endpoints.router import (
+    EVENT_CALLBACK,
+    URL_VERIFICATION,
+    CompiledSettings,
+    Router,
+    compile_settings,
+    prefilter,
+)
+from endpoints.routing import apply_route
+from endpoints.signature import get_signature_verifier
+from endpoints.singleflight import SingleFlight, get_singleflight
+from endpoints.streaming import StreamedAnswer, consume_stream
+from endpoints.summarize import (
+    CHUNK_CHARS,
+    MapReduceSummarizer,
+    compact,
+    iter_history,
+    iter_thread,
+    user_directory,
+)
+from endpoints.thread_context import thread_contexts
+from endpoints.worker_pool import (
+    OVERFLOW_REJECT,
+    WorkerPool,
+    get_worker_pool,
+    stage_stats,
+)
+
+if TYPE_CHECKING:
+    from slack_sdk import WebClient
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 logger.addHandler(plugin_logger_handler)
 
+STREAM_PLACEHOLDER = "..."
+OVERLOAD_NOTICE = (
+    "I'm handling too many requests right now. Please try again in a moment."
+)
+STREAM_ERROR_NOTICE = "Sorry, I couldn't finish this answer. Please try again."
+
+# Original messages fetched for reactions, keyed by (channel, ts). Popular
+# messages collect many reactions, so repeat lookups skip Slack entirely.
+MESSAGE_CACHE_SIZE = 1024
+MESSAGE_CACHE_TTL = 300.0
+message_cache: TTLCache[tuple[str, str], Message] = TTLCache(
+    maxsize=MESSAGE_CACHE_SIZE, ttl=MESSAGE_CACHE_TTL
+)
+
+
+def _web_client(**kwargs: Any) -> "WebClient":
+    # slack_sdk is imported on first use, so url_verification challenges and
+    # ignored events are answered without paying for it on a cold worker
+    from slack_sdk import WebClient
+
+    return WebClient(**kwargs)
+
+
+client_registry = ClientRegistry(_web_client)
+
+
+def _int_setting(settings: Mapping, name: str, default: int) -> int:
+    """Read a numeric text-input setting, falling back to ``default``."""
+    value = settings.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid value for %s: %r, using %d", name, value, default)
+        return default
+
+
+def _float_setting(settings: Mapping, name: str, default: float) -> float:
+    """Read a decimal text-input setting, falling back to ``default``."""
+    value = settings.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid value for %s: %r, using %s", name, value, default)
+        return default
+
+
+def _find_message(response: Any, message_ts: str) -> dict[str, Any] | None:
+    """Pick the message with ``message_ts`` out of a history/replies response."""
+    if not response:
+        return None
+    messages: list[dict[str, Any]] = response.get("messages") or []
+    for message in messages:
+        if message.get("ts") == message_ts:
+            return message
+    return None
+
+
+router = Router()
+
 
 class SlackBot2Endpoint(Endpoint):
+    _claim: tuple[DedupStore, str] | None = None
+    # set while Slack waits on this instance's HTTP response
+    _serving_http = False
+
     def _invoke(self, r: Request, values: Mapping, settings: Mapping) -> Response:
         """
         Invokes the endpoint with the given request.
         """
+        self._serving_http = True
+        # metrics are process-wide, so one endpoint with them enabled keeps
+        # them on: another endpoint's request must not switch them off
+        if settings.get("enable_metrics"):
+            metrics.enabled = True
+        metrics.maybe_log(_float_setting(settings, "metrics_log_interval", 0.0))
+        signing_secret = settings.get("signing_secret")
+        if signing_secret and not get_signature_verifier(signing_secret).verify(
+            r.get_data(),
+            r.headers.get("X-Slack-Request-Timestamp"),
+            r.headers.get("X-Slack-Signature"),
+        ):
+            metrics.increment("events", event_type="unknown", outcome="rejected")
+            return Response(status=401, response="invalid signature")
+        compiled = compile_settings(settings)
+        dedup_store = self._get_dedup_store(settings)
         retry_num = r.headers.get("X-Slack-Retry-Num")
-        if not settings.get("allow_retry") and (
-            r.headers.get("X-Slack-Retry-Reason") == "http_timeout"
-            or (retry_num is not None and int(retry_num) > 0)
+        if (
+            dedup_store is None
+            and not compiled.allow_retry
+            and (
+                r.headers.get("X-Slack-Retry-Reason") == "http_timeout"
+                or (retry_num is not None and int(retry_num) > 0)
+            )
         ):
             return Response(status=200, response="ok")
-        data = r.get_json()
+        with metrics.span("parse"):
+            if not prefilter(r.get_data(), compiled):
+                metrics.increment("events", event_type="unknown", outcome="filtered")
+                return Response(status=200, response="ok")
+            data = r.get_json()
+        return self._handle_payload(data, settings, compiled, dedup_store)
 
-        # Handle Slack URL verification challenge
-        if data.get("type") == "url_verification":
-            return Response(
-                response=json.dumps({"challenge": data.get("challenge")}),
-                status=200,
-                content_type="application/json",
-            )
-        if data.get("type") == "event_callback":
-            event = data.get("event")
-            if event.get("type") == "app_mention":
-                message = event.get("text", "")
-                files = event.get("files", [])
-                if message.startswith("<@"):
-                    message = message.split("> ", 1)[1] if "> " in message else message
-                    channel = event.get("channel", "")
-                    blocks = event.get("blocks", [])
-                    if (
-                        isinstance(blocks, list)
-                        and len(blocks) > 0
-                        and isinstance(blocks[0], dict)
-                        and "elements" in blocks[0]
-                        and isinstance(blocks[0]["elements"], list)
-                        and len(blocks[0]["elements"]) > 0
-                        and isinstance(blocks[0]["elements"][0], dict)
-                        and "elements" in blocks[0]["elements"][0]
-                    ):
-                        blocks[0]["elements"][0]["elements"] = []
-                    message_ts = event.get("ts")
-                    return self._process_dify_request(
-                        message=message,
-                        channel=channel,
-                        blocks=blocks,
-                        message_ts=message_ts,
-                        settings=settings,
-                        event_type="app_mention",
-                        reaction=None,
-                        files=files,
-                    )
-                else:
-                    return Response(status=200, response="ok")
-            elif event.get("type") == "reaction_added":
-                target_reactions = settings.get("target_reactions", "")
-                if target_reactions:
-                    allowed_reactions = [
-                        r.strip() for r in target_reactions.split(",") if r.strip()
-                    ]
-                    if event.get("reaction") not in allowed_reactions:
-                        return Response(status=200, response="ok")
-
-                item = event.get("item", {})
-                if item.get("type") == "message":
-                    channel = item.get("channel", "")
-                    message_ts = item.get("ts", "")
-                    return self._on_reaction(
-                        channel, message_ts, settings, event.get("reaction")
+    def _handle_payload(
+        self,
+        data: Mapping,
+        settings: Mapping,
+        compiled: CompiledSettings,
+        dedup_store: DedupStore | None,
+    ) -> Response:
+        """Route a decoded Slack payload."""
+        payload_type = data.get("type")
+        event = data.get("event") or {}
+        event_type = event.get("type") or payload_type or "unknown"
+        parsed: Event | None = None
+        with metrics.span("route"):
+            if payload_type == EVENT_CALLBACK:
+                handler = router.resolve(payload_type, event.get("type"))
+                if handler is not None:
+                    parsed = parse_event(event)
+            else:
+                handler = router.resolve(payload_type)
+            if parsed is not None and compiled.routes is not None:
+                settings = apply_route(
+                    settings,
+                    compiled.routes.lookup(
+                        data.get("team_id"),
+                        parsed.channel,
+                        parsed.reaction if isinstance(parsed, ReactionAdded) else None,
+                    ),
+                )
+        if handler is None:
+            metrics.increment("events", event_type=event_type, outcome="ignored")
+            return Response(status=200, response="ok")
+        if payload_type == EVENT_CALLBACK and dedup_store is not None:
+            dedup_key = event_dedup_key(data)
+            if dedup_key is not None:
+                if not dedup_store.claim(dedup_key):
+                    metrics.increment(
+                        "events", event_type=event_type, outcome="duplicate"
                     )
-                else:
                     return Response(status=200, response="ok")
-            else:
-                return Response(status=200, response="ok")
-        else:
+                self._claim = (dedup_store, dedup_key)
+        return cast(Response, handler(self, data, parsed, settings, compiled))
+
+    @router.route(URL_VERIFICATION)
+    def _on_url_verification(
+        self,
+        data: Mapping,
+        event: None,
+        settings: Mapping,
+        compiled: CompiledSettings,
+    ) -> Response:
+        """Handle Slack URL verification challenge."""
+        return Response(
+            response=json.dumps({"challenge": data.get("challenge")}),
+            status=200,
+            content_type="application/json",
+        )
+
+    @router.route(EVENT_CALLBACK, "app_mention")
+    def _on_app_mention(
+        self,
+        data: Mapping,
+        event: AppMention,
+        settings: Mapping,
+        compiled: CompiledSettings,
+    ) -> Response:
+        if event.query is None:
             return Response(status=200, response="ok")
+        return self._dispatch(
+            settings,
+            self._process_dify_request,
+            self._process_dify_request_async,
+            message=event.query,
+            channel=event.ref.channel,
+            blocks=event.blocks,
+            message_ts=event.ref.ts,
+            settings=settings,
+            event_type="app_mention",
+            reaction=None,
+            files=event.files,
+            thread_ts=event.thread_ts,
+            user=event.user,
+        )
 
-    def _get_original(
-        self, client: WebClient, channel: str, message_ts: str
-    ) -> SlackResponse | None:
-        """Fetch Original Message From Slack."""
-        permalink_resp = client.chat_getPermalink(
-            channel=channel, message_ts=message_ts
+    @router.route(EVENT_CALLBACK, "reaction_added")
+    def _on_reaction_added(
+        self,
+        data: Mapping,
+        event: ReactionAdded,
+        settings: Mapping,
+        compiled: CompiledSettings,
+    ) -> Response:
+        if not compiled.watches(event.reaction):
+            metrics.increment("events", event_type="reaction_added", outcome="ignored")
+            return Response(status=200, response="ok")
+        if event.item is None:
+            return Response(status=200, response="ok")
+        if event.reaction == compiled.summarize_reaction:
+            return self._dispatch(
+                settings,
+                self._summarize_conversation,
+                self._summarize_conversation_async,
+                channel=event.item.channel,
+                message_ts=event.item.ts,
+                settings=settings,
+                reaction=event.reaction,
+                user=event.user,
+            )
+        return self._dispatch(
+            settings,
+            self._on_reaction,
+            self._answer_reaction_async,
+            channel=event.item.channel,
+            message_ts=event.item.ts,
+            settings=settings,
+            reaction=event.reaction,
+            user=event.user,
+        )
+
+    def _get_client(
+        self, settings: Mapping, blocking: bool | None = None
+    ) -> "WebClient":
+        """Pooled client for the bot token, throttled per Web API method.
+
+        In sync dispatch mode an HTTP event's calls run while Slack waits for
+        the response, so unless ``blocking`` says otherwise they never sleep
+        for the rate limit. Events run on the worker pool may wait.
+        """
+        token = settings.get("bot_token", "")
+        if blocking is None:
+            blocking = not (
+                self._serving_http and settings.get("dispatch_mode", "sync") == "sync"
+            )
+        # RateLimitedClient proxies every WebClient method
+        return cast(
+            "WebClient",
+            RateLimitedClient(
+                client_registry.get(token), get_scheduler(token), blocking=blocking
+            ),
         )
-        if not permalink_resp:
+
+    def _get_dedup_store(self, settings: Mapping) -> DedupStore | None:
+        backend = settings.get("dedup_backend") or "none"
+        if backend == "none":
             return None
-        permalink = permalink_resp["permalink"]
-        parsed = urlparse(permalink)
-        thread_ts = None
-        if parsed.query:
-            params = parse_qs(parsed.query)
-            thread_ts_list = params.get("thread_ts")
-            thread_ts = thread_ts_list[0] if thread_ts_list else None
-        if thread_ts is None or message_ts == thread_ts:
-            return client.conversations_history(
-                channel=channel, oldest=message_ts, inclusive=True, limit=1
-            )
-        else:
-            # thread message
-            return client.conversations_replies(
+        return get_dedup_store(
+            backend,
+            maxsize=_int_setting(settings, "dedup_max_entries", 10000),
+            ttl=_float_setting(settings, "dedup_ttl", 3600.0),
+            sqlite_path=settings.get("dedup_sqlite_path")
+            or os.path.join(tempfile.gettempdir(), "slack-bot2-dedup.sqlite3"),
+            storage=self.session.storage,
+        )
+
+    def _get_conversation_store(self, settings: Mapping) -> ConversationStore | None:
+        if not settings.get("enable_conversation_memory"):
+            return None
+        return get_conversation_store(
+            maxsize=_int_setting(settings, "conversation_max_threads", 10000),
+            ttl=_float_setting(settings, "conversation_ttl", 86400.0),
+        )
+
+    def _conversation_key(
+        self, settings: Mapping, channel: str, thread_ts: str
+    ) -> ConversationKey:
+        """Routed events reach other apps, so a thread is kept per app and bot."""
+        return (
+            settings["app"]["app_id"],
+            workspace_key(settings.get("bot_token", "")),
+            channel,
+            thread_ts,
+        )
+
+    def _get_reaction_flight(self, settings: Mapping) -> SingleFlight | None:
+        if not settings.get("coalesce_reactions"):
+            return None
+        return get_singleflight(
+            _float_setting(settings, "reaction_coalesce_window", 10.0)
+        )
+
+    def _get_admission_controller(
+        self, settings: Mapping
+    ) -> AdmissionController | None:
+        limits = (
+            _int_setting(settings, "max_concurrent_invocations", 0),
+            _int_setting(settings, "max_concurrent_per_channel", 0),
+            _int_setting(settings, "max_concurrent_per_user", 0),
+        )
+        if not any(limits):
+            return None
+        return get_admission_controller(
+            settings.get("bot_token", ""),
+            *limits,
+            max_waiting=_int_setting(settings, "admission_queue_size", 10),
+            wait_timeout=_float_setting(settings, "admission_wait_timeout", 30.0),
+        )
+
+    def _get_answer_cache(self, settings: Mapping, channel: str) -> AnswerCache | None:
+        if not settings.get("enable_answer_cache"):
+            return None
+        excluded = settings.get("answer_cache_excluded_channels") or ""
+        if channel in {c.strip() for c in excluded.split(",")}:
+            return None
+        return get_answer_cache(
+            max_bytes=_int_setting(settings, "answer_cache_max_bytes", 10 * 1024**2),
+            ttl=_float_setting(settings, "answer_cache_ttl", 3600.0),
+        )
+
+    def _release_claim(self) -> None:
+        """Let Slack's retry of a failed event be processed again."""
+        if self._claim is not None:
+            store, key = self._claim
+            store.release(key)
+            self._claim = None
+
+    def _dispatch(
+        self,
+        settings: Mapping,
+        handler: Callable[..., Response],
+        async_handler: Callable[..., Coroutine[Any, Any, None]],
+        /,
+        **kwargs: Any,
+    ) -> Response:
+        """Run ``handler`` inline, or hand it to the worker pool in async mode.
+
+        In asyncio mode ``async_handler`` runs on the shared event loop
+        instead, unless the settings need the threaded pipeline.
+        """
+        mode = settings.get("dispatch_mode", "sync")
+        if mode == "asyncio" and self._asyncio_supported(settings):
+            self._get_async_runner(settings).submit(async_handler(**kwargs))
+            return Response(status=200, response="ok")
+        if mode not in ("async", "asyncio"):
+            return handler(**kwargs)
+        # a dropped event must not stay claimed, or Slack's retry of it
+        # would be acknowledged as a duplicate and the event lost
+        if not self._get_worker_pool(settings).submit(
+            handler, on_drop=self._release_claim, **kwargs
+        ):
+            logger.warning("Event dropped: worker queue is full")
+            self._release_claim()
+        return Response(status=200, response="ok")
+
+    def _asyncio_supported(self, settings: Mapping) -> bool:
+        """Streaming and reaction coalescing only exist in the threaded path."""
+        return settings.get("response_mode") != "streaming" and not settings.get(
+            "coalesce_reactions"
+        )
+
+    def _get_async_runner(self, settings: Mapping) -> AsyncRunner:
+        return get_async_runner(
+            settings.get("bot_token", ""),
+            _int_setting(settings, "asyncio_blocking_threads", 32),
+        )
+
+    def _get_outbox(self, settings: Mapping) -> Outbox | None:
+        if not settings.get("enable_outbox"):
+            return None
+        return get_outbox(
+            settings.get("outbox_path")
+            or os.path.join(tempfile.gettempdir(), "slack-bot2-outbox.jsonl")
+        )
+
+    def _get_metadata(self, settings: Mapping) -> MetadataCache | None:
+        """Workspace users and channels, prefetched in the background."""
+        if not settings.get("enable_metadata"):
+            return None
+        return get_metadata_cache(
+            settings.get("bot_token", ""),
+            self._get_client(settings, blocking=True),
+            _float_setting(settings, "metadata_refresh_interval", 3600.0),
+        )
+
+    def _get_worker_pool(self, settings: Mapping) -> WorkerPool:
+        return get_worker_pool(
+            settings.get("bot_token", ""),
+            size=_int_setting(settings, "worker_pool_size", 4),
+            queue_size=_int_setting(settings, "worker_queue_size", 100),
+            overflow=settings.get("queue_overflow_policy") or OVERFLOW_REJECT,
+        )
+
+    def _get_original(
+        self, client: "WebClient", channel: str, message_ts: str
+    ) -> Message | None:
+        """Fetch Original Message From Slack, served from cache when possible."""
+        key = (channel, message_ts)
+        message = message_cache.get(key)
+        if message is None:
+            with metrics.span("fetch_original"):
+                raw = self._fetch_original(client, channel, message_ts)
+            if raw is None:
+                return None
+            message = parse_message(raw)
+            message_cache.set(key, message)
+        return message
+
+    def _fetch_original(
+        self, client: "WebClient", channel: str, message_ts: str
+    ) -> dict[str, Any] | None:
+        # Top-level messages (and thread parents) resolve in a single call.
+        message = _find_message(
+            client.conversations_history(
                 channel=channel,
-                ts=message_ts,
+                latest=message_ts,
+                oldest=message_ts,
                 inclusive=True,
                 limit=1,
-            )
+            ),
+            message_ts,
+        )
+        if message is not None:
+            return message
+        # A thread reply: given a reply's ts, conversations.replies answers
+        # with its thread, parent first, so the reply is one of two messages.
+        return _find_message(
+            client.conversations_replies(
+                channel=channel,
+                ts=message_ts,
+                oldest=message_ts,
+                inclusive=True,
+                limit=2,
+            ),
+            message_ts,
+        )
 
     def _on_reaction(
         self,
@@ -128,49 +529,214 @@ class SlackBot2Endpoint(Endpoint):
         message_ts: str,
         settings: Mapping,
         reaction: str,
+        user: str | None = None,
     ) -> Response:
+        flight = self._get_reaction_flight(settings)
+        if flight is None:
+            return self._answer_reaction(channel, message_ts, settings, reaction, user)
+        # a pile-on must not hold a worker (or Slack's request) until the
+        # leader's answer is posted; the answer is for the leader to post
+        response, shared = flight.do(
+            (channel, message_ts, reaction),
+            lambda: self._answer_reaction(
+                channel, message_ts, settings, reaction, user
+            ),
+            wait=False,
+        )
+        if shared:
+            logger.info(
+                "Coalesced :%s: reaction on %s/%s into the in-flight answer",
+                reaction,
+                channel,
+                message_ts,
+            )
+            return Response(status=200, response="ok")
+        return cast(Response, response)
+
+    def _answer_reaction(
+        self,
+        channel: str,
+        message_ts: str,
+        settings: Mapping,
+        reaction: str,
+        user: str | None = None,
+    ) -> Response:
+        from slack_sdk.errors import SlackApiError
+
         try:
-            token = settings.get("bot_token")
-            client = WebClient(token=token)
-            response = self._get_original(
+            client = self._get_client(settings)
+            message = self._get_original(
                 client=client, channel=channel, message_ts=message_ts
             )
-            if response and response.get("messages"):
-                message = response["messages"][0]
-                files = message.get("files", [])
-                blocks = message.get("blocks", [])
-                if (
-                    isinstance(blocks, list)
-                    and len(blocks) > 0
-                    and isinstance(blocks[0], dict)
-                    and "elements" in blocks[0]
-                    and isinstance(blocks[0]["elements"], list)
-                    and len(blocks[0]["elements"]) > 0
-                    and isinstance(blocks[0]["elements"][0], dict)
-                    and "elements" in blocks[0]["elements"][0]
-                    and isinstance(blocks[0]["elements"][0]["elements"], list)
-                ):
-                    blocks[0]["elements"][0]["elements"] = []
-                message_text = message.get("text", "")
+            if message is not None:
                 return self._process_dify_request(
-                    message=message_text,
+                    message=message.text,
                     channel=channel,
-                    blocks=blocks,
+                    blocks=message.blocks,
                     message_ts=message_ts,
                     settings=settings,
                     event_type="reaction_added",
                     reaction=reaction,
-                    files=files,
+                    files=message.files,
+                    thread_ts=message.thread_ts,
+                    user=user,
                 )
             return Response(status=200, response="ok")
         except SlackApiError as e:
             logger.error("Error fetching message: %s", e.response["error"])
+            self._release_claim()
+            metrics.increment("events", event_type="reaction_added", outcome="error")
             return Response(status=200, response="ok")
         except Exception as e:
             err = traceback.format_exc()
             logger.error("Error processing request: %s: %s", type(e).__name__, str(e))
             logger.error("Traceback: %s", err)
+            self._release_claim()
+            metrics.increment("events", event_type="reaction_added", outcome="error")
+            return Response(status=200, response="ok")
+
+    def _summarize_conversation(
+        self,
+        channel: str,
+        message_ts: str,
+        settings: Mapping,
+        reaction: str,
+        user: str | None = None,
+    ) -> Response:
+        """Summarize once for a pile of the same reaction, within the
+        admission limits like any other Dify call."""
+        flight = self._get_reaction_flight(settings)
+        if flight is None:
+            return self._admit_summary(channel, message_ts, settings, reaction, user)
+        response, shared = flight.do(
+            (channel, message_ts, reaction),
+            lambda: self._admit_summary(channel, message_ts, settings, reaction, user),
+            wait=False,
+        )
+        if shared:
+            logger.info(
+                "Coalesced :%s: reaction on %s/%s into the in-flight summary",
+                reaction,
+                channel,
+                message_ts,
+            )
+            return Response(status=200, response="ok")
+        return cast(Response, response)
+
+    def _admit_summary(
+        self,
+        channel: str,
+        message_ts: str,
+        settings: Mapping,
+        reaction: str,
+        user: str | None,
+    ) -> Response:
+        admission = self._get_admission_controller(settings)
+        if admission is None:
+            return self._summarize(channel, message_ts, settings, reaction)
+        # the whole map-reduce takes one slot: its Dify calls run one at a time
+        fingerprint = (channel, message_ts, reaction)
+        decision = admission.acquire(
+            channel,
+            user,
+            fingerprint,
+            coalesce=settings.get("admission_overflow_policy") == POLICY_COALESCE,
+        )
+        if decision != ADMITTED:
+            metrics.increment("events", event_type="summarize", outcome=decision)
+            if decision == SHED:
+                self._post_overload_notice(settings, channel, message_ts)
             return Response(status=200, response="ok")
+        try:
+            return self._summarize(channel, message_ts, settings, reaction)
+        finally:
+            admission.release(channel, user, fingerprint)
+
+    def _summarize(
+        self,
+        channel: str,
+        message_ts: str,
+        settings: Mapping,
+        reaction: str,
+    ) -> Response:
+        """Summarize the reacted message's thread, or the channel before it.
+
+        Messages are streamed page by page through compaction and map-reduce
+        summarization, so memory use does not grow with the conversation.
+        """
+        try:
+            client = self._get_client(settings)
+            message = self._get_original(
+                client=client, channel=channel, message_ts=message_ts
+            )
+            if message is None:
+                return Response(status=200, response="ok")
+            thread_ts = message.thread_ts
+            if thread_ts is None and message.reply_count:
+                thread_ts = message_ts
+            messages: Iterator[dict[str, Any]]
+            if thread_ts is not None:
+                messages = iter_thread(client, channel, thread_ts)
+            else:
+                window = _float_setting(settings, "summarize_window_hours", 24.0)
+                messages = iter_history(
+                    client,
+                    channel,
+                    oldest=f"{float(message_ts) - window * 3600:.6f}",
+                    latest=message_ts,
+                )
+            token = settings.get("bot_token", "")
+            metadata = self._get_metadata(settings)
+
+            def name(user_id: str) -> str:
+                meta = metadata.user(user_id) if metadata is not None else None
+                if meta is not None:
+                    return meta.name
+                return user_directory.name(client, token, user_id)
+
+            lines = compact(
+                itertools.islice(
+                    messages, _int_setting(settings, "summarize_max_messages", 5000)
+                ),
+                name,
+            )
+
+            def ask(stage: str, text: str) -> str:
+                started = time.perf_counter()
+                response = self.session.app.chat.invoke(
+                    app_id=settings["app"]["app_id"],
+                    query=text,
+                    inputs={
+                        "channel": channel,
+                        "message_ts": message_ts,
+                        "event_type": "summarize",
+                        "reaction": reaction,
+                        "summarize_stage": stage,
+                    },
+                    response_mode="blocking",
+                )
+                stage_stats.record("dify_invoke", time.perf_counter() - started)
+                return str(response.get("answer") or "")
+
+            summarizer = MapReduceSummarizer(
+                ask,
+                _int_setting(settings, "summarize_chunk_chars", CHUNK_CHARS),
+                newest_first=thread_ts is None,
+            )
+            summary = summarizer.summarize(lines)
+            if summary:
+                # a summary of a thread belongs in that thread
+                self._post_answer(
+                    client, channel, [], thread_ts or message_ts, summary, settings
+                )
+            metrics.increment("events", event_type="summarize", outcome="answered")
+        except Exception as e:
+            err = traceback.format_exc()
+            logger.error("Error summarizing: %s: %s", type(e).__name__, str(e))
+            logger.error("Traceback: %s", err)
+            self._release_claim()
+            metrics.increment("events", event_type="summarize", outcome="error")
+        return Response(status=200, response="ok")
 
     def _process_dify_request(
         self,
@@ -182,38 +748,114 @@ class SlackBot2Endpoint(Endpoint):
         event_type: str,
         reaction: str | None = None,
         files: list | None = None,
+        thread_ts: str | None = None,
+        user: str | None = None,
     ) -> Response:
         """Process request to Dify and post response to Slack"""
+        admission: AdmissionController | None = None
+        fingerprint = (channel, message)
         try:
             enable_thread = settings.get("enable_thread_reply", False)
-            token = settings.get("bot_token")
-            client = WebClient(token=token)
+            client = self._get_client(settings)
             inputs: dict[str, Any] = {
                 "channel": channel,
                 "message_ts": message_ts,
                 "event_type": event_type,
                 "reaction": reaction,
             }
-            response = self.session.app.chat.invoke(
-                app_id=settings["app"]["app_id"],
-                query=message,
-                inputs=inputs,
-                response_mode="blocking",
-            )
-            if blocks and len(blocks) > 0 and "text" in blocks[0]:
-                blocks[0]["text"]["text"] = response.get("answer")
-            elif blocks and len(blocks) > 0 and "elements" in blocks[0]:
-                element = {"type": "text", "text": response.get("answer")}
-                blocks[0]["elements"][0]["elements"].append(element)
-            post_message_args = {
-                "channel": channel,
-                "text": response.get("answer"),
-                "blocks": blocks,
+            metadata = self._get_metadata(settings)
+            if metadata is not None:
+                inputs.update(metadata.inputs(channel, user))
+            file_variable = settings.get("file_input_variable")
+            if files and file_variable and settings.get("enable_file_attachments"):
+                attached = self._attach_files(client, settings, files)
+                if attached:
+                    inputs[file_variable] = attached
+            if thread_ts and settings.get("enable_thread_context"):
+                inputs["thread_context"] = self._build_thread_context(
+                    client, channel, thread_ts, message_ts, settings
+                )
+            reply_thread_ts = message_ts if enable_thread else None
+            invoke_args: dict[str, Any] = {
+                "app_id": settings["app"]["app_id"],
+                "query": message,
+                "inputs": inputs,
             }
-            if enable_thread:
-                post_message_args["thread_ts"] = message_ts
+            conversations = self._get_conversation_store(settings)
+            conversation_key = self._conversation_key(
+                settings, channel, thread_ts or message_ts
+            )
+            if conversations is not None:
+                conversation_id = conversations.get(conversation_key)
+                if conversation_id:
+                    invoke_args["conversation_id"] = conversation_id
+
+            answer_cache = self._get_answer_cache(settings, channel)
+            cache_key = None
+            # answers inside an ongoing conversation depend on its history
+            if answer_cache is not None and "conversation_id" not in invoke_args:
+                cache_key = answer_cache_key(invoke_args["app_id"], message, inputs)
+                cached_answer = answer_cache.get(cache_key)
+                if cached_answer is not None:
+                    self._post_answer(
+                        client,
+                        channel,
+                        blocks,
+                        reply_thread_ts,
+                        cached_answer,
+                        settings,
+                    )
+                    metrics.increment("events", event_type=event_type, outcome="cached")
+                    return Response(
+                        status=200,
+                        response="ok",
+                        content_type="application/json",
+                    )
 
-            client.chat_postMessage(**post_message_args)
+            admission = self._get_admission_controller(settings)
+            if admission is not None:
+                decision = admission.acquire(
+                    channel,
+                    user,
+                    fingerprint,
+                    coalesce=settings.get("admission_overflow_policy")
+                    == POLICY_COALESCE,
+                )
+                if decision != ADMITTED:
+                    metrics.increment("events", event_type=event_type, outcome=decision)
+                    admission = None
+                    if decision == SHED:
+                        self._post_overload_notice(settings, channel, message_ts)
+                    return Response(status=200, response="ok")
+
+            if settings.get("response_mode") == "streaming":
+                streamed = self._stream_dify_request(
+                    client=client,
+                    channel=channel,
+                    blocks=blocks,
+                    reply_thread_ts=reply_thread_ts,
+                    settings=settings,
+                    invoke_args=invoke_args,
+                )
+                answer = streamed.text
+                conversation_id = streamed.conversation_id
+            else:
+                started = time.perf_counter()
+                response = self.session.app.chat.invoke(
+                    **invoke_args, response_mode="blocking"
+                )
+                stage_stats.record("dify_invoke", time.perf_counter() - started)
+                answer = response.get("answer")
+                conversation_id = response.get("conversation_id")
+                self._post_answer(
+                    client, channel, blocks, reply_thread_ts, answer, settings
+                )
+
+            if conversations is not None and conversation_id:
+                conversations.set(conversation_key, conversation_id)
+            if answer_cache is not None and cache_key is not None and answer:
+                answer_cache.set(cache_key, answer)
+            metrics.increment("events", event_type=event_type, outcome="answered")
             return Response(
                 status=200,
                 response="ok",
@@ -223,8 +865,469 @@ class SlackBot2Endpoint(Endpoint):
             err = traceback.format_exc()
             logger.error("Error processing request: %s: %s", type(e).__name__, str(e))
             logger.error("Traceback: %s", err)
+            self._release_claim()
+            metrics.increment("events", event_type=event_type, outcome="error")
             return Response(
                 status=200,
                 response="ok",
                 content_type="text/plain",
             )
+        finally:
+            if admission is not None:
+                admission.release(channel, user, fingerprint)
+
+    def _post_answer(
+        self,
+        client: "WebClient",
+        channel: str,
+        blocks: list,
+        reply_thread_ts: str | None,
+        answer: str | None,
+        settings: Mapping,
+    ) -> None:
+        self._post_parts(
+            client,
+            channel,
+            blocks,
+            reply_thread_ts,
+            self._render_answer(answer, settings),
+            settings,
+        )
+
+    def _render_answer(
+        self, answer: str | None, settings: Mapping
+    ) -> list[MessagePart]:
+        """The answer as the messages to post, split to fit Slack's limits."""
+        if not answer:
+            return [MessagePart(text=answer or "")]
+        return render_answer(
+            answer,
+            settings.get("answer_format") or FORMAT_PLAIN,
+            max(_int_setting(settings, "max_message_chars", MESSAGE_LIMIT), 100),
+        )
+
+    def _post_parts(
+        self,
+        client: "WebClient",
+        channel: str,
+        blocks: list,
+        reply_thread_ts: str | None,
+        parts: list[MessagePart],
+        settings: Mapping,
+        first_ts: str | None = None,
+    ) -> None:
+        """Post ``parts`` one after another so they arrive in order.
+
+        Plain text answers keep the original message's blocks on the first
+        part. With ``first_ts`` the first part replaces that message instead
+        of being posted (the streaming placeholder). With the outbox enabled
+        the messages are recorded first and retried if posting fails.
+        """
+        messages = self._build_messages(
+            channel, blocks, reply_thread_ts, parts, first_ts
+        )
+        outbox = self._get_outbox(settings)
+        if outbox is not None:
+            outbox.send(client, workspace_key(settings.get("bot_token", "")), messages)
+            return
+        for message in messages:
+            post_message(client, message)
+
+    def _build_messages(
+        self,
+        channel: str,
+        blocks: list,
+        reply_thread_ts: str | None,
+        parts: list[MessagePart],
+        first_ts: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Web API arguments for each part; ``ts`` marks an edit."""
+        messages: list[dict[str, Any]] = []
+        for i, part in enumerate(parts):
+            if part.blocks:
+                part_blocks = part.blocks
+            elif i == 0 and len(part.text) <= SECTION_LIMIT:
+                part_blocks = fill_blocks(blocks, part.text)
+            else:
+                # a longer part does not fit in a block; post it as text
+                part_blocks = []
+            message: dict[str, Any] = {
+                "channel": channel,
+                "text": part.text,
+                "blocks": part_blocks,
+            }
+            if i == 0 and first_ts is not None:
+                message["ts"] = first_ts
+            elif reply_thread_ts:
+                message["thread_ts"] = reply_thread_ts
+            messages.append(message)
+        return messages
+
+    def _build_thread_context(
+        self,
+        client: "WebClient",
+        channel: str,
+        thread_ts: str,
+        message_ts: str,
+        settings: Mapping,
+    ) -> str:
+        """Earlier messages of the thread, trimmed to the character budget."""
+        try:
+            return thread_contexts.build(
+                client,
+                channel,
+                thread_ts,
+                before_ts=message_ts,
+                max_chars=_int_setting(settings, "thread_context_max_chars", 4000),
+            )
+        except Exception as e:
+            logger.warning("Failed to fetch thread context: %s", e)
+            return ""
+
+    def _attach_files(
+        self, client: "WebClient", settings: Mapping, files: list
+    ) -> list[dict[str, Any]]:
+        """Upload the message's Slack files to Dify as file input parameters."""
+        pipeline = FilePipeline(
+            upload=self.session.file.upload,
+            max_file_bytes=_int_setting(settings, "max_file_bytes", 20 * 1024 * 1024),
+            max_event_bytes=_int_setting(
+                settings, "max_event_file_bytes", 50 * 1024 * 1024
+            ),
+            cache=upload_cache,
+            app_id=settings["app"]["app_id"],
+        )
+        return pipeline.attach(
+            files,
+            settings.get("bot_token", ""),
+            lambda file_id: client.files_info(file=file_id)["file"],
+        )
+
+    def _post_overload_notice(
+        self, settings: Mapping, channel: str, message_ts: str
+    ) -> None:
+        try:
+            self._get_client(settings).chat_postMessage(
+                channel=channel, thread_ts=message_ts, text=OVERLOAD_NOTICE
+            )
+        except Exception as e:
+            logger.error("Error posting overload notice: %s", e)
+
+    def _stream_dify_request(
+        self,
+        client: "WebClient",
+        channel: str,
+        blocks: list,
+        reply_thread_ts: str | None,
+        settings: Mapping,
+        invoke_args: dict[str, Any],
+    ) -> StreamedAnswer:
+        """Post a placeholder, then edit it as Dify streams the answer."""
+        started = time.perf_counter()
+        post_message_args: dict[str, Any] = {
+            "channel": channel,
+            "text": STREAM_PLACEHOLDER,
+        }
+        if reply_thread_ts:
+            post_message_args["thread_ts"] = reply_thread_ts
+        placeholder = client.chat_postMessage(**post_message_args)
+        reply_ts = placeholder["ts"]
+        first_update: list[float] = []
+
+        limit = _int_setting(settings, "max_message_chars", MESSAGE_LIMIT)
+
+        def update(text: str) -> None:
+            if not first_update:
+                first_update.append(time.perf_counter() - started)
+                stage_stats.record("first_visible_token", first_update[0])
+            # the rest of a long answer is posted as follow-ups at the end
+            client.chat_update(channel=channel, ts=reply_ts, text=text[:limit])
+
+        try:
+            chunks = self.session.app.chat.invoke(
+                **invoke_args, response_mode="streaming"
+            )
+            interval = _float_setting(settings, "stream_update_interval", 1.0)
+            answer = consume_stream(chunks, channel, interval, update)
+            stage_stats.record("dify_invoke", time.perf_counter() - started)
+
+            self._post_parts(
+                client,
+                channel,
+                blocks,
+                reply_thread_ts,
+                self._render_answer(answer.text, settings),
+                settings,
+                first_ts=reply_ts,
+            )
+        except Exception:
+            # never leave the placeholder (or a partial answer) looking like
+            # an answer still in progress
+            try:
+                client.chat_update(
+                    channel=channel, ts=reply_ts, text=STREAM_ERROR_NOTICE, blocks=[]
+                )
+            except Exception as e:
+                logger.warning("Failed to replace the streaming placeholder: %s", e)
+            raise
+        return answer
+
+    # asyncio pipeline (dispatch_mode=asyncio): the same steps as the threaded
+    # path, with Slack calls awaited on AsyncWebClient and the blocking Dify
+    # session and sync-only helpers moved onto the event loop's executor.
+
+    def _get_async_client(self, settings: Mapping) -> Any:
+        """Pooled async client for the bot token, sharing the sync path's
+        per-method throttling."""
+        token = settings.get("bot_token", "")
+        return AsyncRateLimitedClient(
+            async_client_registry.get(token), get_scheduler(token)
+        )
+
+    async def _get_original_async(
+        self, client: Any, channel: str, message_ts: str
+    ) -> Message | None:
+        """Async ``_get_original``, sharing its cache."""
+        key = (channel, message_ts)
+        message = message_cache.get(key)
+        if message is None:
+            with metrics.span("fetch_original"):
+                raw = await self._fetch_original_async(client, channel, message_ts)
+            if raw is None:
+                return None
+            message = parse_message(raw)
+            message_cache.set(key, message)
+        return message
+
+    async def _fetch_original_async(
+        self, client: Any, channel: str, message_ts: str
+    ) -> dict[str, Any] | None:
+        message = _find_message(
+            await client.conversations_history(
+                channel=channel,
+                latest=message_ts,
+                oldest=message_ts,
+                inclusive=True,
+                limit=1,
+            ),
+            message_ts,
+        )
+        if message is not None:
+            return message
+        return _find_message(
+            await client.conversations_replies(
+                channel=channel,
+                ts=message_ts,
+                oldest=message_ts,
+                inclusive=True,
+                limit=2,
+            ),
+            message_ts,
+        )
+
+    async def _answer_reaction_async(
+        self,
+        channel: str,
+        message_ts: str,
+        settings: Mapping,
+        reaction: str,
+        user: str | None = None,
+    ) -> None:
+        try:
+            message = await self._get_original_async(
+                self._get_async_client(settings), channel, message_ts
+            )
+        except Exception as e:
+            logger.error("Error fetching message: %s: %s", type(e).__name__, str(e))
+            self._release_claim()
+            metrics.increment("events", event_type="reaction_added", outcome="error")
+            return
+        if message is None:
+            return
+        await self._process_dify_request_async(
+            message=message.text,
+            channel=channel,
+            blocks=message.blocks,
+            message_ts=message_ts,
+            settings=settings,
+            event_type="reaction_added",
+            reaction=reaction,
+            files=message.files,
+            thread_ts=message.thread_ts,
+            user=user,
+        )
+
+    async def _summarize_conversation_async(
+        self,
+        channel: str,
+        message_ts: str,
+        settings: Mapping,
+        reaction: str,
+        user: str | None = None,
+    ) -> None:
+        # paging and map-reduce are sequential blocking calls; keep them off
+        # the event loop
+        await self._get_async_runner(settings).run_blocking(
+            self._summarize_conversation,
+            channel=channel,
+            message_ts=message_ts,
+            settings=settings,
+            reaction=reaction,
+            user=user,
+        )
+
+    async def _process_dify_request_async(
+        self,
+        message: str,
+        channel: str,
+        blocks: list,
+        message_ts: str,
+        settings: Mapping,
+        event_type: str,
+        reaction: str | None = None,
+        files: list | None = None,
+        thread_ts: str | None = None,
+        user: str | None = None,
+    ) -> None:
+        """Async ``_process_dify_request`` for blocking response mode."""
+        runner = self._get_async_runner(settings)
+        admission: AdmissionController | None = None
+        fingerprint = (channel, message)
+        try:
+            client = self._get_async_client(settings)
+            inputs: dict[str, Any] = {
+                "channel": channel,
+                "message_ts": message_ts,
+                "event_type": event_type,
+                "reaction": reaction,
+            }
+            metadata = self._get_metadata(settings)
+            if metadata is not None:
+                inputs.update(metadata.inputs(channel, user))
+            file_variable = settings.get("file_input_variable")
+            if files and file_variable and settings.get("enable_file_attachments"):
+                attached = await runner.run_blocking(
+                    self._attach_files,
+                    client=self._get_client(settings),
+                    settings=settings,
+                    files=files,
+                )
+                if attached:
+                    inputs[file_variable] = attached
+            if thread_ts and settings.get("enable_thread_context"):
+                inputs["thread_context"] = await runner.run_blocking(
+                    self._build_thread_context,
+                    client=self._get_client(settings),
+                    channel=channel,
+                    thread_ts=thread_ts,
+                    message_ts=message_ts,
+                    settings=settings,
+                )
+            reply_thread_ts = (
+                message_ts if settings.get("enable_thread_reply", False) else None
+            )
+            invoke_args: dict[str, Any] = {
+                "app_id": settings["app"]["app_id"],
+                "query": message,
+                "inputs": inputs,
+            }
+            conversations = self._get_conversation_store(settings)
+            conversation_key = self._conversation_key(
+                settings, channel, thread_ts or message_ts
+            )
+            if conversations is not None:
+                conversation_id = conversations.get(conversation_key)
+                if conversation_id:
+                    invoke_args["conversation_id"] = conversation_id
+
+            answer_cache = self._get_answer_cache(settings, channel)
+            cache_key = None
+            if answer_cache is not None and "conversation_id" not in invoke_args:
+                cache_key = answer_cache_key(invoke_args["app_id"], message, inputs)
+                cached_answer = answer_cache.get(cache_key)
+                if cached_answer is not None:
+                    await self._post_answer_async(
+                        client,
+                        channel,
+                        blocks,
+                        reply_thread_ts,
+                        cached_answer,
+                        settings,
+                    )
+                    metrics.increment("events", event_type=event_type, outcome="cached")
+                    return
+
+            admission = self._get_admission_controller(settings)
+            if admission is not None:
+                decision = await runner.run_blocking(
+                    admission.acquire,
+                    channel=channel,
+                    user=user,
+                    fingerprint=fingerprint,
+                    coalesce=settings.get("admission_overflow_policy")
+                    == POLICY_COALESCE,
+                )
+                if decision != ADMITTED:
+                    metrics.increment("events", event_type=event_type, outcome=decision)
+                    admission = None
+                    if decision == SHED:
+                        await runner.run_blocking(
+                            self._post_overload_notice,
+                            settings=settings,
+                            channel=channel,
+                            message_ts=message_ts,
+                        )
+                    return
+
+            started = time.perf_counter()
+            response = await runner.run_blocking(
+                self.session.app.chat.invoke, **invoke_args, response_mode="blocking"
+            )
+            stage_stats.record("dify_invoke", time.perf_counter() - started)
+            answer = response.get("answer")
+            conversation_id = response.get("conversation_id")
+            await self._post_answer_async(
+                client, channel, blocks, reply_thread_ts, answer, settings
+            )
+
+            if conversations is not None and conversation_id:
+                conversations.set(conversation_key, conversation_id)
+            if answer_cache is not None and cache_key is not None and answer:
+                answer_cache.set(cache_key, answer)
+            metrics.increment("events", event_type=event_type, outcome="answered")
+        except Exception as e:
+            err = traceback.format_exc()
+            logger.error("Error processing request: %s: %s", type(e).__name__, str(e))
+            logger.error("Traceback: %s", err)
+            self._release_claim()
+            metrics.increment("events", event_type=event_type, outcome="error")
+        finally:
+            if admission is not None:
+                admission.release(channel, user, fingerprint)
+
+    async def _post_answer_async(
+        self,
+        client: Any,
+        channel: str,
+        blocks: list,
+        reply_thread_ts: str | None,
+        answer: str | None,
+        settings: Mapping,
+    ) -> None:
+        messages = self._build_messages(
+            channel, blocks, reply_thread_ts, self._render_answer(answer, settings)
+        )
+        outbox = self._get_outbox(settings)
+        if outbox is not None:
+            # the outbox retries with the sync client from its drainer thread
+            await self._get_async_runner(settings).run_blocking(
+                outbox.send,
+                client=self._get_client(settings),
+                workspace=workspace_key(settings.get("bot_token", "")),
+                messages=messages,
+            )
+            return
+        for message in messages:
+            started = time.perf_counter()
+            await client.chat_postMessage(**message)
+            stage_stats.record("slack_post", time.perf_counter() - started)
@@ -0,0 +1,20 @@
+from collections.abc import Mapping
+
+from dify_plugin import Endpoint
+from werkzeug import Request, Response
+
+from endpoints.metrics import metrics
+
+
+class SlackBot2MetricsEndpoint(Endpoint):
+    def _invoke(self, r: Request, values: Mapping, settings: Mapping) -> Response:
+        """
+        Serves the process metrics in the Prometheus text format.
+        """
+        if not settings.get("enable_metrics"):
+            return Response(status=404, response="metrics are disabled")
+        return Response(
+            metrics.render_prometheus(),
+            status=200,
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+ANSWER_EVENTS = ("message", "agent_message")
+
+
+class ChannelThrottle:
+    """Per-channel minimum interval between message updates.
+
+    Slack rate-limits ``chat.update`` per channel, so every streaming reply in a
+    channel shares one budget regardless of which event produced it.
+    """
+
+    def __init__(self) -> None:
+        self._last: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, channel: str, interval: float) -> bool:
+        """Return True and consume the slot if ``channel`` may be updated now."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(channel)
+            if last is not None and now - last < interval:
+                return False
+            self._last[channel] = now
+            return True
+
+
+channel_throttle = ChannelThrottle()
+
+
+class StreamedAnswer:
+    """Accumulates a Dify streaming response into the final answer text."""
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self.conversation_id: str | None = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: Mapping[str, Any]) -> bool:
+        """Apply one streamed chunk. Returns True if the answer text changed."""
+        if chunk.get("conversation_id"):
+            self.conversation_id = chunk["conversation_id"]
+        event = chunk.get("event")
+        if event in ANSWER_EVENTS and chunk.get("answer"):
+            self._parts.append(chunk["answer"])
+            return True
+        if event == "message_replace":
+            self._parts = [chunk.get("answer") or ""]
+            return True
+        if event == "error":
+            raise RuntimeError(chunk.get("message") or "Dify streaming error")
+        return False
+
+
+def consume_stream(
+    chunks: Iterable[Mapping[str, Any]],
+    channel: str,
+    interval: float,
+    update: Callable[[str], Any],
+    throttle: ChannelThrottle = channel_throttle,
+) -> StreamedAnswer:
+    """Feed ``chunks`` into a StreamedAnswer, calling ``update`` at most once per
+    ``interval`` seconds per channel with the text accumulated so far.
+
+    The final text is not flushed here; the caller sends it with the final
+    rendering so the last update is never throttled away.
+    """
+    answer = StreamedAnswer()
+    for chunk in chunks:
+        if answer.feed(chunk) and throttle.acquire(channel, interval):
+            update(answer.text)
+    return answer
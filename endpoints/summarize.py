@@ -0,0 +1,237 @@
+import logging
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from endpoints.cache import TTLCache
+from endpoints.metadata import display_name, paginate
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200
+CHUNK_CHARS = 8000
+# recent lines remembered to drop repeats (bot re-posts, copy-paste)
+DEDUPE_WINDOW = 256
+SKIPPED_SUBTYPES = frozenset(
+    {
+        "channel_join",
+        "channel_leave",
+        "channel_topic",
+        "channel_purpose",
+        "channel_name",
+        "pinned_item",
+        "unpinned_item",
+    }
+)
+MAP_PROMPT = "Summarize this part of a Slack conversation:\n\n"
+REDUCE_PROMPT = (
+    "Combine these summaries of consecutive parts of a Slack conversation "
+    "into one summary:\n\n"
+)
+
+_MENTION_RE = re.compile(r"<@([UW][A-Z0-9]+)(?:\|[^>]*)?>")
+
+
+def iter_thread(
+    client: Any, channel: str, thread_ts: str, page_size: int = PAGE_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Messages of a thread, oldest first, one page in memory at a time."""
+    parent_seen = False
+    for page in paginate(
+        client.conversations_replies,
+        "messages",
+        channel=channel,
+        ts=thread_ts,
+        limit=page_size,
+    ):
+        for message in page:
+            # the thread parent is returned on every page
+            if message.get("ts") == thread_ts:
+                if parent_seen:
+                    continue
+                parent_seen = True
+            yield message
+
+
+def iter_history(
+    client: Any, channel: str, oldest: str, latest: str, page_size: int = PAGE_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Channel messages between ``oldest`` and ``latest``, newest first."""
+    for page in paginate(
+        client.conversations_history,
+        "messages",
+        channel=channel,
+        oldest=oldest,
+        latest=latest,
+        inclusive=True,
+        limit=page_size,
+    ):
+        yield from page
+
+
+class UserDirectory:
+    """Display names for user IDs, looked up with ``users_info`` and cached.
+
+    Entries are keyed by bot token, since user IDs are only unique within a
+    workspace. A failed lookup falls back to the ID and is cached too, so a
+    deleted user does not cost a call per message.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600.0) -> None:
+        self._names: TTLCache[tuple[str, str], str] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.lookups = 0
+
+    def name(self, client: Any, token: str, user_id: str) -> str:
+        # looked up outside the cache's lock, which every other name waits on;
+        # two callers missing at once may both call users_info
+        key = (token, user_id)
+        name = self._names.get(key)
+        if name is None:
+            name = self._lookup(client, user_id)
+            self._names.set(key, name)
+        return name
+
+    def _lookup(self, client: Any, user_id: str) -> str:
+        self.lookups += 1
+        try:
+            user = client.users_info(user=user_id)["user"]
+        except Exception as e:
+            logger.warning("Failed to look up user %s: %s", user_id, e)
+            return user_id
+        return display_name(user) or user_id
+
+    def clear(self) -> None:
+        self._names.clear()
+
+
+def compact(
+    messages: Iterable[dict[str, Any]],
+    name: Callable[[str], str],
+    dedupe_window: int = DEDUPE_WINDOW,
+) -> Iterator[str]:
+    """One ``author: text`` line per message worth summarizing.
+
+    Blocks, attachments and files are dropped (``text`` already holds the
+    message), as are membership and channel-setting notices, empty messages
+    and lines repeated within the last ``dedupe_window``. Mentions are
+    replaced with display names.
+    """
+    recent: deque[str] = deque()
+    seen: set[str] = set()
+    for message in messages:
+        if message.get("subtype") in SKIPPED_SUBTYPES:
+            continue
+        text = (message.get("text") or "").strip()
+        if not text:
+            continue
+        text = _MENTION_RE.sub(lambda m: f"@{name(m.group(1))}", text)
+        user = message.get("user")
+        author = (
+            name(user)
+            if user
+            else message.get("username") or message.get("bot_id") or "unknown"
+        )
+        line = f"{author}: {text}"
+        if line in seen:
+            continue
+        seen.add(line)
+        recent.append(line)
+        if len(recent) > dedupe_window:
+            seen.discard(recent.popleft())
+        yield line
+
+
+def chunk_lines(lines: Iterable[str], max_chars: int) -> Iterator[list[str]]:
+    """Group lines into chunks of at most ``max_chars`` characters."""
+    chunk: list[str] = []
+    size = 0
+    for line in lines:
+        line = line[:max_chars]
+        if chunk and size + len(line) + 1 > max_chars:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line) + 1
+    if chunk:
+        yield chunk
+
+
+class MapReduceSummarizer:
+    """Summarizes a stream of lines with a bounded amount of text in memory.
+
+    Each chunk of at most ``max_chars`` is summarized on its own (map).
+    Before a partial summary that would push the held ones past
+    ``max_chars`` is added, they are combined (reduce), and once more at the
+    end, so at any time only one chunk and about ``max_chars`` of partial
+    summaries are held, however long the conversation. Partials are never
+    cut: reduces take consecutive groups that fit ``max_chars``. With
+    ``newest_first`` the input runs backwards in time; chunks and partial
+    summaries are put back in chronological order before they are
+    summarized.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str, str], str],
+        max_chars: int = CHUNK_CHARS,
+        newest_first: bool = False,
+    ) -> None:
+        self._summarize = summarize
+        self.max_chars = max(max_chars, 100)
+        self.newest_first = newest_first
+        self.map_calls = 0
+        self.reduce_calls = 0
+
+    def _map(self, chunk: list[str]) -> str:
+        self.map_calls += 1
+        if self.newest_first:
+            chunk.reverse()
+        return self._summarize("map", MAP_PROMPT + "\n".join(chunk))
+
+    def _reduce(self, partials: list[str]) -> str:
+        self.reduce_calls += 1
+        ordered = reversed(partials) if self.newest_first else partials
+        return self._summarize("reduce", REDUCE_PROMPT + "\n\n".join(ordered))
+
+    def _groups(self, partials: list[str]) -> Iterator[list[str]]:
+        """Consecutive runs of partials that fit ``max_chars`` together."""
+        group: list[str] = []
+        size = 0
+        for partial in partials:
+            if group and size + len(partial) > self.max_chars:
+                yield group
+                group, size = [], 0
+            group.append(partial)
+            size += len(partial) + 2
+        if group:
+            yield group
+
+    def _combine(self, partials: list[str]) -> str:
+        """Reduce ``partials`` group by group until one summary is left."""
+        while len(partials) > 1:
+            groups = list(self._groups(partials))
+            if len(groups) == len(partials):
+                # every partial is over half of max_chars; pair them up so
+                # the number of partials still shrinks
+                groups = [partials[i : i + 2] for i in range(0, len(partials), 2)]
+            partials = [
+                self._reduce(group) if len(group) > 1 else group[0] for group in groups
+            ]
+        return partials[0]
+
+    def summarize(self, lines: Iterable[str]) -> str:
+        partials: list[str] = []
+        size = 0
+        for chunk in chunk_lines(lines, self.max_chars):
+            partial = self._map(chunk)
+            if len(partials) > 1 and size + len(partial) > self.max_chars:
+                partials = [self._combine(partials)]
+                size = len(partials[0]) + 2
+            partials.append(partial)
+            size += len(partial) + 2
+        return self._combine(partials) if partials else ""
+
+
+# Shared by every endpoint in the process.
+user_directory = UserDirectory()
@@ -0,0 +1,109 @@
+import threading
+from typing import Any
+
+from endpoints.cache import TTLCache
+
+PAGE_SIZE = 200
+
+
+class ThreadHistory:
+    """Messages of one Slack thread fetched so far, oldest first."""
+
+    def __init__(self) -> None:
+        self.messages: list[tuple[str, str, str]] = []
+        self.lock = threading.Lock()
+
+    @property
+    def latest_ts(self) -> str | None:
+        return self.messages[-1][0] if self.messages else None
+
+
+def _ts_key(ts: str) -> float:
+    return float(ts)
+
+
+class ThreadContextBuilder:
+    """Builds the text of earlier thread messages to give Dify as context.
+
+    The first call for a thread pages through ``conversations_replies``;
+    later calls only ask for messages newer than the last one seen. Histories
+    are kept per (channel, thread_ts) and forgotten after ``ttl`` idle seconds.
+    """
+
+    def __init__(
+        self, maxsize: int = 1000, ttl: float = 3600.0, page_size: int = PAGE_SIZE
+    ) -> None:
+        self._histories: TTLCache[tuple[str, str], ThreadHistory] = TTLCache(
+            maxsize=maxsize, ttl=ttl, sliding=True
+        )
+        self.page_size = page_size
+
+    def _fetch(
+        self, client: Any, channel: str, thread_ts: str, history: ThreadHistory
+    ) -> None:
+        latest = history.latest_ts
+        cursor = None
+        while True:
+            args: dict[str, Any] = {
+                "channel": channel,
+                "ts": thread_ts,
+                "limit": self.page_size,
+            }
+            if latest is not None:
+                args["oldest"] = latest
+                args["inclusive"] = False
+            if cursor:
+                args["cursor"] = cursor
+            response = client.conversations_replies(**args)
+            for message in response.get("messages") or []:
+                ts = message.get("ts")
+                # the thread parent is returned on every page
+                if not ts or (
+                    history.latest_ts is not None
+                    and _ts_key(ts) <= _ts_key(history.latest_ts)
+                ):
+                    continue
+                author = message.get("user") or message.get("bot_id") or "unknown"
+                history.messages.append((ts, author, message.get("text", "")))
+            cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                return
+
+    def build(
+        self,
+        client: Any,
+        channel: str,
+        thread_ts: str,
+        before_ts: str,
+        max_chars: int,
+    ) -> str:
+        """Thread messages before ``before_ts``, newest kept within ``max_chars``."""
+        if thread_ts == before_ts:
+            # the thread parent itself: nothing in the thread precedes it
+            return ""
+        history = self._histories.get_or_create((channel, thread_ts), ThreadHistory)
+        with history.lock:
+            latest = history.latest_ts
+            if latest is None or _ts_key(latest) < _ts_key(before_ts):
+                self._fetch(client, channel, thread_ts, history)
+            messages = [
+                m for m in history.messages if _ts_key(m[0]) < _ts_key(before_ts)
+            ]
+        lines: list[str] = []
+        remaining = max_chars
+        for _, author, text in reversed(messages):
+            line = f"{author}: {text}"
+            if len(line) > remaining:
+                if remaining > 0 and not lines:
+                    lines.append(line[-remaining:])
+                break
+            lines.append(line)
+            remaining -= len(line) + 1
+        return "\n".join(reversed(lines))
+
+    def clear(self) -> None:
+        self._histories.clear()
+
+
+# Shared by every endpoint in the process.
+thread_contexts = ThreadContextBuilder()
@@ -0,0 +1,230 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from endpoints.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_REJECT = "reject"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_CALLER_RUNS = "caller_runs"
+OVERFLOW_POLICIES = (OVERFLOW_REJECT, OVERFLOW_DROP_OLDEST, OVERFLOW_CALLER_RUNS)
+
+
+@dataclass
+class StageStat:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class StageStats:
+    """Aggregated wall-clock time per pipeline stage (enqueue wait, Dify, post)."""
+
+    stages: dict[str, StageStat] = field(default_factory=dict)
+    # also receives every observation, e.g. the metrics histograms
+    sink: Callable[[str, float], None] | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            stat = self.stages.setdefault(stage, StageStat())
+            stat.count += 1
+            stat.total += seconds
+            if seconds > stat.max:
+                stat.max = seconds
+        if self.sink is not None:
+            self.sink(stage, seconds)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {"count": s.count, "mean": s.mean, "max": s.max}
+                for name, s in self.stages.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+
+
+stage_stats = StageStats(sink=metrics.observe)
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    kwargs: dict[str, Any]
+    enqueued_at: float
+    on_drop: Callable[[], Any] | None = None
+
+
+class WorkerPool:
+    """Bounded queue drained by a fixed number of daemon worker threads."""
+
+    def __init__(
+        self, size: int, queue_size: int, overflow: str = OVERFLOW_REJECT
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.size = max(1, size)
+        self.overflow = overflow
+        self._queue: queue.Queue[_Job | None] = queue.Queue(maxsize=max(1, queue_size))
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.rejected = 0
+        self.dropped = 0
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                thread = threading.Thread(
+                    target=self._worker, name=f"slack-bot2-worker-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def config(self) -> tuple[int, int, str]:
+        return (self.size, self._queue.maxsize, self.overflow)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        /,
+        on_drop: Callable[[], Any] | None = None,
+        **kwargs: Any,
+    ) -> bool:
+        """Queue ``fn(**kwargs)``. Returns False when the job was rejected.
+
+        ``on_drop`` is called if the job is later pushed out of the queue by
+        the drop_oldest policy, so the caller can undo what it set up for it.
+        A pool that has been shut down rejects every job.
+        """
+        if self._closed:
+            self.rejected += 1
+            logger.warning("Worker pool is shut down, rejected event")
+            return False
+        self._ensure_started()
+        job = _Job(
+            fn=fn, kwargs=kwargs, enqueued_at=time.perf_counter(), on_drop=on_drop
+        )
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            pass
+        if self.overflow == OVERFLOW_DROP_OLDEST:
+            try:
+                dropped = self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+                logger.warning("Worker queue full, dropped oldest queued event")
+                if dropped is not None and dropped.on_drop is not None:
+                    dropped.on_drop()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(job)
+                return True
+            except queue.Full:
+                pass
+        elif self.overflow == OVERFLOW_CALLER_RUNS:
+            self._run(job)
+            return True
+        self.rejected += 1
+        logger.warning("Worker queue full, rejected event")
+        return False
+
+    def join(self) -> None:
+        """Block until every queued job has been processed."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs; the workers exit once the queue is drained.
+
+        Returns immediately: the stop markers are queued behind the pending
+        jobs from a helper thread, since the queue may be full.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = len(self._threads)
+        if threads:
+            threading.Thread(
+                target=self._stop_workers,
+                args=(threads,),
+                name="slack-bot2-worker-stop",
+                daemon=True,
+            ).start()
+
+    def _stop_workers(self, count: int) -> None:
+        for _ in range(count):
+            self._queue.put(None)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: _Job) -> None:
+        stage_stats.record("enqueue_wait", time.perf_counter() - job.enqueued_at)
+        try:
+            job.fn(**job.kwargs)
+        except Exception:
+            logger.exception("Unhandled error in background worker")
+
+
+_pools: dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(key: str, size: int, queue_size: int, overflow: str) -> WorkerPool:
+    """Return the pool of the endpoint identified by ``key``.
+
+    Each endpoint keeps one pool. When its settings change the pool is
+    replaced, and the old one shuts down after finishing its queued jobs,
+    so no threads are left behind.
+    """
+    config = (max(1, size), max(1, queue_size), overflow)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.config == config:
+            return pool
+        new_pool = WorkerPool(size, queue_size, overflow)
+        _pools[key] = new_pool
+    if pool is not None:
+        pool.shutdown()
+    return new_pool
+
+
+def clear_worker_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from endpoints.admission import (
+    ADMITTED,
+    COALESCED,
+    SHED,
+    AdmissionController,
+    clear_admission_controllers,
+    get_admission_controller,
+)
+
+
+class TestAdmissionController:
+    def test_global_cap_sheds_without_queue(self) -> None:
+        controller = AdmissionController(max_total=1)
+
+        assert controller.acquire("C1") == ADMITTED
+        assert controller.acquire("C2") == SHED
+        controller.release("C1")
+        assert controller.acquire("C2") == ADMITTED
+
+        stats = controller.stats()
+        assert stats["admitted"] == 2
+        assert stats["shed"] == 1
+
+    def test_per_channel_cap(self) -> None:
+        controller = AdmissionController(max_total=0, max_per_channel=1)
+
+        assert controller.acquire("C1") == ADMITTED
+        assert controller.acquire("C1") == SHED
+        assert controller.acquire("C2") == ADMITTED
+
+    def test_per_user_cap(self) -> None:
+        controller = AdmissionController(max_total=0, max_per_user=1)
+
+        assert controller.acquire("C1", "U1") == ADMITTED
+        assert controller.acquire("C2", "U1") == SHED
+        assert controller.acquire("C2", "U2") == ADMITTED
+
+    def test_queued_event_admitted_after_release(self) -> None:
+        controller = AdmissionController(max_total=1, max_waiting=1, wait_timeout=5)
+        controller.acquire("C1")
+        results: list[str] = []
+
+        waiter = threading.Thread(
+            target=lambda: results.append(controller.acquire("C2"))
+        )
+        waiter.start()
+        time.sleep(0.05)
+        assert controller.stats()["waiting"] == 1
+        controller.release("C1")
+        waiter.join()
+
+        assert results == [ADMITTED]
+        assert controller.stats()["queued"] == 1
+
+    def test_queue_wait_timeout_sheds(self) -> None:
+        controller = AdmissionController(max_total=1, max_waiting=1, wait_timeout=0.01)
+        controller.acquire("C1")
+
+        assert controller.acquire("C2") == SHED
+        assert controller.stats()["waiting"] == 0
+
+    def test_coalesce_identical_event(self) -> None:
+        controller = AdmissionController(max_total=1)
+        controller.acquire("C1", fingerprint=("C1", "vpn?"))
+
+        assert (
+            controller.acquire("C1", fingerprint=("C1", "vpn?"), coalesce=True)
+            == COALESCED
+        )
+        assert (
+            controller.acquire("C1", fingerprint=("C1", "leave?"), coalesce=True)
+            == SHED
+        )
+        assert controller.stats()["coalesced"] == 1
+
+    def test_one_controller_per_endpoint(self) -> None:
+        first = get_admission_controller("xoxb-a", 1, 0, 0, 0, 1.0)
+
+        assert get_admission_controller("xoxb-a", 1, 0, 0, 0, 1.0) is first
+        assert get_admission_controller("xoxb-b", 1, 0, 0, 0, 1.0) is not first
+        # changed limits replace the endpoint's controller
+        second = get_admission_controller("xoxb-a", 2, 0, 0, 0, 1.0)
+        assert second is not first
+        assert second.max_total == 2
+        assert get_admission_controller("xoxb-a", 2, 0, 0, 0, 1.0) is second
+        clear_admission_controllers()
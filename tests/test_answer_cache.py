@@ -0,0 +1,72 @@
+from endpoints.answer_cache import (
+    AnswerCache,
+    answer_cache_key,
+    get_answer_cache,
+    normalize_query,
+)
+
+
+class TestNormalizeQuery:
+    def test_case_whitespace_and_punctuation(self) -> None:
+        assert (
+            normalize_query("  What's the  VPN\naddress? ") == "what's the vpn address"
+        )
+
+
+class TestAnswerCacheKey:
+    def test_same_question_matches(self) -> None:
+        inputs = {"event_type": "app_mention", "reaction": None, "channel": "C1"}
+        other = {"event_type": "app_mention", "reaction": None, "channel": "C2"}
+
+        assert answer_cache_key("app", "VPN address?", inputs) == answer_cache_key(
+            "app", "vpn address", other
+        )
+
+    def test_app_and_inputs_are_part_of_key(self) -> None:
+        mention = {"event_type": "app_mention", "reaction": None}
+        reaction = {"event_type": "reaction_added", "reaction": "eyes"}
+
+        assert answer_cache_key("a", "q", mention) != answer_cache_key(
+            "b", "q", mention
+        )
+        assert answer_cache_key("a", "q", mention) != answer_cache_key(
+            "a", "q", reaction
+        )
+
+    def test_thread_context_and_files_are_part_of_key(self) -> None:
+        mention = {"event_type": "app_mention", "reaction": None}
+        in_thread = {**mention, "thread_context": "alice: the VPN is down"}
+        with_file = {**mention, "files": [{"upload_file_id": "up-1"}]}
+        other_file = {**mention, "files": [{"upload_file_id": "up-2"}]}
+
+        keys = {
+            answer_cache_key("a", "q", inputs)
+            for inputs in (mention, in_thread, with_file, other_file)
+        }
+        assert len(keys) == 4
+
+
+class TestAnswerCache:
+    def test_hit_and_miss_ratio(self) -> None:
+        cache = AnswerCache(max_bytes=1024, ttl=60)
+
+        assert cache.get("k") is None
+        cache.set("k", "answer")
+        assert cache.get("k") == "answer"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["bytes"] == len(b"answer")
+
+    def test_byte_limit(self) -> None:
+        cache = AnswerCache(max_bytes=10, ttl=60)
+        cache.set("a", "x" * 6)
+        cache.set("b", "y" * 6)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "y" * 6
+
+    def test_shared_per_config(self) -> None:
+        assert get_answer_cache(100, 60) is get_answer_cache(100, 60)
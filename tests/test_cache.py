@@ -0,0 +1,99 @@
+from endpoints.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    def test_lru_eviction(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self) -> None:
+        clock = FakeClock()
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5.0, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_sliding_expiry(self) -> None:
+        clock = FakeClock()
+        cache: TTLCache[str, int] = TTLCache(
+            maxsize=10, ttl=5.0, sliding=True, clock=clock
+        )
+        cache.set("a", 1)
+
+        clock.now = 4.0
+        assert cache.get("a") == 1
+        clock.now = 8.0
+        assert cache.get("a") == 1
+        clock.now = 13.1
+        assert cache.get("a") is None
+
+    def test_get_or_create(self) -> None:
+        cache: TTLCache[str, object] = TTLCache(maxsize=10)
+        calls: list[int] = []
+
+        def factory() -> object:
+            calls.append(1)
+            return object()
+
+        first = cache.get_or_create("a", factory)
+
+        assert cache.get_or_create("a", factory) is first
+        assert len(calls) == 1
+
+    def test_purge(self) -> None:
+        clock = FakeClock()
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=1.0, clock=clock)
+        cache.set("a", 1)
+        clock.now = 0.5
+        cache.set("b", 2)
+        clock.now = 1.2
+
+        assert cache.purge() == 1
+        assert "b" in cache
+
+    def test_max_bytes_evicts_lru(self) -> None:
+        cache: TTLCache[str, str] = TTLCache(maxsize=10, max_bytes=10, sizeof=len)
+        cache.set("a", "12345")
+        cache.set("b", "12345")
+        cache.set("c", "123")
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "12345"
+        assert cache.bytes == 8
+
+    def test_value_larger_than_max_bytes_is_not_kept(self) -> None:
+        cache: TTLCache[str, str] = TTLCache(maxsize=10, max_bytes=4, sizeof=len)
+        cache.set("a", "1234")
+        cache.set("b", "123456")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1234"
+        assert cache.bytes == 4
+
+    def test_replacing_value_updates_bytes(self) -> None:
+        cache: TTLCache[str, str] = TTLCache(maxsize=10, max_bytes=100, sizeof=len)
+        cache.set("a", "1234")
+        cache.set("a", "12")
+
+        assert cache.bytes == 2
+        cache.pop("a")
+        assert cache.bytes == 0
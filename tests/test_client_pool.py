@@ -0,0 +1,42 @@
+from typing import Any
+
+from endpoints.client_pool import ClientRegistry
+
+
+class FakeClient:
+    def __init__(self, **kwargs: Any) -> None:
+        self.kwargs = kwargs
+
+
+class TestClientRegistry:
+    def test_reuses_client_per_token(self) -> None:
+        registry = ClientRegistry(FakeClient)
+
+        first = registry.get("xoxb-1")
+
+        assert registry.get("xoxb-1") is first
+        assert registry.get("xoxb-2") is not first
+        assert first.kwargs["token"] == "xoxb-1"
+
+    def test_clients_share_ssl_context(self) -> None:
+        registry = ClientRegistry(FakeClient)
+
+        first = registry.get("xoxb-1")
+        second = registry.get("xoxb-2")
+
+        assert first.kwargs["ssl"] is second.kwargs["ssl"]
+
+    def test_caps_number_of_tokens(self) -> None:
+        registry = ClientRegistry(FakeClient, max_clients=2)
+        first = registry.get("xoxb-1")
+        registry.get("xoxb-2")
+        registry.get("xoxb-3")
+
+        assert len(registry) == 2
+        assert registry.get("xoxb-1") is not first
+
+    def test_evicts_idle_clients(self) -> None:
+        registry = ClientRegistry(FakeClient, idle_ttl=0.0)
+        first = registry.get("xoxb-1")
+
+        assert registry.get("xoxb-1") is not first
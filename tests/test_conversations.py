@@ -0,0 +1,30 @@
+from endpoints.conversations import ConversationStore, get_conversation_store
+
+
+class TestConversationStore:
+    def test_maps_thread_to_conversation(self) -> None:
+        store = ConversationStore()
+        store.set(("app-1", "ws", "C1", "1.0"), "conv-1")
+
+        assert store.get(("app-1", "ws", "C1", "1.0")) == "conv-1"
+        assert store.get(("app-1", "ws", "C1", "2.0")) is None
+        assert store.get(("app-1", "ws", "C2", "1.0")) is None
+        assert store.get(("app-2", "ws", "C1", "1.0")) is None
+        assert store.get(("app-1", "other", "C1", "1.0")) is None
+
+    def test_lru_eviction(self) -> None:
+        store = ConversationStore(maxsize=1)
+        store.set(("app-1", "ws", "C1", "1.0"), "conv-1")
+        store.set(("app-1", "ws", "C1", "2.0"), "conv-2")
+
+        assert store.get(("app-1", "ws", "C1", "1.0")) is None
+        assert len(store) == 1
+
+    def test_expiry(self) -> None:
+        store = ConversationStore(ttl=0)
+        store.set(("app-1", "ws", "C1", "1.0"), "conv-1")
+
+        assert store.get(("app-1", "ws", "C1", "1.0")) is None
+
+    def test_shared_per_config(self) -> None:
+        assert get_conversation_store(5, 60) is get_conversation_store(5, 60)
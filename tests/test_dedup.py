@@ -0,0 +1,140 @@
+import os
+from typing import Any
+
+import pytest
+
+from endpoints.dedup import (
+    MemoryDedupStore,
+    PluginStorageDedupStore,
+    SqliteDedupStore,
+    event_dedup_key,
+    get_dedup_store,
+)
+
+
+class FakeStorage:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    def exist(self, key: str) -> bool:
+        return key in self.data
+
+    def get(self, key: str) -> bytes:
+        return self.data[key]
+
+    def set(self, key: str, val: bytes) -> None:
+        self.data[key] = val
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+class TestEventDedupKey:
+    def test_prefers_event_id(self) -> None:
+        data = {"event_id": "Ev1", "event": {"type": "app_mention", "ts": "1.0"}}
+
+        assert event_dedup_key(data) == "event:Ev1"
+
+    def test_reaction_key(self) -> None:
+        data = {
+            "event": {
+                "type": "reaction_added",
+                "reaction": "eyes",
+                "item": {"channel": "C1", "ts": "1.0"},
+            }
+        }
+
+        assert event_dedup_key(data) == "reaction:C1:1.0:eyes"
+
+    def test_message_key(self) -> None:
+        data = {"event": {"type": "app_mention", "channel": "C1", "ts": "1.0"}}
+
+        assert event_dedup_key(data) == "message:C1:1.0"
+
+    def test_no_key(self) -> None:
+        assert event_dedup_key({"event": {"type": "unknown"}}) is None
+
+
+class TestDedupStores:
+    @pytest.fixture(params=["memory", "sqlite", "plugin_storage"])
+    def make_store(self, request: Any, tmp_path: Any) -> Any:
+        def make(ttl: float = 60) -> Any:
+            if request.param == "memory":
+                return MemoryDedupStore(maxsize=10, ttl=ttl)
+            if request.param == "sqlite":
+                return SqliteDedupStore(str(tmp_path / "dedup.sqlite3"), ttl=ttl)
+            return PluginStorageDedupStore(FakeStorage(), maxsize=10, ttl=ttl)
+
+        return make
+
+    def test_claim_once(self, make_store: Any) -> None:
+        store = make_store()
+
+        assert store.claim("event:1") is True
+        assert store.claim("event:1") is False
+        assert store.claim("event:2") is True
+
+    def test_release_allows_reclaim(self, make_store: Any) -> None:
+        store = make_store()
+        store.claim("event:1")
+        store.release("event:1")
+
+        assert store.claim("event:1") is True
+
+    def test_expired_key_can_be_claimed(self, make_store: Any) -> None:
+        store = make_store(ttl=0)
+        store.claim("event:1")
+
+        assert store.claim("event:1") is True
+
+
+class TestSqliteDedupStore:
+    def test_shared_between_connections(self, tmp_path: Any) -> None:
+        path = str(tmp_path / "dedup.sqlite3")
+        first = SqliteDedupStore(path, ttl=60)
+        second = SqliteDedupStore(path, ttl=60)
+
+        assert first.claim("event:1") is True
+        assert second.claim("event:1") is False
+
+    def test_size_bounded(self, tmp_path: Any) -> None:
+        store = SqliteDedupStore(str(tmp_path / "dedup.sqlite3"), maxsize=5, ttl=60)
+        for i in range(SqliteDedupStore.PURGE_EVERY):
+            store.claim(f"event:{i}")
+
+        count = store._conn.execute("SELECT COUNT(*) FROM slack_events").fetchone()
+        assert count[0] == 5
+
+
+class TestPluginStorageDedupStore:
+    def test_bounded_slots(self) -> None:
+        storage = FakeStorage()
+        store = PluginStorageDedupStore(storage, maxsize=4, ttl=60)
+        for i in range(50):
+            store.claim(f"event:{i}")
+
+        assert len(storage.data) <= 4
+
+    def test_storage_failure_processes_event(self) -> None:
+        storage = FakeStorage()
+
+        def unavailable(key: str) -> bool:
+            raise RuntimeError("down")
+
+        storage.exist = unavailable  # type: ignore[method-assign]
+        store = PluginStorageDedupStore(storage)
+
+        assert store.claim("event:1") is True
+
+
+class TestGetDedupStore:
+    def test_disabled(self) -> None:
+        assert get_dedup_store("none", 10, 60) is None
+
+    def test_memory_store_is_shared(self) -> None:
+        assert get_dedup_store("memory", 10, 60) is get_dedup_store("memory", 10, 60)
+
+    def test_sqlite_store(self, tmp_path: Any) -> None:
+        path = os.path.join(str(tmp_path), "dedup.sqlite3")
+
+        assert isinstance(get_dedup_store("sqlite", 10, 60, path), SqliteDedupStore)
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from endpoints.event_loop import (
+    AsyncRunner,
+    clear_async_runners,
+    get_async_runner,
+    shared_session,
+)
+
+
+@pytest.fixture
+def runner() -> Iterator[AsyncRunner]:
+    runner = AsyncRunner(blocking_threads=2)
+    yield runner
+    runner.stop()
+
+
+def test_submit_runs_coroutine_on_loop_thread(runner: AsyncRunner) -> None:
+    async def work() -> str:
+        await asyncio.sleep(0)
+        return threading.current_thread().name
+
+    assert runner.submit(work()).result(timeout=5) == "slack-bot2-event-loop"
+
+
+def test_many_waiting_events_share_one_thread(runner: AsyncRunner) -> None:
+    async def wait() -> None:
+        await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    for _ in range(200):
+        runner.submit(wait())
+    runner.join(timeout=5)
+
+    assert time.perf_counter() - started < 2
+    assert runner.peak_in_flight > 100
+    assert runner.in_flight == 0
+
+
+def test_run_blocking_uses_bounded_executor(runner: AsyncRunner) -> None:
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking(value: int) -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return value * 2
+
+    async def work(value: int) -> int:
+        return int(await runner.run_blocking(blocking, value=value))
+
+    futures = [runner.submit(work(i)) for i in range(6)]
+
+    assert [f.result(timeout=5) for f in futures] == [0, 2, 4, 6, 8, 10]
+    assert peak <= 2
+
+
+def test_task_errors_are_logged_not_raised(
+    runner: AsyncRunner, caplog: pytest.LogCaptureFixture
+) -> None:
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    assert runner.submit(fail()).result(timeout=5) is None
+    assert "Unhandled error in event loop task" in caplog.text
+
+
+def test_shared_session_is_reused_on_a_loop(runner: AsyncRunner) -> None:
+    pytest.importorskip("aiohttp")
+
+    async def sessions() -> tuple[object, object]:
+        return shared_session(), shared_session()
+
+    first, second = runner.submit(sessions()).result(timeout=5)
+
+    assert first is second
+
+
+def test_get_async_runner_replaces_and_stops_old_runner() -> None:
+    first = get_async_runner("xoxb-a", 2)
+    first._ensure_started()
+
+    assert get_async_runner("xoxb-a", 2) is first
+    assert get_async_runner("xoxb-b", 2) is not first
+
+    second = get_async_runner("xoxb-a", 4)
+
+    assert second is not first
+    assert second.blocking_threads == 4
+    assert first._executor is None
+    clear_async_runners()
@@ -0,0 +1,118 @@
+from typing import Any
+
+from endpoints.events import (
+    AppMention,
+    MessageRef,
+    ReactionAdded,
+    fill_blocks,
+    parse_event,
+    parse_message,
+)
+
+
+def test_parses_app_mention() -> None:
+    event = parse_event(
+        {
+            "type": "app_mention",
+            "text": "<@U1> what is up?",
+            "channel": "C1",
+            "ts": "1.0",
+            "user": "U2",
+            "thread_ts": "0.5",
+            "blocks": [{"type": "rich_text"}],
+            "client_msg_id": "ignored",
+        }
+    )
+
+    assert isinstance(event, AppMention)
+    assert event.ref == MessageRef("C1", "1.0")
+    assert event.query == "what is up?"
+    assert (event.user, event.thread_ts, event.files) == ("U2", "0.5", [])
+    assert event.blocks == [{"type": "rich_text"}]
+
+
+def test_app_mention_not_addressed_has_no_query() -> None:
+    event = parse_event({"type": "app_mention", "text": "hi <@U1>"})
+
+    assert isinstance(event, AppMention)
+    assert event.query is None
+    assert event.ref == MessageRef("", "")
+
+
+def test_parses_reaction_added() -> None:
+    event = parse_event(
+        {
+            "type": "reaction_added",
+            "reaction": "eyes",
+            "user": "U2",
+            "item": {"type": "message", "channel": "C1", "ts": "1.0"},
+        }
+    )
+
+    assert event == ReactionAdded("eyes", "U2", MessageRef("C1", "1.0"), "C1")
+    assert event.channel == "C1"
+
+
+def test_reaction_on_file_has_no_item() -> None:
+    event = parse_event(
+        {"type": "reaction_added", "reaction": "eyes", "item": {"type": "file"}}
+    )
+
+    assert isinstance(event, ReactionAdded)
+    assert event.item is None
+
+
+def test_unhandled_event_is_not_parsed() -> None:
+    assert parse_event({"type": "message", "text": "hi"}) is None
+    assert parse_event({}) is None
+
+
+def test_parse_message_defaults() -> None:
+    message = parse_message({"ts": "1.0", "text": None, "reply_count": 3})
+
+    assert message.text == ""
+    assert message.reply_count == 3
+    assert (message.blocks, message.files, message.thread_ts) == ([], [], None)
+
+
+def test_fill_section_text_leaves_original() -> None:
+    blocks: list[dict[str, Any]] = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": "question"}},
+        {"type": "divider"},
+    ]
+
+    filled = fill_blocks(blocks, "answer")
+
+    assert filled[0] == {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": "answer"},
+    }
+    assert filled[1] is blocks[1]
+    assert blocks[0]["text"]["text"] == "question"
+
+
+def test_fill_rich_text_replaces_first_section() -> None:
+    blocks: list[dict[str, Any]] = [
+        {
+            "type": "rich_text",
+            "elements": [
+                {"type": "rich_text_section", "elements": [{"text": "question"}]},
+                {"type": "rich_text_list", "elements": []},
+            ],
+        }
+    ]
+
+    filled = fill_blocks(blocks, "answer")
+    again = fill_blocks(blocks, "answer")
+
+    assert filled == again
+    assert filled[0]["elements"][0]["elements"] == [{"type": "text", "text": "answer"}]
+    assert filled[0]["elements"][1] is blocks[0]["elements"][1]
+    assert blocks[0]["elements"][0]["elements"] == [{"text": "question"}]
+
+
+def test_fill_other_blocks_unchanged() -> None:
+    blocks: list[dict[str, Any]] = [{"type": "divider"}]
+
+    assert fill_blocks(blocks, "answer") is blocks
+    assert fill_blocks([], "answer") == []
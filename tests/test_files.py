@@ -0,0 +1,189 @@
+import threading
+from typing import IO, Any
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from endpoints.cache import TTLCache
+from endpoints.files import (
+    FilePipeline,
+    FileTooLarge,
+    UntrustedFileURL,
+    UploadKey,
+    download,
+)
+
+
+def _response(chunks: list[bytes], status_code: int = 200) -> Mock:
+    response = Mock()
+    response.status_code = status_code
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+def _url(n: int) -> str:
+    return f"https://files.slack.com/files-pri/T1-F{n}/f"
+
+
+def _resolved(file_id: str) -> dict[str, Any]:
+    return {"id": file_id, "url_private": _url(int(file_id[1:]))}
+
+
+class TestDownload:
+    def test_streams_with_bearer_token(self) -> None:
+        get = Mock(return_value=_response([b"abc", b"def"]))
+
+        with download("https://files.slack.com/x", "xoxb-1", limit=10, get=get) as body:
+            assert body.read() == b"abcdef"
+
+        assert get.call_args.kwargs["headers"] == {"Authorization": "Bearer xoxb-1"}
+        assert get.call_args.kwargs["stream"] is True
+        get.return_value.close.assert_called_once()
+
+    def test_aborts_over_limit(self) -> None:
+        get = Mock(return_value=_response([b"abc", b"def"]))
+
+        with pytest.raises(FileTooLarge):
+            download("https://files.slack.com/x", "t", limit=4, get=get)
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://attacker.example/x",
+            "http://files.slack.com/x",
+            "https://files.slack.com.attacker.example/x",
+        ],
+    )
+    def test_refuses_other_hosts(self, url: str) -> None:
+        get = Mock()
+
+        with pytest.raises(UntrustedFileURL):
+            download(url, "xoxb-1", limit=4, get=get)
+        get.assert_not_called()
+
+    def test_http_error(self) -> None:
+        get = Mock(return_value=_response([], status_code=404))
+
+        with pytest.raises(requests.HTTPError):
+            download("https://files.slack.com/x", "t", limit=4, get=get)
+
+
+class TestFilePipeline:
+    def _pipeline(
+        self,
+        get: Any,
+        upload: Any = None,
+        max_file_bytes: int = 100,
+        max_event_bytes: int = 150,
+    ) -> FilePipeline:
+        if upload is None:
+
+            def upload(name: str, body: IO[bytes], mimetype: str) -> Mock:
+                uploaded = Mock()
+                uploaded.to_app_parameter.return_value = {
+                    "upload_file_id": f"up-{name}",
+                    "content": body.read(),
+                }
+                return uploaded
+
+        return FilePipeline(
+            upload=upload,
+            max_file_bytes=max_file_bytes,
+            max_event_bytes=max_event_bytes,
+            cache=TTLCache(maxsize=10),
+            get=get,
+        )
+
+    def test_selects_within_caps(self) -> None:
+        pipeline = self._pipeline(get=Mock())
+        files = [
+            {"id": "F1", "size": 80},
+            {"id": "F2", "size": 200},
+            {"id": "F3", "size": 80},
+            {"id": "F4", "size": 60},
+        ]
+
+        assert [f["id"] for f in pipeline.select(files)] == ["F1", "F4"]
+
+    def test_uploads_and_caches_by_file_id(self) -> None:
+        get = Mock(side_effect=lambda *a, **k: _response([b"data"]))
+        pipeline = self._pipeline(get=get)
+        files = [{"id": "F1", "size": 4}]
+        resolve = Mock(
+            return_value={"id": "F1", "name": "a.txt", "url_private": _url(1)}
+        )
+
+        first = pipeline.attach(files, "t", resolve=resolve)
+        second = pipeline.attach(files, "t", resolve=resolve)
+
+        assert first == [{"upload_file_id": "up-a.txt", "content": b"data"}]
+        assert second == first
+        assert get.call_count == 1
+        resolve.assert_called_once_with("F1")
+
+    def test_cache_is_scoped_to_app_and_token(self) -> None:
+        get = Mock(side_effect=lambda *a, **k: _response([b"data"]))
+        cache: TTLCache[UploadKey, dict[str, Any]] = TTLCache(maxsize=10)
+        files = [{"id": "F1", "size": 4}]
+        resolve = Mock(
+            return_value={"id": "F1", "name": "a.txt", "url_private": _url(1)}
+        )
+
+        def attach(app_id: str, token: str) -> None:
+            FilePipeline(
+                upload=lambda name, body, mimetype: Mock(
+                    to_app_parameter=Mock(return_value={"upload_file_id": name})
+                ),
+                max_file_bytes=100,
+                max_event_bytes=100,
+                cache=cache,
+                get=get,
+                app_id=app_id,
+            ).attach(files, token, resolve=resolve)
+
+        attach("app-a", "t1")
+        attach("app-a", "t1")
+        attach("app-b", "t1")
+        attach("app-a", "t2")
+
+        assert get.call_count == 3
+
+    def test_resolves_every_file_and_skips_failures(self) -> None:
+        get = Mock(
+            side_effect=lambda url, **k: _response(
+                [b"ok"], status_code=200 if url == _url(1) else 404
+            )
+        )
+        pipeline = self._pipeline(get=get)
+        resolve = Mock(side_effect=lambda file_id: _resolved(file_id))
+        files: list[dict[str, Any]] = [
+            {"id": "F1", "size": 2},
+            {"id": "F2", "url_private": _url(2)},
+        ]
+
+        attached = pipeline.attach(files, "t", resolve=resolve)
+
+        assert sorted(c.args[0] for c in resolve.call_args_list) == ["F1", "F2"]
+        assert [a["upload_file_id"] for a in attached] == ["up-F1"]
+
+    def test_ignores_payload_url(self) -> None:
+        get = Mock(side_effect=lambda *a, **k: _response([b"data"]))
+        pipeline = self._pipeline(get=get)
+        files = [{"id": "F1", "url_private": "https://attacker.example/f", "size": 4}]
+
+        pipeline.attach(files, "xoxb-secret", resolve=_resolved)
+
+        assert [c.args[0] for c in get.call_args_list] == [_url(1)]
+
+    def test_downloads_concurrently(self) -> None:
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get(url: str, **kwargs: Any) -> Mock:
+            barrier.wait()
+            return _response([b"x"])
+
+        pipeline = self._pipeline(get=get)
+        files = [{"id": "F1", "size": 1}, {"id": "F2", "size": 1}]
+
+        assert len(pipeline.attach(files, "t", resolve=_resolved)) == 2
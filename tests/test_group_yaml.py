@@ -0,0 +1,25 @@
+import os
+
+import yaml
+
+GROUP_YAML = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "group",
+    "slack-bot2.yaml",
+)
+SETTING_TYPES = {"text-input", "secret-input", "select", "boolean", "app-selector"}
+
+
+def test_group_yaml_structure() -> None:
+    with open(GROUP_YAML) as f:
+        group = yaml.safe_load(f)
+
+    assert group["endpoints"] == [
+        "endpoints/slack-bot2.yaml",
+        "endpoints/slack-bot2-metrics.yaml",
+    ]
+    names = [setting["name"] for setting in group["settings"]]
+    assert len(names) == len(set(names))
+    for setting in group["settings"]:
+        assert setting["type"] in SETTING_TYPES, setting["name"]
+        assert set(setting["label"]) == {"en_US", "zh_Hans", "pt_BR", "ja_JP"}
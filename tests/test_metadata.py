@@ -0,0 +1,166 @@
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from endpoints.metadata import (
+    RETRY_INTERVAL,
+    ChannelMeta,
+    MetadataCache,
+    UserMeta,
+    clear_metadata_caches,
+    get_metadata_cache,
+    paginate,
+)
+
+
+def page(key: str, items: list[dict[str, Any]], cursor: str = "") -> dict[str, Any]:
+    return {key: items, "response_metadata": {"next_cursor": cursor}}
+
+
+def member(user_id: str, name: str, **extra: Any) -> dict[str, Any]:
+    return {"id": user_id, "profile": {"display_name": name}, **extra}
+
+
+def workspace_client() -> Mock:
+    client = Mock()
+    client.users_list.side_effect = lambda **kwargs: (
+        page("members", [member("U1", "alice", tz="Asia/Tokyo")], "c1")
+        if "cursor" not in kwargs
+        else page(
+            "members",
+            [member("U2", "bob", tz="Asia/Tokyo"), member("U3", "gone", deleted=True)],
+        )
+    )
+    client.conversations_list.return_value = page(
+        "channels",
+        [
+            {"id": "C1", "name": "general", "is_private": False},
+            {"id": "G1", "name": "ops", "is_private": True},
+        ],
+    )
+    return client
+
+
+def test_paginate_follows_cursor() -> None:
+    a, b, c = {"id": "a"}, {"id": "b"}, {"id": "c"}
+    fetch = Mock(side_effect=[page("items", [a, b], "next"), page("items", [c])])
+
+    assert list(paginate(fetch, "items", limit=2)) == [[a, b], [c]]
+    assert fetch.call_args_list[1][1] == {"limit": 2, "cursor": "next"}
+
+
+def test_refresh_loads_users_and_channels() -> None:
+    client = workspace_client()
+    cache = MetadataCache(client)
+
+    cache.refresh()
+
+    assert cache.users == {
+        "U1": UserMeta("alice", "Asia/Tokyo"),
+        "U2": UserMeta("bob", "Asia/Tokyo"),
+    }
+    assert cache.channel("G1") == ChannelMeta("ops", True)
+    assert client.conversations_list.call_args[1]["types"] == (
+        "public_channel,private_channel"
+    )
+    assert cache.loaded.is_set()
+
+
+def test_inputs_has_only_known_fields() -> None:
+    cache = MetadataCache(workspace_client())
+    assert cache.inputs("C1", "U1") == {}
+
+    cache.refresh()
+
+    assert cache.inputs("C1", "U1") == {
+        "channel_name": "general",
+        "channel_is_private": False,
+        "user_name": "alice",
+        "user_tz": "Asia/Tokyo",
+    }
+    assert cache.inputs("C9", None) == {}
+
+
+def test_refresh_updates_in_place_and_drops_removed() -> None:
+    client = workspace_client()
+    cache = MetadataCache(client)
+    cache.refresh()
+    bob = cache.users["U2"]
+
+    client.users_list.side_effect = None
+    client.users_list.return_value = page(
+        "members", [member("U1", "alice2"), member("U2", "bob", tz="Asia/Tokyo")]
+    )
+    client.conversations_list.return_value = page(
+        "channels", [{"id": "C1", "name": "general"}]
+    )
+    cache.refresh()
+
+    assert cache.users["U1"] == UserMeta("alice2", None)
+    assert cache.users["U2"] is bob
+    assert set(cache.channels) == {"C1"}
+
+
+def test_failed_refresh_keeps_entries() -> None:
+    client = workspace_client()
+    cache = MetadataCache(client)
+    cache.refresh()
+
+    client.conversations_list.side_effect = RuntimeError("missing_scope")
+    with pytest.raises(RuntimeError):
+        cache.refresh()
+
+    assert cache.channel("C1") == ChannelMeta("general", False)
+
+
+def test_failing_kind_backs_off_without_reloading_the_other() -> None:
+    now = [0.0]
+    client = workspace_client()
+    client.conversations_list.side_effect = RuntimeError("missing_scope")
+    cache = MetadataCache(client, refresh_interval=3600, clock=lambda: now[0])
+
+    assert cache.refresh_due() == RETRY_INTERVAL
+    assert cache.loaded.is_set()
+    assert cache.user("U1") == UserMeta("alice", "Asia/Tokyo")
+    assert client.users_list.call_count == 2
+
+    now[0] = RETRY_INTERVAL
+    # the second failure waits twice as long
+    assert cache.refresh_due() == 2 * RETRY_INTERVAL
+    assert client.conversations_list.call_count == 2
+    assert client.users_list.call_count == 2
+
+    client.conversations_list.side_effect = None
+    now[0] = 3 * RETRY_INTERVAL
+    cache.refresh_due()
+    assert cache.channel("C1") == ChannelMeta("general", False)
+    assert client.users_list.call_count == 2
+
+
+def test_backoff_is_capped_at_refresh_interval() -> None:
+    now = [0.0]
+    client = workspace_client()
+    client.conversations_list.side_effect = RuntimeError("missing_scope")
+    client.users_list.side_effect = RuntimeError("missing_scope")
+    cache = MetadataCache(client, refresh_interval=100, clock=lambda: now[0])
+
+    delays = []
+    for _ in range(4):
+        delay = cache.refresh_due()
+        delays.append(delay)
+        now[0] += delay
+
+    assert delays == [60.0, 100.0, 100.0, 100.0]
+
+
+def test_get_metadata_cache_loads_in_background() -> None:
+    client = workspace_client()
+    try:
+        cache = get_metadata_cache("xoxb-1", client)
+        assert cache.loaded.wait(5)
+        assert get_metadata_cache("xoxb-1", client) is cache
+        assert get_metadata_cache("xoxb-2", client) is not cache
+        assert cache.user("U2") == UserMeta("bob", "Asia/Tokyo")
+    finally:
+        clear_metadata_caches()
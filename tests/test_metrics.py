@@ -0,0 +1,113 @@
+import json
+import logging
+from typing import Any
+
+import pytest
+
+from endpoints.metrics import Histogram, Metrics
+from endpoints.worker_pool import StageStats
+
+
+class TestHistogram:
+    def test_quantiles_interpolate_within_buckets(self) -> None:
+        histogram = Histogram((0.1, 0.2, 0.4))
+        for value in [0.05] * 50 + [0.15] * 45 + [0.3] * 5:
+            histogram.observe(value)
+
+        assert histogram.count == 100
+        assert histogram.quantile(0.5) == pytest.approx(0.1)
+        assert 0.1 < histogram.quantile(0.95) <= 0.2
+        assert 0.2 < histogram.quantile(0.99) <= 0.3
+
+    def test_overflow_bucket_reports_max(self) -> None:
+        histogram = Histogram((0.1,))
+        histogram.observe(5.0)
+
+        assert histogram.quantile(0.99) == 5.0
+
+    def test_empty(self) -> None:
+        assert Histogram().quantile(0.5) == 0.0
+
+
+class TestMetrics:
+    def test_disabled_records_nothing(self) -> None:
+        metrics = Metrics()
+
+        with metrics.span("parse"):
+            pass
+        metrics.observe("dify_invoke", 1.0)
+        metrics.increment("events", event_type="app_mention", outcome="answered")
+
+        assert metrics.snapshot() == {"stages": {}, "counters": [], "gauges": {}}
+
+    def test_spans_and_counters(self) -> None:
+        metrics = Metrics(enabled=True)
+
+        with metrics.span("parse"):
+            pass
+        metrics.observe("dify_invoke", 2.0)
+        metrics.increment("events", event_type="app_mention", outcome="answered")
+        metrics.increment("events", event_type="app_mention", outcome="answered")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["stages"]["parse"]["count"] == 1
+        assert snapshot["stages"]["dify_invoke"]["p99"] == pytest.approx(2.0, rel=0.01)
+        assert snapshot["counters"] == [
+            {
+                "name": "events",
+                "labels": {"event_type": "app_mention", "outcome": "answered"},
+                "value": 2,
+            }
+        ]
+
+    def test_render_prometheus(self) -> None:
+        metrics = Metrics(enabled=True, buckets=(0.1, 1.0))
+        metrics.observe("slack_post", 0.5)
+        metrics.increment("events", event_type="reaction_added", outcome="error")
+
+        text = metrics.render_prometheus()
+
+        assert 'slack_bot2_stage_seconds_bucket{stage="slack_post",le="0.1"} 0' in text
+        assert 'slack_bot2_stage_seconds_bucket{stage="slack_post",le="1.0"} 1' in text
+        assert 'slack_bot2_stage_seconds_bucket{stage="slack_post",le="+Inf"} 1' in text
+        assert 'slack_bot2_stage_seconds_count{stage="slack_post"} 1' in text
+        assert (
+            'slack_bot2_events_total{event_type="reaction_added",outcome="error"} 1'
+            in text
+        )
+
+    def test_gauges_are_collected_on_export(self) -> None:
+        metrics = Metrics()
+        depth = [0]
+        metrics.register_gauges("rate_limit", lambda: {"queue_depth": depth[0]})
+        metrics.register_gauges("broken", lambda: 1 / 0)  # type: ignore[arg-type,return-value]
+
+        depth[0] = 3
+
+        assert metrics.snapshot()["gauges"] == {"rate_limit_queue_depth": 3}
+        text = metrics.render_prometheus()
+        assert "# TYPE slack_bot2_rate_limit_queue_depth gauge" in text
+        assert "slack_bot2_rate_limit_queue_depth 3" in text
+
+    def test_maybe_log_respects_interval(self, caplog: Any) -> None:
+        now = [0.0]
+        metrics = Metrics(enabled=True, clock=lambda: now[0])
+        metrics.observe("parse", 0.001)
+
+        with caplog.at_level(logging.INFO, logger="endpoints.metrics"):
+            metrics.maybe_log(60)
+            now[0] = 61.0
+            metrics.maybe_log(60)
+            metrics.maybe_log(60)
+
+        assert len(caplog.records) == 1
+        logged = json.loads(caplog.records[0].getMessage().split(" ", 1)[1])
+        assert logged["stages"]["parse"]["count"] == 1
+
+    def test_stage_stats_forward_to_sink(self) -> None:
+        metrics = Metrics(enabled=True)
+        stats = StageStats(sink=metrics.observe)
+
+        stats.record("enqueue_wait", 0.01)
+
+        assert metrics.snapshot()["stages"]["enqueue_wait"]["count"] == 1
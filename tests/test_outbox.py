@@ -0,0 +1,217 @@
+import threading
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from endpoints import outbox as outbox_module
+from endpoints.outbox import Outbox, workspace_key
+
+
+def slack_error(status: int) -> SlackApiError:
+    response = SlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/chat.postMessage",
+        req_args={},
+        data={"ok": False, "error": "fatal" if status >= 500 else "not_in_channel"},
+        headers={},
+        status_code=status,
+    )
+    return SlackApiError("failed", response)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def make_outbox(tmp_path: Any, clock: Clock) -> Any:
+    opened: list[Outbox] = []
+
+    def make() -> Outbox:
+        # drained explicitly with drain_once
+        outbox = Outbox(str(tmp_path / "outbox.jsonl"), clock=clock, drainer=False)
+        opened.append(outbox)
+        return outbox
+
+    yield make
+    for outbox in opened:
+        outbox.close()
+
+
+def message(text: str, channel: str = "C1") -> dict[str, Any]:
+    return {"channel": channel, "text": text, "blocks": []}
+
+
+def posted_texts(client: Mock) -> list[str]:
+    return [c[1]["text"] for c in client.chat_postMessage.call_args_list]
+
+
+def test_workspace_key_hides_token() -> None:
+    key = workspace_key("xoxb-secret")
+    assert key == workspace_key("xoxb-secret")
+    assert "secret" not in key
+    assert key != workspace_key("xoxb-other")
+
+
+def test_send_posts_in_order_and_clears(make_outbox: Any) -> None:
+    outbox = make_outbox()
+    client = Mock()
+
+    outbox.send(client, "W1", [message("one"), message("two")])
+
+    assert posted_texts(client) == ["one", "two"]
+    assert len(outbox) == 0
+    assert len(make_outbox()) == 0
+
+
+def test_send_edits_message_with_ts(make_outbox: Any) -> None:
+    client = Mock()
+
+    make_outbox().send(client, "W1", [{**message("final"), "ts": "1.1"}])
+
+    client.chat_update.assert_called_once_with(
+        channel="C1", text="final", blocks=[], ts="1.1"
+    )
+    client.chat_postMessage.assert_not_called()
+
+
+def test_failed_post_is_retried_with_backoff(make_outbox: Any, clock: Clock) -> None:
+    outbox = make_outbox()
+    client = Mock()
+    client.chat_postMessage.side_effect = [
+        slack_error(503),
+        slack_error(503),
+        {"ok": True},
+        {"ok": True},
+    ]
+
+    outbox.send(client, "W1", [message("one"), message("two")])
+    assert len(outbox) == 2
+
+    assert outbox.drain_once() == 0
+    assert outbox.drain_once() == 0  # backing off
+    clock.now += outbox_module.BACKOFF_BASE * 2
+    assert outbox.drain_once() == 2
+
+    assert posted_texts(client) == ["one", "one", "one", "two"]
+    assert len(outbox) == 0
+
+
+def test_non_retryable_error_drops_and_raises(make_outbox: Any) -> None:
+    outbox = make_outbox()
+    client = Mock()
+    client.chat_postMessage.side_effect = slack_error(200)
+
+    with pytest.raises(SlackApiError):
+        outbox.send(client, "W1", [message("one"), message("two")])
+
+    assert len(outbox) == 0
+
+
+def test_backlog_keeps_channel_order(make_outbox: Any) -> None:
+    outbox = make_outbox()
+    client = Mock()
+    client.chat_postMessage.side_effect = [ConnectionError("down"), *[{}] * 3]
+
+    outbox.send(client, "W1", [message("first")])
+    outbox.send(client, "W1", [message("second")])
+    outbox.send(client, "W1", [message("elsewhere", channel="C2")])
+    outbox.drain_once()
+
+    assert posted_texts(client) == ["first", "elsewhere", "first", "second"]
+
+
+def test_recovers_undelivered_entries_after_restart(make_outbox: Any) -> None:
+    outbox = make_outbox()
+    failing = Mock()
+    failing.chat_postMessage.side_effect = ConnectionError("down")
+    outbox.send(failing, "W1", [message("delivered later")])
+    outbox.send(Mock(), "W1", [message("delivered now", channel="C2")])
+    outbox.close()
+
+    restarted = make_outbox()
+    assert len(restarted) == 1
+    # nothing can be posted until the workspace's client is known again
+    assert restarted.drain_once() == 0
+    client = Mock()
+    restarted.register("W1", client)
+    assert restarted.drain_once() == 1
+    assert posted_texts(client) == ["delivered later"]
+
+
+def test_recovery_skips_torn_record(make_outbox: Any, tmp_path: Any) -> None:
+    outbox = make_outbox()
+    failing = Mock()
+    failing.chat_postMessage.side_effect = ConnectionError("down")
+    outbox.send(failing, "W1", [message("kept")])
+    outbox.close()
+    with open(tmp_path / "outbox.jsonl", "ab") as f:
+        f.write(b'{"op":"add","id":9,"work')
+
+    assert len(make_outbox()) == 1
+
+
+def test_expired_entries_are_dropped(make_outbox: Any, clock: Clock) -> None:
+    outbox = make_outbox()
+    client = Mock()
+    client.chat_postMessage.side_effect = ConnectionError("down")
+    outbox.send(client, "W1", [message("stale")])
+
+    clock.now += outbox_module.MAX_AGE + 1
+    outbox.drain_once()
+
+    assert len(outbox) == 0
+    assert client.chat_postMessage.call_count == 1
+
+
+def test_compaction_keeps_pending(
+    make_outbox: Any, tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.setattr(outbox_module, "COMPACT_AFTER", 5)
+    outbox = make_outbox()
+    failing = Mock()
+    failing.chat_postMessage.side_effect = ConnectionError("down")
+    outbox.send(failing, "W1", [message("pending", channel="C9")])
+    for i in range(6):
+        outbox.send(Mock(), "W1", [message(f"sent {i}")])
+    outbox.close()
+
+    lines = (tmp_path / "outbox.jsonl").read_bytes().splitlines()
+    assert len(lines) < 5
+    assert len(make_outbox()) == 1
+
+
+def test_concurrent_writers_share_fsyncs(tmp_path: Any) -> None:
+    calls = []
+
+    def slow_fsync(fd: int) -> None:
+        calls.append(fd)
+        time.sleep(0.01)
+
+    outbox = Outbox(str(tmp_path / "outbox.jsonl"), fsync=slow_fsync, drainer=False)
+    threads = [
+        threading.Thread(target=outbox.add, args=("W1", [message(str(i))]))
+        for i in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    outbox.close()
+
+    assert len(outbox) == 20
+    assert outbox.fsyncs == len(calls) < 20
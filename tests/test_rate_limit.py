@@ -0,0 +1,210 @@
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from endpoints.event_loop import AsyncRunner
+from endpoints.metrics import metrics
+from endpoints.rate_limit import (
+    AsyncRateLimitedClient,
+    RateLimitedClient,
+    RateLimitScheduler,
+    TokenBucket,
+    clear_schedulers,
+    get_scheduler,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def rate_limited_error(retry_after: str = "2") -> SlackApiError:
+    response = Mock()
+    response.status_code = 429
+    response.headers = {"Retry-After": retry_after}
+    return SlackApiError("ratelimited", response=response)
+
+
+class TestTokenBucket:
+    def test_burst_then_wait(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == pytest.approx(1.0)
+
+    def test_refills_over_time(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        clock.now += 5
+
+        assert bucket.acquire() == 0.0
+
+    def test_pause(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=5, clock=clock, sleep=clock.sleep)
+        bucket.pause(3.0)
+
+        assert bucket.acquire() == pytest.approx(4.0)
+
+
+class TestRateLimitScheduler:
+    def test_post_buckets_are_per_channel(self) -> None:
+        scheduler = RateLimitScheduler()
+
+        assert scheduler.bucket("chat_postMessage", "C1") is not scheduler.bucket(
+            "chat_postMessage", "C2"
+        )
+        assert scheduler.bucket("conversations_history", "C1") is scheduler.bucket(
+            "conversations_history", "C2"
+        )
+
+    def test_records_throttle_wait(self) -> None:
+        slept: list[float] = []
+        scheduler = RateLimitScheduler(sleep=slept.append)
+        for _ in range(10):
+            scheduler.acquire("users_list")
+
+        stats = scheduler.stats()
+        assert stats["throttled"] > 0
+        assert stats["throttle_wait_seconds"] == pytest.approx(sum(slept))
+        assert stats["queue_depth"] == 0
+
+    def test_try_acquire_never_waits(self) -> None:
+        scheduler = RateLimitScheduler(sleep=Mock(side_effect=AssertionError))
+        taken = [scheduler.try_acquire("users_list") for _ in range(10)]
+
+        assert taken[0] and not all(taken)
+        assert scheduler.stats()["overdrawn"] == taken.count(False)
+
+    def test_stats_are_exported_through_metrics(self) -> None:
+        clear_schedulers()
+        get_scheduler("T1").on_rate_limited("users_list", 1.0)
+        get_scheduler("T2").on_rate_limited("users_list", 1.0)
+
+        assert metrics.gauges()["rate_limit_rate_limited"] == 2
+
+    def test_get_scheduler_per_workspace(self) -> None:
+        assert get_scheduler("T1") is get_scheduler("T1")
+        assert get_scheduler("T1") is not get_scheduler("T2")
+
+
+class TestRateLimitedClient:
+    def test_retries_after_429(self) -> None:
+        slept: list[float] = []
+        client = Mock()
+        client.chat_postMessage.side_effect = [rate_limited_error("2"), {"ok": True}]
+        scheduler = RateLimitScheduler(sleep=slept.append)
+
+        result = RateLimitedClient(client, scheduler).chat_postMessage(
+            channel="C1", text="hi"
+        )
+
+        assert result == {"ok": True}
+        assert client.chat_postMessage.call_count == 2
+        assert scheduler.stats()["rate_limited"] == 1
+        assert slept and slept[-1] >= 2.0 - 1e-6
+
+    def test_gives_up_after_max_retries(self) -> None:
+        client = Mock()
+        client.conversations_history.side_effect = rate_limited_error("0")
+        scheduler = RateLimitScheduler(sleep=lambda seconds: None)
+
+        with pytest.raises(SlackApiError):
+            RateLimitedClient(client, scheduler, max_retries=2).conversations_history(
+                channel="C1"
+            )
+        assert client.conversations_history.call_count == 3
+
+    def test_other_errors_are_not_retried(self) -> None:
+        client = Mock()
+        client.chat_postMessage.side_effect = SlackApiError(
+            "error", response={"error": "channel_not_found"}
+        )
+
+        with pytest.raises(SlackApiError):
+            RateLimitedClient(client, RateLimitScheduler()).chat_postMessage(
+                channel="C1"
+            )
+        assert client.chat_postMessage.call_count == 1
+
+    def test_non_blocking_raises_429_and_pauses_bucket(self) -> None:
+        client = Mock()
+        client.conversations_history.side_effect = rate_limited_error("5")
+        scheduler = RateLimitScheduler(sleep=Mock(side_effect=AssertionError))
+
+        with pytest.raises(SlackApiError):
+            RateLimitedClient(client, scheduler, blocking=False).conversations_history(
+                channel="C1"
+            )
+        assert client.conversations_history.call_count == 1
+        assert scheduler.stats()["rate_limited"] == 1
+        assert not scheduler.try_acquire("conversations_history", "C1")
+
+    def test_non_blocking_still_retries_posts(self) -> None:
+        slept: list[float] = []
+        client = Mock()
+        client.chat_postMessage.side_effect = [rate_limited_error("2"), {"ok": True}]
+        scheduler = RateLimitScheduler(sleep=slept.append)
+
+        result = RateLimitedClient(client, scheduler, blocking=False).chat_postMessage(
+            channel="C1", text="hi"
+        )
+
+        assert result == {"ok": True}
+        assert client.chat_postMessage.call_count == 2
+        assert slept and slept[-1] >= 2.0 - 1e-6
+
+    def test_passes_through_other_attributes(self) -> None:
+        client: Any = Mock()
+        client.token = "xoxb"
+
+        wrapped = RateLimitedClient(client, RateLimitScheduler())
+
+        assert wrapped.token == "xoxb"
+        assert wrapped.client is client
+
+
+class TestAsyncRateLimitedClient:
+    def test_waits_and_retries_without_blocking(self) -> None:
+        slept: list[float] = []
+
+        async def async_sleep(seconds: float) -> None:
+            slept.append(seconds)
+
+        client = AsyncMock()
+        client.chat_postMessage.side_effect = [rate_limited_error("2"), {"ok": True}]
+        scheduler = RateLimitScheduler(
+            sleep=Mock(side_effect=AssertionError), async_sleep=async_sleep
+        )
+        wrapped = AsyncRateLimitedClient(client, scheduler)
+
+        # under gevent asyncio.run would clash with the shared loop
+        runner = AsyncRunner(blocking_threads=1)
+        try:
+            result = runner.submit(
+                wrapped.chat_postMessage(channel="C1", text="hi")
+            ).result(timeout=5)
+        finally:
+            runner.stop()
+
+        assert result == {"ok": True}
+        assert client.chat_postMessage.await_count == 2
+        assert slept and slept[-1] >= 2.0 - 1e-6
+        stats = scheduler.stats()
+        assert stats["rate_limited"] == 1
+        assert stats["throttled"] == 1
+        assert stats["queue_depth"] == 0
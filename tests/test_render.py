@@ -0,0 +1,93 @@
+import pytest
+
+from endpoints.render import (
+    FENCE,
+    FORMAT_MRKDWN,
+    SECTION_LIMIT,
+    markdown_to_mrkdwn,
+    render_answer,
+    split_message,
+)
+
+
+@pytest.mark.parametrize(
+    ("markdown", "mrkdwn"),
+    [
+        ("# Title", "*Title*"),
+        ("### Sub ###", "*Sub*"),
+        ("**bold** and __bold__", "*bold* and *bold*"),
+        ("*italic* text", "_italic_ text"),
+        ("~~gone~~", "~gone~"),
+        ("see [docs](https://example.com)", "see <https://example.com|docs>"),
+        ("- one\n  * two", "• one\n  • two"),
+        ("> quoted", ">quoted"),
+        ("---", "──────────"),
+        ("a < b & c", "a &lt; b &amp; c"),
+        ("hi <@U123> <https://x.y|x>", "hi <@U123> <https://x.y|x>"),
+        ("use `**x** < y`", "use `**x** < y`"),
+        ("2 * 3 * 4", "2 * 3 * 4"),
+    ],
+)
+def test_markdown_to_mrkdwn(markdown: str, mrkdwn: str) -> None:
+    assert markdown_to_mrkdwn(markdown) == mrkdwn
+
+
+def test_markdown_to_mrkdwn_keeps_code_blocks_verbatim() -> None:
+    text = "intro\n```python\n# not a heading\n**x** < 1\n```\n**after**"
+    assert markdown_to_mrkdwn(text) == (
+        "intro\n```\n# not a heading\n**x** < 1\n```\n*after*"
+    )
+
+
+def test_split_message_short_text_is_one_part() -> None:
+    assert split_message("hello", 100) == ["hello"]
+
+
+def test_split_message_prefers_paragraph_breaks() -> None:
+    paragraphs = ["a" * 30, "b" * 30, "c" * 30]
+    text = "\n\n".join(paragraphs)
+    assert split_message(text, 50) == paragraphs
+
+
+def test_split_message_cuts_long_lines_at_spaces() -> None:
+    text = " ".join(["word"] * 100)
+    parts = split_message(text, 50)
+    assert all(len(part) <= 50 for part in parts)
+    assert " ".join(parts) == text
+
+
+def test_split_message_reopens_code_blocks() -> None:
+    code = "\n".join(f"line {i}" for i in range(40))
+    text = f"before\n{FENCE}\n{code}\n{FENCE}\nafter"
+    parts = split_message(text, 80)
+
+    assert len(parts) > 2
+    for part in parts:
+        assert len(part) <= 80
+        assert part.count(FENCE) % 2 == 0
+    rejoined = "\n".join(
+        line for part in parts for line in part.split("\n") if line != FENCE
+    )
+    assert rejoined == f"before\n{code}\nafter"
+
+
+def test_render_answer_plain_has_no_blocks() -> None:
+    parts = render_answer("# Title\n\n" + "x " * 100, limit=60)
+    assert len(parts) > 1
+    assert parts[0].text == "# Title"
+    assert all(part.blocks == [] for part in parts)
+
+
+def test_render_answer_mrkdwn_sections_fit_block_limit() -> None:
+    answer = "\n".join(f"- item **{i}** " + "y" * 50 for i in range(200))
+    parts = render_answer(answer, FORMAT_MRKDWN, limit=10000)
+
+    assert sum(len(part.text) for part in parts) > SECTION_LIMIT
+    for part in parts:
+        assert len(part.text) <= 10000
+        assert part.blocks
+        for block in part.blocks:
+            assert block["type"] == "section"
+            assert block["text"]["type"] == "mrkdwn"
+            assert len(block["text"]["text"]) <= SECTION_LIMIT
+    assert parts[0].text.startswith("• item *0*")
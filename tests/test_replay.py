@@ -0,0 +1,103 @@
+import pytest
+
+from benchmarks.fake_services import FakeDify, FakeSlack, Faults
+from benchmarks.replay import (
+    ReplayReport,
+    answer_key,
+    check_gates,
+    clone,
+    load_corpus,
+    main,
+    replay,
+)
+
+
+@pytest.fixture(scope="module")
+def corpus() -> list[dict]:
+    return load_corpus()
+
+
+class TestReplay:
+    def test_corpus_is_answered_exactly_once(self, corpus: list[dict]) -> None:
+        report = replay(corpus, repeat=3, concurrency=4)
+
+        assert report.events == 3 * len(corpus)
+        assert report.expected > 0
+        assert report.answered == report.expected
+        assert report.lost == 0
+        assert report.duplicated == 0
+        assert report.unexpected == 0
+        assert check_gates(report) == []
+
+    def test_async_dispatch_waits_for_answers(self, corpus: list[dict]) -> None:
+        report = replay(corpus, settings={"dispatch_mode": "async"}, concurrency=2)
+
+        assert report.lost == 0
+        assert report.duplicated == 0
+
+    def test_asyncio_dispatch_waits_for_answers(self, corpus: list[dict]) -> None:
+        report = replay(
+            corpus,
+            settings={"dispatch_mode": "asyncio", "coalesce_reactions": False},
+            slack=FakeSlack(Faults(latency=0.001)),
+            concurrency=2,
+        )
+
+        assert report.answered == report.expected
+        assert report.lost == 0
+        # without coalescing the reaction pile-on is answered more than once
+        assert report.duplicated == 2
+
+    def test_pile_on_without_coalescing_is_reported_as_duplicate(
+        self, corpus: list[dict]
+    ) -> None:
+        report = replay(corpus, settings={"coalesce_reactions": False})
+
+        assert report.duplicated == 2
+
+    def test_dify_errors_are_reported_as_lost(self, corpus: list[dict]) -> None:
+        dify = FakeDify(Faults(error_rate=1.0))
+
+        report = replay(corpus, dify=dify)
+
+        assert report.answered == 0
+        assert report.lost == report.expected
+        assert report.dify_errors == dify.calls
+
+    def test_clones_are_distinct_events(self, corpus: list[dict]) -> None:
+        mention = next(e for e in corpus if answer_key(e["body"]))
+
+        first, second = clone(mention, 1), clone(mention, 2)
+
+        assert first["body"]["event_id"] != second["body"]["event_id"]
+        assert answer_key(first["body"]) != answer_key(second["body"])
+
+    def test_gates(self) -> None:
+        report = ReplayReport(
+            events=10,
+            elapsed=1.0,
+            events_per_sec=10.0,
+            request_p50=0.01,
+            request_p99=0.2,
+            answer_p50=0.01,
+            answer_p99=0.2,
+            expected=5,
+            answered=4,
+            lost=1,
+            duplicated=0,
+            unexpected=0,
+            slack_calls=0,
+            slack_rate_limited=0,
+            slack_errors=0,
+            dify_calls=0,
+            dify_errors=0,
+            throttle_wait=0.0,
+        )
+
+        failures = check_gates(report, min_events_per_sec=100, max_p99=0.1)
+
+        assert len(failures) == 3
+
+    def test_main_exit_status(self) -> None:
+        assert main(["--repeat", "1", "--concurrency", "1"]) == 0
+        assert main(["--repeat", "1", "--dify-error-rate", "1"]) == 1
@@ -0,0 +1,110 @@
+import json
+from typing import Any
+
+from endpoints.router import (
+    EVENT_CALLBACK,
+    URL_VERIFICATION,
+    Router,
+    compile_settings,
+    prefilter,
+)
+
+
+def _body(payload: dict[str, Any]) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def _reaction(reaction: str) -> bytes:
+    return _body(
+        {
+            "type": EVENT_CALLBACK,
+            "event": {
+                "type": "reaction_added",
+                "reaction": reaction,
+                "item": {"type": "message", "channel": "C1", "ts": "1.0"},
+            },
+        }
+    )
+
+
+class TestCompileSettings:
+    def test_parses_reaction_list_once(self) -> None:
+        settings = {"target_reactions": " eyes, ,fire ", "allow_retry": True}
+
+        compiled = compile_settings(settings)
+
+        assert compiled.target_reactions == frozenset({"eyes", "fire"})
+        assert compiled.allow_retry is True
+        assert compile_settings(dict(settings)) is compiled
+
+    def test_changed_settings_recompile(self) -> None:
+        first = compile_settings({"target_reactions": "eyes"})
+        second = compile_settings({"target_reactions": "fire"})
+
+        assert second.target_reactions == frozenset({"fire"})
+        assert first is not second
+
+
+class TestPrefilter:
+    def test_passes_handled_payloads(self) -> None:
+        compiled = compile_settings({})
+
+        assert prefilter(_body({"type": URL_VERIFICATION}), compiled)
+        assert prefilter(
+            _body({"type": EVENT_CALLBACK, "event": {"type": "app_mention"}}),
+            compiled,
+        )
+        assert prefilter(_reaction("eyes"), compiled)
+
+    def test_rejects_unhandled_events(self) -> None:
+        compiled = compile_settings({})
+        body = _body(
+            {
+                "type": EVENT_CALLBACK,
+                "event": {"type": "message", "subtype": "message_changed"},
+            }
+        )
+
+        assert not prefilter(body, compiled)
+
+    def test_rejects_unconfigured_reaction(self) -> None:
+        compiled = compile_settings({"target_reactions": "eyes"})
+
+        assert prefilter(_reaction("eyes"), compiled)
+        assert not prefilter(_reaction("fire"), compiled)
+
+    def test_passes_summarize_reaction(self) -> None:
+        compiled = compile_settings(
+            {"target_reactions": "eyes", "summarize_reaction": ":memo:"}
+        )
+
+        assert compiled.summarize_reaction == "memo"
+        assert prefilter(_reaction("memo"), compiled)
+        assert not prefilter(_reaction("fire"), compiled)
+
+    def test_quoted_text_does_not_fool_the_filter(self) -> None:
+        compiled = compile_settings({})
+        body = _body(
+            {
+                "type": EVENT_CALLBACK,
+                "event": {"type": "message", "text": 'say "app_mention"'},
+            }
+        )
+
+        assert not prefilter(body, compiled)
+
+    def test_empty_body_is_left_to_the_decoder(self) -> None:
+        assert prefilter(b"", compile_settings({}))
+
+
+class TestRouter:
+    def test_resolves_registered_routes(self) -> None:
+        router = Router()
+
+        @router.route(EVENT_CALLBACK, "app_mention")
+        def on_mention() -> str:
+            return "mention"
+
+        assert router.resolve(EVENT_CALLBACK, "app_mention") is on_mention
+        assert router.resolve(EVENT_CALLBACK, "message") is None
+        assert router.resolve(URL_VERIFICATION) is None
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from endpoints.routing import (
+    Route,
+    RoutingTable,
+    apply_route,
+    compile_routing_rules,
+    parse_routing_rules,
+)
+
+
+def _table(rules: list[dict]) -> RoutingTable:
+    return RoutingTable(parse_routing_rules(json.dumps(rules)))
+
+
+class TestRoutingTable:
+    def test_most_specific_rule_wins(self) -> None:
+        table = _table(
+            [
+                {"team_id": "T1", "app_id": "team-app"},
+                {"channel": "C1", "app_id": "channel-app"},
+                {"channel": "C1", "reaction": "eyes", "app_id": "eyes-app"},
+            ]
+        )
+
+        assert table.lookup("T1", "C1", "eyes").app_id == "eyes-app"
+        assert table.lookup("T1", "C1", "memo").app_id == "channel-app"
+        assert table.lookup("T1", "C2", "eyes").app_id == "team-app"
+        assert table.lookup("T2", "C2", None) == Route()
+
+    def test_token_and_app_resolve_independently(self) -> None:
+        table = _table(
+            [
+                {"team_id": "T1", "bot_token": "xoxb-t1", "app_id": "default"},
+                {"channel": "C1", "app_id": "support"},
+            ]
+        )
+
+        assert table.lookup("T1", "C1", None) == Route("xoxb-t1", "support")
+        assert table.lookup("T1", "C9", None) == Route("xoxb-t1", "default")
+
+    def test_first_rule_wins_for_identical_match(self) -> None:
+        table = _table(
+            [{"channel": "C1", "app_id": "a"}, {"channel": "C1", "app_id": "b"}]
+        )
+
+        assert len(table) == 1
+        assert table.lookup(None, "C1", None).app_id == "a"
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            "not json",
+            '{"team_id": "T1"}',
+            '["T1"]',
+            '[{"team_id": "T1"}]',
+            '[{"team": "T1", "app_id": "a"}]',
+        ],
+    )
+    def test_invalid_rules_are_rejected(self, raw: str) -> None:
+        with pytest.raises(ValueError):
+            parse_routing_rules(raw)
+        assert compile_routing_rules(raw) is None
+
+    def test_apply_route_substitutes_token_and_app(self) -> None:
+        settings = {"bot_token": "xoxb-default", "app": {"app_id": "default"}}
+
+        routed = apply_route(settings, Route("xoxb-t1", "support"))
+
+        assert routed["bot_token"] == "xoxb-t1"
+        assert routed["app"] == {"app_id": "support"}
+        assert settings["app"] == {"app_id": "default"}
+        assert apply_route(settings, Route()) is settings
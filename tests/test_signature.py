@@ -0,0 +1,47 @@
+import hashlib
+import hmac
+
+from endpoints.signature import SignatureVerifier, get_signature_verifier
+
+SECRET = "8f742231b10e8888abcd99yyyzzz85a5"
+BODY = b'{"type": "event_callback"}'
+
+
+def _sign(timestamp: str, body: bytes = BODY, secret: str = SECRET) -> str:
+    digest = hmac.new(
+        secret.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return f"v0={digest}"
+
+
+class TestSignatureVerifier:
+    def test_accepts_valid_signature(self) -> None:
+        verifier = SignatureVerifier(SECRET, clock=lambda: 1000.0)
+
+        assert verifier.verify(BODY, "1000", _sign("1000"))
+        # the prepared key is reused, not consumed
+        assert verifier.verify(BODY, "1000", _sign("1000"))
+
+    def test_rejects_tampered_body_and_wrong_secret(self) -> None:
+        verifier = SignatureVerifier(SECRET, clock=lambda: 1000.0)
+
+        assert not verifier.verify(b"{}", "1000", _sign("1000"))
+        assert not verifier.verify(BODY, "1000", _sign("1000", secret="other"))
+
+    def test_rejects_missing_or_malformed_headers(self) -> None:
+        verifier = SignatureVerifier(SECRET, clock=lambda: 1000.0)
+
+        assert not verifier.verify(BODY, None, _sign("1000"))
+        assert not verifier.verify(BODY, "1000", None)
+        assert not verifier.verify(BODY, "soon", _sign("soon"))
+        assert not verifier.verify(BODY, "1000", "v1=abc")
+
+    def test_replay_window(self) -> None:
+        verifier = SignatureVerifier(SECRET, max_age=300, clock=lambda: 1000.0)
+
+        assert verifier.verify(BODY, "700", _sign("700"))
+        assert not verifier.verify(BODY, "699", _sign("699"))
+        assert not verifier.verify(BODY, "1301", _sign("1301"))
+
+    def test_registry_returns_shared_instance(self) -> None:
+        assert get_signature_verifier(SECRET) is get_signature_verifier(SECRET)
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from endpoints.singleflight import SingleFlight, get_singleflight
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_execution(self) -> None:
+        flight: SingleFlight[str, str] = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls: list[int] = []
+        results: list[tuple[str, bool]] = []
+
+        def slow() -> str:
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "answer"
+
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert calls == [1]
+        assert sorted(results) == [("answer", False), ("answer", True)]
+        assert flight.stats() == {"in_flight": 0, "executed": 1, "shared": 1}
+
+    def test_follower_without_wait_returns_immediately(self) -> None:
+        flight: SingleFlight[str, str] = SingleFlight(window=10)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow() -> str:
+            started.set()
+            release.wait(5)
+            return "answer"
+
+        leader = threading.Thread(target=lambda: flight.do("k", slow))
+        leader.start()
+        started.wait(5)
+
+        assert flight.do("k", slow, wait=False) == (None, True)
+        release.set()
+        leader.join()
+        # a completed call within the window is returned as usual
+        assert flight.do("k", slow, wait=False) == ("answer", True)
+        assert flight.stats()["executed"] == 1
+
+    def test_window_shares_recent_result(self) -> None:
+        now = [0.0]
+        flight: SingleFlight[str, int] = SingleFlight(window=10, clock=lambda: now[0])
+
+        assert flight.do("k", lambda: 1) == (1, False)
+        now[0] = 5.0
+        assert flight.do("k", lambda: 2) == (1, True)
+        now[0] = 20.0
+        assert flight.do("k", lambda: 3) == (3, False)
+
+    def test_without_window_runs_again_after_completion(self) -> None:
+        flight: SingleFlight[str, int] = SingleFlight()
+
+        assert flight.do("k", lambda: 1) == (1, False)
+        assert flight.do("k", lambda: 2) == (2, False)
+
+    def test_failure_is_not_remembered(self) -> None:
+        flight: SingleFlight[str, int] = SingleFlight(window=10)
+
+        def fail() -> int:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            flight.do("k", fail)
+        assert flight.do("k", lambda: 1) == (1, False)
+
+    def test_registry_returns_shared_instance(self) -> None:
+        assert get_singleflight(10.0) is get_singleflight(10.0)
+        assert get_singleflight(10.0) is not get_singleflight(5.0)
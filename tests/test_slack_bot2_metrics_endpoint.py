@@ -0,0 +1,36 @@
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from werkzeug import Request
+
+from endpoints.metrics import metrics
+from endpoints.slack_bot2_metrics import SlackBot2MetricsEndpoint
+
+
+class TestSlackBot2MetricsEndpoint:
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self) -> Any:
+        metrics.reset()
+        yield
+        metrics.enabled = False
+        metrics.reset()
+
+    def test_disabled_returns_404(self) -> None:
+        endpoint = SlackBot2MetricsEndpoint(Mock())
+
+        response = endpoint._invoke(Mock(spec=Request), {}, {})
+
+        assert response.status_code == 404
+
+    def test_serves_prometheus_text(self) -> None:
+        metrics.enabled = True
+        metrics.observe("dify_invoke", 0.2)
+        endpoint = SlackBot2MetricsEndpoint(Mock())
+
+        response = endpoint._invoke(Mock(spec=Request), {}, {"enable_metrics": True})
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        body = response.get_data(as_text=True)
+        assert 'slack_bot2_stage_seconds_count{stage="dify_invoke"} 1' in body
@@ -0,0 +1,15 @@
+from benchmarks.bench_startup import measure_startup
+
+# Generous budgets so slow CI machines pass; a regression that pulls slack_sdk
+# back into module import time would still be caught by the sys.modules check.
+IMPORT_BUDGET_SECONDS = 0.2
+CHALLENGE_BUDGET_SECONDS = 0.05
+
+
+def test_cold_start_stays_within_budget() -> None:
+    result = measure_startup()
+
+    assert result["import_seconds"] < IMPORT_BUDGET_SECONDS
+    assert result["first_challenge_seconds"] < CHALLENGE_BUDGET_SECONDS
+    assert not result["slack_sdk_loaded"]
+    assert not result["sqlite3_loaded"]
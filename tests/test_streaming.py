@@ -0,0 +1,58 @@
+from typing import Any
+
+import pytest
+
+from endpoints.streaming import ChannelThrottle, StreamedAnswer, consume_stream
+
+
+class TestChannelThrottle:
+    def test_throttles_per_channel(self) -> None:
+        throttle = ChannelThrottle()
+
+        assert throttle.acquire("C1", 60.0) is True
+        assert throttle.acquire("C1", 60.0) is False
+        assert throttle.acquire("C2", 60.0) is True
+
+    def test_zero_interval_never_throttles(self) -> None:
+        throttle = ChannelThrottle()
+
+        assert throttle.acquire("C1", 0.0) is True
+        assert throttle.acquire("C1", 0.0) is True
+
+
+class TestStreamedAnswer:
+    def test_accumulates_message_chunks(self) -> None:
+        answer = StreamedAnswer()
+
+        assert answer.feed({"event": "message", "answer": "Hel"}) is True
+        assert answer.feed({"event": "agent_message", "answer": "lo"}) is True
+        assert answer.feed({"event": "message_end", "conversation_id": "c1"}) is False
+
+        assert answer.text == "Hello"
+        assert answer.conversation_id == "c1"
+
+    def test_message_replace(self) -> None:
+        answer = StreamedAnswer()
+        answer.feed({"event": "message", "answer": "draft"})
+        answer.feed({"event": "message_replace", "answer": "final"})
+
+        assert answer.text == "final"
+
+    def test_error_event_raises(self) -> None:
+        with pytest.raises(RuntimeError, match="quota"):
+            StreamedAnswer().feed({"event": "error", "message": "quota"})
+
+
+class TestConsumeStream:
+    def test_coalesces_updates(self) -> None:
+        chunks: list[dict[str, Any]] = [
+            {"event": "message", "answer": token} for token in ["a", "b", "c"]
+        ]
+        updates: list[str] = []
+
+        answer = consume_stream(
+            chunks, "C1", 60.0, updates.append, throttle=ChannelThrottle()
+        )
+
+        assert answer.text == "abc"
+        assert updates == ["a"]
@@ -0,0 +1,190 @@
+import threading
+from typing import Any
+from unittest.mock import Mock
+
+from endpoints.summarize import (
+    REDUCE_PROMPT,
+    MapReduceSummarizer,
+    UserDirectory,
+    chunk_lines,
+    compact,
+    iter_history,
+    iter_thread,
+)
+
+
+def pages(*batches: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    responses: list[dict[str, Any]] = []
+    for i, batch in enumerate(batches):
+        cursor = f"c{i + 1}" if i + 1 < len(batches) else ""
+        responses.append(
+            {"messages": batch, "response_metadata": {"next_cursor": cursor}}
+        )
+    return responses
+
+
+def test_iter_history_follows_cursor_lazily() -> None:
+    client = Mock()
+    client.conversations_history.side_effect = pages(
+        [{"ts": "3"}, {"ts": "2"}], [{"ts": "1"}]
+    )
+
+    messages = iter_history(client, "C1", oldest="0", latest="3", page_size=2)
+    assert next(messages) == {"ts": "3"}
+    assert client.conversations_history.call_count == 1
+
+    assert [m["ts"] for m in messages] == ["2", "1"]
+    assert client.conversations_history.call_args[1]["cursor"] == "c1"
+
+
+def test_iter_thread_yields_parent_once() -> None:
+    client = Mock()
+    parent = {"ts": "1", "text": "parent"}
+    client.conversations_replies.side_effect = pages(
+        [parent, {"ts": "2"}], [parent, {"ts": "3"}]
+    )
+
+    assert [m["ts"] for m in iter_thread(client, "C1", "1")] == ["1", "2", "3"]
+
+
+def test_compact_drops_noise_and_repeats() -> None:
+    names = {"U1": "alice", "U2": "bob"}
+    messages: list[dict[str, Any]] = [
+        {"user": "U1", "text": "hi <@U2|bob>", "blocks": [{"type": "rich_text"}]},
+        {"user": "U2", "subtype": "channel_join", "text": "<@U2> joined"},
+        {"user": "U2", "text": "  "},
+        {"user": "U1", "text": "hi <@U2>"},
+        {"bot_id": "B1", "text": "deploy done"},
+        {"user": "U2", "text": "ok"},
+        {"user": "U2", "text": "ok"},
+    ]
+
+    lines = list(compact(messages, names.__getitem__, dedupe_window=2))
+
+    assert lines == ["alice: hi @bob", "B1: deploy done", "bob: ok"]
+
+
+def test_compact_forgets_lines_outside_window() -> None:
+    messages = [{"user": "U1", "text": t} for t in ("a", "b", "a")]
+
+    assert len(list(compact(messages, str, dedupe_window=1))) == 3
+
+
+def test_user_directory_caches_names() -> None:
+    client = Mock()
+    client.users_info.return_value = {
+        "user": {"name": "al", "profile": {"display_name": "", "real_name": "Alice"}}
+    }
+    directory = UserDirectory()
+
+    assert directory.name(client, "xoxb-1", "U1") == "Alice"
+    assert directory.name(client, "xoxb-1", "U1") == "Alice"
+    assert directory.lookups == 1
+    # other workspaces have their own user IDs
+    directory.name(client, "xoxb-2", "U1")
+    assert directory.lookups == 2
+
+
+def test_user_directory_looks_up_outside_the_cache_lock() -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    def users_info(user: str) -> dict[str, Any]:
+        if user == "U1":
+            started.set()
+            release.wait(5)
+        return {"user": {"name": user.lower()}}
+
+    client = Mock()
+    client.users_info.side_effect = users_info
+    directory = UserDirectory()
+    slow = threading.Thread(target=directory.name, args=(client, "xoxb-1", "U1"))
+    slow.start()
+    started.wait(5)
+
+    # another name resolves while U1's lookup is still waiting on Slack
+    assert directory.name(client, "xoxb-1", "U2") == "u2"
+    assert not release.is_set() and slow.is_alive()
+    release.set()
+    slow.join(5)
+    assert directory.name(client, "xoxb-1", "U1") == "u1"
+    assert directory.lookups == 2
+
+
+def test_user_directory_falls_back_to_id() -> None:
+    client = Mock()
+    client.users_info.side_effect = RuntimeError("user_not_found")
+
+    assert UserDirectory().name(client, "xoxb-1", "U9") == "U9"
+
+
+def test_chunk_lines_respects_limit() -> None:
+    lines = ["x" * 30, "y" * 30, "z" * 30, "w" * 200]
+
+    chunks = list(chunk_lines(lines, 70))
+
+    assert chunks == [["x" * 30, "y" * 30], ["z" * 30], ["w" * 70]]
+
+
+def test_short_conversation_is_one_call() -> None:
+    ask = Mock(return_value="summary")
+    summarizer = MapReduceSummarizer(ask, max_chars=1000)
+
+    assert summarizer.summarize(["alice: hi", "bob: hello"]) == "summary"
+    ask.assert_called_once()
+    assert ask.call_args[0][0] == "map"
+    assert summarizer.reduce_calls == 0
+
+
+def test_long_conversation_reduces_as_it_goes() -> None:
+    reduced: list[str] = []
+
+    def ask(stage: str, text: str) -> str:
+        if stage == "reduce":
+            reduced.append(text[len(REDUCE_PROMPT) :])
+        return f"{stage}:" + "s" * 40
+
+    summarizer = MapReduceSummarizer(ask, max_chars=100)
+    summary = summarizer.summarize(f"line {i:04d}" for i in range(1000))
+
+    assert summary.startswith("reduce:")
+    assert summarizer.map_calls == 100
+    # partials are combined before they outgrow one chunk, and never cut
+    assert summarizer.reduce_calls == len(reduced) > 0
+    assert all(len(text) <= 100 for text in reduced)
+    assert {p for text in reduced for p in text.split("\n\n")} == {
+        "map:" + "s" * 40,
+        "reduce:" + "s" * 40,
+    }
+
+
+def test_reduce_never_truncates_long_partials() -> None:
+    reduced: list[str] = []
+
+    def ask(stage: str, text: str) -> str:
+        if stage == "reduce":
+            reduced.append(text[len(REDUCE_PROMPT) :])
+        return stage + "x" * 70
+
+    summarizer = MapReduceSummarizer(ask, max_chars=100)
+    summarizer.summarize(["a" * 90, "b" * 90, "c" * 90])
+
+    assert reduced == [
+        "map" + "x" * 70 + "\n\n" + "map" + "x" * 70,
+        "reduce" + "x" * 70 + "\n\n" + "map" + "x" * 70,
+    ]
+
+
+def test_newest_first_input_is_summarized_in_time_order() -> None:
+    seen: list[tuple[str, str]] = []
+
+    def ask(stage: str, text: str) -> str:
+        seen.append((stage, text.split("\n\n", 1)[1]))
+        return text.rsplit("\n", 1)[-1][:60]
+
+    summarizer = MapReduceSummarizer(ask, max_chars=100, newest_first=True)
+    summarizer.summarize(["c", "b" * 60, "a" * 60])
+
+    assert seen[0] == ("map", "b" * 60 + "\nc")
+    assert seen[1] == ("map", "a" * 60)
+    assert seen[2] == ("reduce", "a" * 60 + "\n\n" + "c")
@@ -0,0 +1,81 @@
+from typing import Any
+from unittest.mock import Mock
+
+from endpoints.thread_context import ThreadContextBuilder
+
+
+def _message(ts: str, text: str, user: str = "U1") -> dict[str, Any]:
+    return {"ts": ts, "text": text, "user": user}
+
+
+class TestThreadContextBuilder:
+    def test_pages_through_history_on_first_call(self) -> None:
+        client = Mock()
+        client.conversations_replies.side_effect = [
+            {
+                "messages": [_message("1.0", "parent"), _message("2.0", "a")],
+                "response_metadata": {"next_cursor": "c1"},
+            },
+            {"messages": [_message("1.0", "parent"), _message("3.0", "b", "U2")]},
+        ]
+
+        context = ThreadContextBuilder().build(client, "C1", "1.0", "4.0", 1000)
+
+        assert context == "U1: parent\nU1: a\nU2: b"
+        second_call = client.conversations_replies.call_args_list[1].kwargs
+        assert second_call["cursor"] == "c1"
+
+    def test_later_calls_fetch_only_newer_messages(self) -> None:
+        client = Mock()
+        client.conversations_replies.side_effect = [
+            {"messages": [_message("1.0", "parent"), _message("2.0", "a")]},
+            {"messages": [_message("1.0", "parent"), _message("3.0", "b")]},
+        ]
+        builder = ThreadContextBuilder()
+
+        builder.build(client, "C1", "1.0", "2.0", 1000)
+        context = builder.build(client, "C1", "1.0", "3.0", 1000)
+
+        assert context == "U1: parent\nU1: a"
+        last_call = client.conversations_replies.call_args.kwargs
+        assert last_call["oldest"] == "2.0"
+        assert last_call["inclusive"] is False
+
+    def test_thread_parent_has_no_context(self) -> None:
+        client = Mock()
+
+        assert ThreadContextBuilder().build(client, "C1", "1.0", "1.0", 1000) == ""
+        client.conversations_replies.assert_not_called()
+
+    def test_no_fetch_when_history_is_current(self) -> None:
+        client = Mock()
+        client.conversations_replies.return_value = {
+            "messages": [_message("1.0", "parent"), _message("5.0", "later")]
+        }
+        builder = ThreadContextBuilder()
+
+        builder.build(client, "C1", "1.0", "5.0", 1000)
+        assert builder.build(client, "C1", "1.0", "2.0", 1000) == "U1: parent"
+        assert client.conversations_replies.call_count == 1
+
+    def test_budget_keeps_newest_messages(self) -> None:
+        client = Mock()
+        client.conversations_replies.return_value = {
+            "messages": [
+                _message("1.0", "x" * 50),
+                _message("2.0", "old"),
+                _message("3.0", "new"),
+            ]
+        }
+
+        context = ThreadContextBuilder().build(client, "C1", "1.0", "4.0", 15)
+
+        assert context == "U1: old\nU1: new"
+
+    def test_single_long_message_is_cut(self) -> None:
+        client = Mock()
+        client.conversations_replies.return_value = {
+            "messages": [_message("1.0", "abcdefghij")]
+        }
+
+        assert ThreadContextBuilder().build(client, "C1", "1.0", "2.0", 5) == "fghij"
@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from endpoints.worker_pool import (
+    OVERFLOW_CALLER_RUNS,
+    OVERFLOW_DROP_OLDEST,
+    OVERFLOW_REJECT,
+    StageStats,
+    WorkerPool,
+    clear_worker_pools,
+    get_worker_pool,
+    stage_stats,
+)
+
+
+class TestWorkerPool:
+    def test_submit_runs_job_in_background(self) -> None:
+        pool = WorkerPool(size=2, queue_size=10)
+        results: list[int] = []
+
+        assert pool.submit(lambda value: results.append(value), value=2) is True
+        pool.join()
+
+        assert results == [2]
+
+    def test_reject_when_queue_full(self) -> None:
+        gate = threading.Event()
+        pool = WorkerPool(size=1, queue_size=1, overflow=OVERFLOW_REJECT)
+
+        assert pool.submit(gate.wait) is True
+        time.sleep(0.01)
+        assert pool.submit(gate.wait) is True
+        assert pool.submit(gate.wait) is False
+        assert pool.rejected == 1
+
+        gate.set()
+        pool.join()
+
+    def test_drop_oldest_when_queue_full(self) -> None:
+        gate = threading.Event()
+        ran: list[str] = []
+        pool = WorkerPool(size=1, queue_size=1, overflow=OVERFLOW_DROP_OLDEST)
+
+        pool.submit(gate.wait)
+        time.sleep(0.01)
+        pool.submit(lambda: ran.append("old"), on_drop=lambda: ran.append("dropped"))
+        assert pool.submit(lambda: ran.append("new")) is True
+        assert pool.dropped == 1
+
+        gate.set()
+        pool.join()
+        assert ran == ["dropped", "new"]
+
+    def test_caller_runs_when_queue_full(self) -> None:
+        gate = threading.Event()
+        caller = threading.current_thread()
+        ran_in: list[Any] = []
+        pool = WorkerPool(size=1, queue_size=1, overflow=OVERFLOW_CALLER_RUNS)
+
+        pool.submit(gate.wait)
+        time.sleep(0.01)
+        pool.submit(gate.wait)
+        assert pool.submit(lambda: ran_in.append(threading.current_thread())) is True
+        assert ran_in == [caller]
+
+        gate.set()
+        pool.join()
+
+    def test_job_exception_does_not_kill_worker(self) -> None:
+        pool = WorkerPool(size=1, queue_size=10)
+        results: list[str] = []
+
+        def boom() -> None:
+            raise RuntimeError("boom")
+
+        pool.submit(boom)
+        pool.submit(lambda: results.append("after"))
+        pool.join()
+
+        assert results == ["after"]
+
+    def test_records_enqueue_wait(self) -> None:
+        stage_stats.reset()
+        pool = WorkerPool(size=1, queue_size=10)
+        pool.submit(lambda: None)
+        pool.join()
+
+        assert stage_stats.snapshot()["enqueue_wait"]["count"] == 1
+
+    def test_unknown_overflow_policy(self) -> None:
+        with pytest.raises(ValueError):
+            WorkerPool(size=1, queue_size=1, overflow="explode")
+
+    def test_get_worker_pool_is_shared_per_endpoint(self) -> None:
+        first = get_worker_pool("xoxb-a", 2, 5, OVERFLOW_REJECT)
+
+        assert get_worker_pool("xoxb-a", 2, 5, OVERFLOW_REJECT) is first
+        assert get_worker_pool("xoxb-b", 2, 5, OVERFLOW_REJECT) is not first
+        clear_worker_pools()
+
+    def test_get_worker_pool_replaces_and_shuts_down_old_pool(self) -> None:
+        gate = threading.Event()
+        ran: list[str] = []
+        old = get_worker_pool("xoxb-a", 1, 5, OVERFLOW_REJECT)
+        old.submit(gate.wait)
+        old.submit(lambda: ran.append("queued"))
+        threads = list(old._threads)
+
+        new = get_worker_pool("xoxb-a", 2, 5, OVERFLOW_REJECT)
+
+        assert new is not old
+        assert old.submit(lambda: ran.append("late")) is False
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+        assert ran == ["queued"]
+        clear_worker_pools()
+
+    def test_shutdown_without_threads(self) -> None:
+        pool = WorkerPool(size=2, queue_size=1)
+
+        pool.shutdown()
+
+        assert pool.submit(lambda: None) is False
+        assert pool._threads == []
+
+
+class TestStageStats:
+    def test_snapshot(self) -> None:
+        stats = StageStats()
+        stats.record("dify_invoke", 1.0)
+        stats.record("dify_invoke", 3.0)
+
+        snapshot = stats.snapshot()["dify_invoke"]
+        assert snapshot["count"] == 2
+        assert snapshot["mean"] == 2.0
+        assert snapshot["max"] == 3.0